@@ -0,0 +1,234 @@
+import bisect
+import difflib
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from utils.logger import JarvisLogger
+
+logger = JarvisLogger('SongIndex')
+
+_REQUEST_PREFIX = re.compile(r"^(?:(?:hey |ok )?jarvis )?(?:can you |could you |please )?"
+                             r"(?:play|put on|listen to|i want to listen to|i wanna listen to)\s+(?:me\s+)?")
+_REQUEST_SUFFIX = re.compile(r"\s+(?:please|on spotify|for me)$")
+# Song names that only ask for "some song" of the artist
+_ANY_SONG = {"", "something", "some music", "music", "a song", "anything", "some songs", "songs"}
+
+
+def normalize_title(text: str) -> str:
+    """
+    Normalize a song, artist or request for matching: lower case, no punctuation, single spaces.
+    """
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower().replace("'", "")))
+
+
+def parse_request(request: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a spoken play request like "play bohemian rhapsody by queen" into its song and artist.
+
+    Args:
+        request (str): The raw request.
+
+    Returns:
+        Tuple[str, Optional[str]]: The normalized song (empty for "play something by ...") and artist, if said.
+    """
+    text = _REQUEST_SUFFIX.sub("", _REQUEST_PREFIX.sub("", normalize_title(request)))
+    song, _, artist = text.partition(" by ")
+    song = "" if song in _ANY_SONG else song
+    return song, artist or None
+
+
+@dataclass
+class IndexedSong:
+    uri: str
+    song: str
+    artist: str
+    plays: int = 0
+
+
+class SongIndex:
+    """
+    A local index of songs that were already resolved to a Spotify URI, so repeat requests skip the LLM and search.
+
+    Titles are kept in a sorted list for prefix lookups ("play bohemian" finds "bohemian rhapsody" when no other
+    title starts that way, while "play b" or "play bohem" do not) and in an inverted word index that narrows down the candidates of fuzzy matching.
+    Every successful search is added, and the index is persisted as JSON on a background thread; additions made
+    while a write is pending are saved by that same write.
+    """
+
+    def __init__(self, index_path: Optional[str] = None, fuzzy_cutoff: float = 0.85,
+                 min_prefix_length: int = 4) -> None:
+        """
+        Initialize the SongIndex class.
+
+        Args:
+            index_path (str, optional): JSON file the index is loaded from and saved to. Memory-only when not given.
+            fuzzy_cutoff (float): Minimum similarity ratio (0-1) of a fuzzy title match.
+            min_prefix_length (int): Minimum length of a title prefix, which must also end on a whole word.
+        """
+        self.index_path = index_path
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.min_prefix_length = min_prefix_length
+        self._songs: Dict[str, IndexedSong] = {}  # URI -> song
+        self._by_title: Dict[str, List[str]] = defaultdict(list)  # Normalized title -> URIs (one per artist)
+        self._titles: List[str] = []  # Sorted normalized titles, for prefix lookups
+        self._by_word: Dict[str, set] = defaultdict(set)  # Word -> titles containing it
+        self._by_artist: Dict[str, List[str]] = defaultdict(list)
+        self._aliases: Dict[str, str] = {}  # Normalized request -> URI
+        self._lock = threading.Lock()
+        self._save_pending = False
+        self._save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="song-index-save")
+        self.stats = {"hits": 0, "misses": 0}
+        if index_path and os.path.exists(index_path):
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.index_path) as index_file:
+            data = json.load(index_file)
+        for song in data.get("songs", []):
+            self._insert(IndexedSong(**song))
+        self._aliases.update(data.get("aliases", {}))
+        logger.info(f"Loaded {len(self._songs)} songs from the song index.")
+
+    def save(self) -> None:
+        """
+        Write the index to its JSON file, atomically.
+        """
+        if not self.index_path:
+            return
+        with self._lock:
+            data = {"songs": [asdict(song) for song in self._songs.values()], "aliases": dict(self._aliases)}
+        temporary_path = f"{self.index_path}.tmp"
+        with open(temporary_path, "w") as index_file:
+            json.dump(data, index_file)
+        os.replace(temporary_path, self.index_path)
+
+    def _schedule_save(self) -> None:
+        with self._lock:
+            if self._save_pending:
+                return
+            self._save_pending = True
+        self._save_executor.submit(self._save_pending_changes)
+
+    def _save_pending_changes(self) -> None:
+        with self._lock:
+            self._save_pending = False
+        try:
+            self.save()
+        except OSError as e:
+            logger.error(f"Failed to save the song index: {e}")
+
+    def _insert(self, song: IndexedSong) -> None:
+        title = normalize_title(song.song)
+        if song.uri not in self._songs:
+            if title not in self._by_title:
+                bisect.insort(self._titles, title)
+                for word in title.split():
+                    self._by_word[word].add(title)
+            self._by_title[title].append(song.uri)
+            self._by_artist[normalize_title(song.artist)].append(song.uri)
+        self._songs[song.uri] = song
+
+    def add(self, song: str, artist: str, uri: str, request: Optional[str] = None) -> None:
+        """
+        Add a resolved song, e.g. after a successful Spotify search.
+
+        Args:
+            song (str): The track name.
+            artist (str): The main artist.
+            uri (str): The Spotify track URI.
+            request (str, optional): The spoken request it resolved, remembered as an alias.
+        """
+        with self._lock:
+            existing = self._songs.get(uri)
+            self._insert(IndexedSong(uri, song, artist, existing.plays if existing else 0))
+            if request:
+                self._aliases[normalize_title(request)] = uri
+        if self.index_path:
+            self._schedule_save()
+
+    def get(self, uri: str) -> Optional[IndexedSong]:
+        """
+        Returns:
+            Optional[IndexedSong]: The indexed song with this URI, if any.
+        """
+        with self._lock:
+            return self._songs.get(uri)
+
+    def _match_title(self, title: str) -> List[str]:
+        """
+        Find the indexed titles a spoken title refers to: exact, then unique whole-word prefix, then fuzzy.
+        """
+        if title in self._by_title:
+            return [title]
+        if len(title) >= self.min_prefix_length:
+            # Titles sharing the prefix sort right after it; only those continuing with a new word count
+            start = bisect.bisect_left(self._titles, title)
+            prefixed = []
+            for candidate in self._titles[start:]:
+                if not candidate.startswith(title):
+                    break
+                if candidate[len(title)] == " ":
+                    prefixed.append(candidate)
+            if len(prefixed) == 1:
+                return prefixed
+        candidates = set().union(*(self._by_word.get(word, set()) for word in title.split()))
+        return difflib.get_close_matches(title, candidates, n=1, cutoff=self.fuzzy_cutoff)
+
+    def _resolve(self, song: str, artist: Optional[str]) -> Optional[IndexedSong]:
+        artist_uris = set(self._by_artist.get(normalize_title(artist), [])) if artist else None
+        if not song:
+            # "Play something by X": the artist's most played song
+            candidates = [self._songs[uri] for uri in artist_uris or []]
+            return max(candidates, key=lambda candidate: candidate.plays, default=None)
+        for title in self._match_title(song):
+            uris = self._by_title[title]
+            if artist_uris is not None:
+                uris = [uri for uri in uris if uri in artist_uris]
+            if uris:
+                return max((self._songs[uri] for uri in uris), key=lambda candidate: candidate.plays)
+        return None
+
+    def resolve(self, request: Optional[str] = None, song: Optional[str] = None,
+                artist: Optional[str] = None) -> Optional[IndexedSong]:
+        """
+        Resolve a request to a known song, without any network call.
+
+        Args:
+            request (str, optional): The raw spoken request, parsed when song and artist are not given.
+            song (str, optional): The song name.
+            artist (str, optional): The artist name.
+
+        Returns:
+            Optional[IndexedSong]: The matching song, or None if it is not in the index.
+        """
+        with self._lock:
+            match = None
+            if request is not None:
+                alias_uri = self._aliases.get(normalize_title(request))
+                match = self._songs.get(alias_uri) if alias_uri else None
+                if match is None and song is None:
+                    song, artist = parse_request(request)
+            if match is None and (song or artist):
+                match = self._resolve(normalize_title(song or ""), artist)
+            if match is None:
+                self.stats["misses"] += 1
+                return None
+            match.plays += 1
+            self.stats["hits"] += 1
+            return match
+
+    def get_stats(self) -> dict:
+        """
+        Returns:
+            dict: Hits, misses, hit rate and the number of indexed songs.
+        """
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {**self.stats, "hit_rate": self.stats["hits"] / lookups if lookups else None,
+                    "songs": len(self._songs)}
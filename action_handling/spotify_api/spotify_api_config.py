@@ -10,6 +10,7 @@ class SpotifyApiConfig(BaseConfig):
                          'user-modify-playback-state',
                          'user-read-currently-playing']
     STR_SCOPE: str = ' '.join(SCOPES)
+    SONG_INDEX_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "song_index.json")
 
     SPOTIFY_CLIENT_ID: str
     SPOTIFY_CLIENT_SECRET: str
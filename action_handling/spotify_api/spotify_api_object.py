@@ -1,6 +1,9 @@
+from typing import Optional
+
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 
+from action_handling.spotify_api.song_index import SongIndex
 from action_handling.spotify_api.spotify_api_config import SpotifyApiConfig
 from utils.logger import JarvisLogger
 
@@ -18,6 +21,7 @@ class SpotifyApiObject:
         self.devices: list[dict] = self.get_devices()
         device_index = selected_device or 0
         self.selected_device = self.devices[device_index]['id']
+        self.song_index = SongIndex(config.SONG_INDEX_PATH)
 
     def get_devices(self) -> list:
         """Function to get user's devices (you need a device active to control playback)"""
@@ -32,7 +36,8 @@ class SpotifyApiObject:
         else:
             self.sp.start_playback(uris=[song_uri])
 
-    def search_song(self, song_name: str) -> str:
+    def search_song(self, song_name: str, request: str = None) -> str:
+        """Function to search a song on Spotify, adding the result to the local song index"""
         results = self.sp.search(q=song_name, type='track', limit=1)
         if results['tracks']['items']:
             track = results['tracks']['items'][0]
@@ -40,7 +45,48 @@ class SpotifyApiObject:
             song_name = track['name']
             artist_name = track['artists'][0]['name']
             logger.info(f"Found song: {song_name} by {artist_name}")
+            self.song_index.add(song_name, artist_name, song_uri, request)
             return song_uri
         else:
             logger.info("No results found.")
             return None
+
+    def play_request(self, request: str) -> Optional[str]:
+        """
+        Play a spoken request straight from the local song index, without the LLM or a Spotify search.
+
+        Args:
+            request (str): The raw request, e.g. "play bohemian rhapsody by queen".
+
+        Returns:
+            Optional[str]: The spoken reply, or None if the request is not in the index.
+        """
+        song = self.song_index.resolve(request)
+        if song is None:
+            return None
+        self.play_song(song.uri)
+        return f"Playing {song.song} by {song.artist}."
+
+    def play_music(self, arguments: dict, request: Optional[str] = None) -> str:
+        """
+        Play the song extracted by the LLM, searching Spotify only when the index does not know it.
+
+        Args:
+            arguments (dict): The validated "play music" tool arguments, with "song" and "artist".
+            request (str, optional): The spoken request, remembered as an alias of the song found by the search.
+
+        Returns:
+            str: The spoken reply.
+        """
+        song = self.song_index.resolve(request, song=arguments["song"], artist=arguments.get("artist"))
+        if song is not None:
+            self.play_song(song.uri)
+            return f"Playing {song.song} by {song.artist}."
+
+        query = f"{arguments['song']} {arguments.get('artist', '')}".strip()
+        song_uri = self.search_song(query, request)
+        if song_uri is None:
+            return f"Sorry, I couldn't find {arguments['song']}."
+        self.play_song(song_uri)
+        song = self.song_index.get(song_uri)
+        return f"Playing {song.song} by {song.artist}." if song else f"Playing {arguments['song']}."
@@ -1,5 +1,93 @@
+import os
+
+
 class ChatManagerConfig:
     GPT_MODEL_MINI = "gpt-4o-mini"
     INTENTS = ["set an alarm", "play music", "check the weather", "create a reminder", "send a message", "call someone",
                "search the web", "control smart home devices", "get the news", "get current time", 'general',
                'end chat']
+
+    # Pick the intent, extract its arguments and reply in a single completion with function calling
+    USE_TOOL_CALLING = True
+    TOOL_CALLING_PROMPT = ("You are Jarvis, a voice assistant. When the user asks for one of the available actions, "
+                           "call its tool with the arguments taken from their message and add a short spoken "
+                           "confirmation. Otherwise answer briefly in plain text, as your reply will be read aloud.")
+    ACTION_ACKNOWLEDGEMENT = "On it."
+    INVALID_ARGUMENTS_REPLY = "Sorry, I didn't get all the details. Could you say that again?"
+    END_CHAT_REPLY = "Goodbye!"
+
+    # Estimated tokens of the turns sent verbatim; older turns are folded into a summary in the background
+    HISTORY_TOKEN_BUDGET = 2000
+    HISTORY_SUMMARY_MAX_TOKENS = 200
+    HISTORY_SUMMARY_PROMPT = ("Update the summary of a conversation between a user and their voice assistant with the "
+                              "new messages. Keep names, preferences, requests and facts that may come up again. "
+                              "Answer with the summary only, in a few short sentences.")
+
+    # Conversations persisted per session, so restarts keep their context
+    PERSIST_HISTORY = True
+    HISTORY_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chat_history.db")
+    HISTORY_KEEP_TURNS = 200  # Latest turns kept per session on compaction, older ones live on in the summary
+    HISTORY_MAX_IDLE_DAYS = 30  # Sessions idle for longer are deleted on compaction
+    # Sessions the server keeps in memory; the least recently used and idle ones are reloaded from the store
+    MAX_CHAT_SESSIONS = 100
+    CHAT_SESSION_IDLE_SECONDS = 30 * 60
+
+    # Opt-in cache of replies to repeated questions, keyed by normalized utterance
+    USE_RESPONSE_CACHE = False
+    # Seconds a reply stays fresh per intent. Only model-written replies are cached, never the replies of action
+    # handlers, so only list intents the model answers in plain text
+    RESPONSE_CACHE_TTLS = {"general": 24 * 3600}
+    RESPONSE_CACHE_DATED_INTENTS = ["general"]  # Cached replies only hold for the day
+    RESPONSE_CACHE_MAX_BYTES = 2 * 2 ** 20
+    # Utterances referring back to the conversation are not cached
+    RESPONSE_CACHE_SKIP_PATTERN = r"\b(it|its|that|this|these|those|he|she|him|her|they|them|again|more|else)\b"
+
+    # Local intent classification, tried before asking the LLM
+    USE_LOCAL_INTENT_CLASSIFIER = True
+    INTENT_CACHE_SIZE = 512  # Normalized utterances whose intent is remembered
+    INTENT_MODEL_MIN_SCORE = 0.35  # Minimum cosine similarity to an intent centroid
+    INTENT_MODEL_MIN_MARGIN = 0.1  # Minimum lead of the best intent over the runner-up
+    # Destructive intents the keyword rules never pick on their own, "end chat" deletes the saved conversation
+    INTENT_MODEL_ONLY = ["end chat"]
+
+    # An intent is picked by its rules only when no other intent's rules match too
+    INTENT_RULES = {
+        "set an alarm": [r"\balarms?\b", r"\bwake me( up)?\b"],
+        "play music": [r"\bplay\b.*\b(music|songs?|album|playlist|by)\b", r"\bput on\b.*\b(music|songs?)\b",
+                       r"^play\b"],
+        "check the weather": [r"\bweather\b", r"\bforecast\b", r"\b(rain|raining|snow|sunny|temperature)\b"],
+        "create a reminder": [r"\bremind me\b", r"\breminders?\b"],
+        "send a message": [r"\b(send|text|write)\b.*\b(message|text|sms|whatsapp)\b", r"^text\b", r"^message\b"],
+        "call someone": [r"^(call|dial|ring)\b", r"\b(phone|make a) call\b"],
+        "search the web": [r"\b(search|google|look up)\b", r"\bsearch (the )?(web|internet)\b"],
+        "control smart home devices": [r"\bturn (on|off)\b", r"\bswitch (on|off)\b", r"\b(lights?|thermostat|heater|ac)\b"],
+        "get the news": [r"\bnews\b", r"\bheadlines\b"],
+        "get current time": [r"\bwhat time\b", r"\bcurrent time\b", r"\btime is it\b"],
+        "end chat": [r"^(bye|goodbye|good bye|stop|quit|exit)( jarvis)?$", r"\b(end|stop) (the )?(chat|conversation)$",
+                     r"^that'?s all( for now)?$"],
+    }
+
+    # Example utterances the local intent model is trained on
+    INTENT_EXAMPLES = {
+        "set an alarm": ["set an alarm for seven am", "wake me up at six tomorrow", "alarm for 8 30",
+                         "set my alarm", "i need to get up at five"],
+        "play music": ["play some music", "play shape of you by ed sheeran", "put on my playlist",
+                       "i want to listen to the beatles", "play something relaxing", "next song"],
+        "check the weather": ["what's the weather like", "is it going to rain today", "how hot is it outside",
+                              "weather forecast for tomorrow", "do i need an umbrella"],
+        "create a reminder": ["remind me to buy milk", "create a reminder for the meeting",
+                              "don't let me forget to call mom", "add a reminder for tomorrow"],
+        "send a message": ["send a message to dana", "text john that i'm running late", "tell sarah i'll be home soon",
+                           "send a whatsapp to my brother"],
+        "call someone": ["call mom", "phone my wife", "give david a call", "dial the office"],
+        "search the web": ["search the web for pasta recipes", "google the population of france",
+                           "look up the nearest pharmacy", "find information about black holes online"],
+        "control smart home devices": ["turn on the lights", "switch off the living room lamp",
+                                       "set the thermostat to 22", "dim the bedroom lights", "turn off the ac"],
+        "get the news": ["what's in the news", "read me the headlines", "any news today",
+                         "what happened in the world today"],
+        "get current time": ["what time is it", "tell me the time", "what's the current time", "do you know the time"],
+        "general": ["how are you", "tell me a joke", "who was albert einstein", "what is the meaning of life",
+                    "explain how a rainbow forms", "thank you"],
+        "end chat": ["goodbye", "that's all for now", "stop the conversation", "bye jarvis", "we're done"],
+    }
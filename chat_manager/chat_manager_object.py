@@ -1,27 +1,469 @@
-from openai import OpenAI
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Iterator, Optional
+
 from utils.logger import JarvisLogger
+from utils.metrics import LatencyStats
+from utils.openai_client import get_async_openai_client, get_openai_client
 from chat_manager.history_object import History
-from chat_manager_config import ChatManagerConfig
+from chat_manager.history_store import HistoryStore
+from chat_manager.chat_manager_config import ChatManagerConfig
+from chat_manager.intent_classifier import IntentClassifier, normalize_utterance
+from chat_manager.response_cache import ResponseCache
+from chat_manager.intent_tools import (TEXT_INTENTS, ToolArgumentsError, intent_for_tool, tool_definitions, tool_name,
+                                       validate_arguments)
 
 logger = JarvisLogger('ChatManager')
 
 
+@dataclass
+class IntentAction:
+    """
+    The outcome of a single tool-calling completion: the intent, its validated arguments and the spoken reply.
+    """
+    intent: str
+    arguments: dict = field(default_factory=dict)
+    reply: Optional[str] = None
+    cacheable: bool = True
+
+
 class ChatManager:
-    def __init__(self):
-        self.chat_history = History()
-        self.openai_client = OpenAI()
+    def __init__(self, session_id: str = "default", history_store: Optional[HistoryStore] = None):
+        """
+        Initialize the ChatManager class.
+
+        Args:
+            session_id (str): The conversation session, used to persist and reload its history.
+            history_store (HistoryStore, optional): A store shared between sessions. One is opened at
+                `HISTORY_DB_PATH` (and compacted) when persistence is enabled and no store is given.
+        """
+        self.openai_client = get_openai_client()
+        self.async_openai_client = get_async_openai_client()
+        if history_store is None and ChatManagerConfig.PERSIST_HISTORY:
+            history_store = HistoryStore(ChatManagerConfig.HISTORY_DB_PATH)
+            history_store.compact(ChatManagerConfig.HISTORY_KEEP_TURNS,
+                                  ChatManagerConfig.HISTORY_MAX_IDLE_DAYS * 24 * 3600)
+        self.chat_history = History(token_budget=ChatManagerConfig.HISTORY_TOKEN_BUDGET,
+                                    summarizer=self.summarize_history, store=history_store, session_id=session_id)
         self.intents: list[str] = ChatManagerConfig.INTENTS
+        self.intent_classifier = None
+        if ChatManagerConfig.USE_LOCAL_INTENT_CLASSIFIER:
+            self.intent_classifier = IntentClassifier(self.intents, ChatManagerConfig.INTENT_RULES,
+                                                      ChatManagerConfig.INTENT_EXAMPLES,
+                                                      cache_size=ChatManagerConfig.INTENT_CACHE_SIZE,
+                                                      min_score=ChatManagerConfig.INTENT_MODEL_MIN_SCORE,
+                                                      min_margin=ChatManagerConfig.INTENT_MODEL_MIN_MARGIN,
+                                                      model_only_intents=ChatManagerConfig.INTENT_MODEL_ONLY)
+        self.action_handlers: dict[str, Callable[[dict, str], str]] = {}
+        self.local_resolvers: dict[str, Callable[[str], Optional[str]]] = {}
+        self.local_resolution_latency: dict[str, dict[str, LatencyStats]] = {}
+        self.turn_round_trips = 0
+        self.round_trips_per_turn = Counter()
+        self._turn_lock = asyncio.Lock()
+        self._turn_start = time.perf_counter()
+        self.response_cache = None
+        if ChatManagerConfig.USE_RESPONSE_CACHE:
+            self.response_cache = ResponseCache(ChatManagerConfig.RESPONSE_CACHE_TTLS,
+                                                ChatManagerConfig.RESPONSE_CACHE_MAX_BYTES,
+                                                skip_pattern=ChatManagerConfig.RESPONSE_CACHE_SKIP_PATTERN)
+
+    @property
+    def in_turn(self) -> bool:
+        """
+        Whether `achat_with_ai` is handling a turn of this session.
+        """
+        return self._turn_lock.locked()
+
+    def _create_completion(self, **kwargs):
+        """
+        Create a chat completion, counting it as an LLM round trip of the current turn.
+        """
+        self.turn_round_trips += 1
+        return self.openai_client.chat.completions.create(model=ChatManagerConfig.GPT_MODEL_MINI, **kwargs)
+
+    async def _acreate_completion(self, **kwargs):
+        """
+        Create a chat completion without blocking the event loop, counting it as a round trip of the current turn.
+        """
+        self.turn_round_trips += 1
+        return await self.async_openai_client.chat.completions.create(model=ChatManagerConfig.GPT_MODEL_MINI,
+                                                                      **kwargs)
+
+    async def achat_with_ai(self, user_message: str) -> str:
+        """
+        Handle a turn on the event loop, the asyncio counterpart of `chat_with_ai`.
+
+        Turns of one ChatManager run one at a time, as they share its history; use one ChatManager per session
+        to handle many sessions concurrently. The history store and the action handlers block, so they run on
+        worker threads.
+
+        Args:
+            user_message (str): The user's message.
+
+        Returns:
+            str: The assistant's spoken reply.
+        """
+        async with self._turn_lock:
+            if not ChatManagerConfig.USE_TOOL_CALLING:
+                # The two-step intent flow only exists as blocking calls
+                return await asyncio.to_thread(self.chat_with_ai, user_message)
+
+            self.turn_round_trips = 0
+            self._turn_start = time.perf_counter()
+            try:
+                cached_reply = await asyncio.to_thread(self._cached_reply, user_message)
+                if cached_reply is not None:
+                    return cached_reply
+                local_intent = self.intent_classifier.classify(user_message) if self.intent_classifier else None
+                if local_intent == "end chat":
+                    await asyncio.to_thread(self.end_chat)
+                    return ChatManagerConfig.END_CHAT_REPLY
+                local_reply = await asyncio.to_thread(self._resolve_locally, user_message, local_intent)
+                if local_reply is not None:
+                    return local_reply
+                action = await self.aresolve_intent_action(user_message, local_intent)
+                return await asyncio.to_thread(self._reply_to_action, user_message, action)
+            finally:
+                self.round_trips_per_turn[self.turn_round_trips] += 1
+
+    def chat_with_ai(self, user_message: str):
+        self.turn_round_trips = 0
+        self._turn_start = time.perf_counter()
+        try:
+            if ChatManagerConfig.USE_TOOL_CALLING:
+                return self.chat_with_tools(user_message)
+
+            cached_reply = self._cached_reply(user_message)
+            if cached_reply is not None:
+                return cached_reply
+            intention = self.detect_intent(user_message)
+            if intention == "play music":
+                return self.play_music(user_message)
+            elif intention == "end chat":
+                return self.end_chat()
+            else:
+                return self.get_general_response(user_message)
+        finally:
+            self.round_trips_per_turn[self.turn_round_trips] += 1
+
+    def register_action_handler(self, intent: str, handler: Callable[[dict, str], str]) -> None:
+        """
+        Register the function that carries out an action intent.
+
+        Args:
+            intent (str): One of the configured intents.
+            handler (Callable[[dict, str], str]): Called with the validated tool arguments and the user's message,
+                returns the spoken reply.
+        """
+        if intent not in self.intents:
+            raise ValueError(f"Unknown intent: {intent}")
+        self.action_handlers[intent] = handler
+
+    def register_local_resolver(self, intent: str, resolver: Callable[[str], Optional[str]]) -> None:
+        """
+        Register a function that carries out an action intent straight from the raw utterance, skipping the LLM.
+
+        Resolvers are tried when the local classifier picked their intent, e.g. to play a song that is already
+        in the song index.
+
+        Args:
+            intent (str): One of the configured intents.
+            resolver (Callable[[str], Optional[str]]): Called with the user's message, returns the spoken reply, or
+                None when it cannot handle the request locally.
+        """
+        if intent not in self.intents:
+            raise ValueError(f"Unknown intent: {intent}")
+        self.local_resolvers[intent] = resolver
+        self.local_resolution_latency[intent] = {"hit": LatencyStats(), "miss": LatencyStats()}
+
+    def _resolve_locally(self, user_message: str, intent: Optional[str]) -> Optional[str]:
+        resolver = self.local_resolvers.get(intent)
+        if resolver is None:
+            return None
+        reply = resolver(user_message)
+        if reply is None:
+            return None
+        self.local_resolution_latency[intent]["hit"].add(time.perf_counter() - self._turn_start)
+        self.chat_history.add_entry(user_message, reply)
+        return reply
+
+    def get_local_resolution_stats(self) -> dict:
+        """
+        Get how often the local resolvers spared the LLM, and how much time that saved.
+
+        Returns:
+            dict: Per intent, the `hits` and `misses` (turns that went to the LLM), their mean turn latency and the
+                estimated `saved_seconds`.
+        """
+        stats = {}
+        for intent, latency in self.local_resolution_latency.items():
+            hit, miss = latency["hit"].summary(), latency["miss"].summary()
+            saved = None
+            if hit["count"] and miss["count"]:
+                saved = hit["count"] * max(0.0, miss["mean"] - hit["mean"])
+            stats[intent] = {"hits": hit["count"], "misses": miss["count"], "hit_latency": hit["mean"],
+                             "miss_latency": miss["mean"], "saved_seconds": saved}
+        return stats
+
+    def chat_with_tools(self, user_message: str) -> str:
+        """
+        Handle a turn with one completion that picks the intent, extracts its arguments and replies.
+
+        Args:
+            user_message (str): The user's message.
+
+        Returns:
+            str: The assistant's spoken reply.
+        """
+        cached_reply = self._cached_reply(user_message)
+        if cached_reply is not None:
+            return cached_reply
+        local_intent = self.intent_classifier.classify(user_message) if self.intent_classifier else None
+        if local_intent == "end chat":
+            self.end_chat()
+            return ChatManagerConfig.END_CHAT_REPLY
+        local_reply = self._resolve_locally(user_message, local_intent)
+        if local_reply is not None:
+            return local_reply
+
+        return self._reply_to_action(user_message, self.resolve_intent_action(user_message, local_intent))
+
+    def stream_chat_with_ai(self, user_message: str) -> Iterator[str]:
+        """
+        Handle a turn like `chat_with_tools`, streaming the reply as it is generated.
+
+        Free-form answers are streamed token by token. Replies to actions are only known once the tool call is
+        complete and validated, so they come as a single piece.
+
+        Args:
+            user_message (str): The user's message.
 
-    def chat_with_ai(self, user_message: str) -> str:
-        intention = self.detect_intent(user_message)
-        if intention == "play_music":
-            return self.play_music(user_message)
-        elif intention == "end chat":
-            return self.end_chat()
-        elif intention == "general_response":
+        Yields:
+            str: Pieces of the assistant's spoken reply.
+        """
+        self.turn_round_trips = 0
+        self._turn_start = time.perf_counter()
+        try:
+            cached_reply = self._cached_reply(user_message)
+            if cached_reply is not None:
+                yield cached_reply
+                return
+            local_intent = self.intent_classifier.classify(user_message) if self.intent_classifier else None
+            if local_intent == "end chat":
+                self.end_chat()
+                yield ChatManagerConfig.END_CHAT_REPLY
+                return
+            local_reply = self._resolve_locally(user_message, local_intent)
+            if local_reply is not None:
+                yield local_reply
+                return
+            if local_intent in self._action_intents():
+                yield self._reply_to_action(user_message, self.resolve_intent_action(user_message, local_intent))
+                return
+
+            stream = self._create_completion(stream=True, **self._intent_request(user_message, local_intent))
+            content, tool_calls = [], {}
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content.append(delta.content)
+                    yield delta.content
+                # Tool calls arrive in pieces too: the name first, then the JSON arguments bit by bit
+                for tool_call in delta.tool_calls or []:
+                    call = tool_calls.setdefault(tool_call.index, {"name": "", "arguments": ""})
+                    call["name"] += tool_call.function.name or ""
+                    call["arguments"] += tool_call.function.arguments or ""
+
+            text = "".join(content)
+            if not tool_calls:
+                self.chat_history.add_entry(user_message, text)
+                self._cache_reply(user_message, IntentAction(local_intent or "general", reply=text), text)
+                return
+            call = tool_calls[min(tool_calls)]
+            action = self._action_from_tool_call(user_message, call["name"], call["arguments"], text or None,
+                                                 local_intent)
+            reply = self._reply_to_action(user_message, action)
+            if reply != text:
+                yield reply
+        finally:
+            self.round_trips_per_turn[self.turn_round_trips] += 1
+
+    def _reply_to_action(self, user_message: str, action: IntentAction) -> str:
+        """
+        Carry out an action and record the turn.
+
+        Returns:
+            str: The spoken reply, from the action handler when one is registered.
+        """
+        if action.intent == "end chat":
+            self.end_chat()
+            return ChatManagerConfig.END_CHAT_REPLY
+
+        if action.intent in self.action_handlers:
+            # Handler replies report what was just done, replaying them would skip doing it
+            reply = self.action_handlers[action.intent](action.arguments, user_message) or \
+                ChatManagerConfig.ACTION_ACKNOWLEDGEMENT
+            self.chat_history.add_entry(user_message, reply)
+        elif not action.reply:
+            # Nothing can carry the intent out and the model did not answer either
             return self.get_general_response(user_message)
+        else:
+            reply = action.reply
+            self.chat_history.add_entry(user_message, reply)
+            self._cache_reply(user_message, action, reply)
+        if action.intent in self.local_resolution_latency:
+            self.local_resolution_latency[action.intent]["miss"].add(time.perf_counter() - self._turn_start)
+        return reply
+
+    def _cache_context(self, intent: str) -> str:
+        """
+        Get the context a cached reply of an intent is only valid in: the date for date-dependent intents.
+        """
+        return date.today().isoformat() if intent in ChatManagerConfig.RESPONSE_CACHE_DATED_INTENTS else ""
+
+    def _cached_reply(self, user_message: str) -> Optional[str]:
+        """
+        Answer a turn from the response cache, recording it in the history like any other turn.
+
+        Returns:
+            Optional[str]: The cached reply, or None on a miss (or when the cache is off).
+        """
+        if not self.response_cache:
+            return None
+        cached = self.response_cache.get(user_message, self._cache_context)
+        if cached is None:
+            return None
+        logger.info(f"Answered from the response cache, saving ~{cached.latency:.2f}s.")
+        self.chat_history.add_entry(user_message, cached.reply)
+        return cached.reply
+
+    def _cache_reply(self, user_message: str, action: IntentAction, reply: str) -> None:
+        if self.response_cache and action.cacheable:
+            self.response_cache.put(user_message, action.intent, reply, self._cache_context(action.intent),
+                                    latency=time.perf_counter() - self._turn_start)
+
+    def _action_intents(self) -> list[str]:
+        """
+        Get the intents offered to the model as tools: the ones with a registered handler, and ending the chat.
+        """
+        return [intent for intent in self.intents if intent in self.action_handlers or intent == "end chat"]
+
+    def _intent_request(self, user_message: str, intent: Optional[str] = None) -> dict:
+        """
+        Build the completion parameters that let the model pick an intent and reply in one go.
+
+        Only intents that can be carried out are offered. The tool of a locally classified intent is forced; other
+        intents the classifier picked leave the choice to the model, which can still answer in plain text.
+        """
+        messages = [{"role": "system", "content": ChatManagerConfig.TOOL_CALLING_PROMPT}] + \
+            self.chat_history.get_history() + [{"role": "user", "content": user_message}]
+        action_intents = self._action_intents()
+        tools = tool_definitions(action_intents)
+        if intent in TEXT_INTENTS or not tools:
+            return {"messages": messages}
+        if intent in action_intents:
+            tool_choice = {"type": "function", "function": {"name": tool_name(intent)}}
+        else:
+            tool_choice = "auto"
+        return {"messages": messages, "tools": tools, "tool_choice": tool_choice}
 
-    def get_general_response(self, user_message: str) -> list:
+    def _action_from_tool_call(self, user_message: str, name: str, raw_arguments: str, reply: Optional[str],
+                               intent: Optional[str] = None) -> IntentAction:
+        """
+        Validate a tool call and turn it into an action.
+
+        Returns:
+            IntentAction: The called intent with validated arguments, or a request to repeat if validation failed.
+        """
+        try:
+            tool_intent = intent_for_tool(name, self._action_intents())
+            arguments = validate_arguments(tool_intent, raw_arguments)
+        except ToolArgumentsError as e:
+            logger.warning(f"Rejected tool call {name}: {e}")
+            return IntentAction(intent or "general", reply=ChatManagerConfig.INVALID_ARGUMENTS_REPLY, cacheable=False)
+
+        if self.intent_classifier and intent is None:
+            self.intent_classifier.remember(user_message, tool_intent)
+        return IntentAction(tool_intent, arguments, reply)
+
+    def resolve_intent_action(self, user_message: str, intent: Optional[str] = None) -> IntentAction:
+        """
+        Get the intent, its arguments and the reply from a single tool-calling completion.
+
+        Args:
+            user_message (str): The user's message.
+            intent (str, optional): An intent already known from the local classifier; its tool is then forced when
+                it has a handler, or no tools are offered at all for text intents.
+
+        Returns:
+            IntentAction: The intent with validated arguments. Arguments that fail validation are logged and the
+                reply asks the user to repeat themselves.
+        """
+        completion = self._create_completion(**self._intent_request(user_message, intent))
+        return self._action_from_message(user_message, completion.choices[0].message, intent)
+
+    async def aresolve_intent_action(self, user_message: str, intent: Optional[str] = None) -> IntentAction:
+        """
+        The asyncio counterpart of `resolve_intent_action`.
+        """
+        # The history is loaded from the store on first use
+        request = await asyncio.to_thread(self._intent_request, user_message, intent)
+        completion = await self._acreate_completion(**request)
+        return self._action_from_message(user_message, completion.choices[0].message, intent)
+
+    def _action_from_message(self, user_message: str, message, intent: Optional[str] = None) -> IntentAction:
+        if intent in TEXT_INTENTS:
+            return IntentAction(intent, reply=message.content)
+        if not message.tool_calls:
+            # Answers to a classified intent without a handler, e.g. the time, are cached under that intent's TTL
+            return IntentAction(intent or "general", reply=message.content)
+
+        tool_call = message.tool_calls[0]
+        return self._action_from_tool_call(user_message, tool_call.function.name, tool_call.function.arguments,
+                                           message.content, intent)
+
+    def get_round_trip_stats(self) -> dict:
+        """
+        Get how many LLM round trips the turns took.
+
+        Returns:
+            dict: `turns`, `round_trips`, `mean_per_turn` and a `per_turn` histogram (round trips -> turns).
+        """
+        turns = sum(self.round_trips_per_turn.values())
+        round_trips = sum(count * turns_count for count, turns_count in self.round_trips_per_turn.items())
+        return {"turns": turns, "round_trips": round_trips,
+                "mean_per_turn": round_trips / turns if turns else None,
+                "per_turn": dict(sorted(self.round_trips_per_turn.items()))}
+
+    def summarize_history(self, summary: str, messages: list) -> str:
+        """
+        Fold evicted turns into the running summary of the conversation.
+
+        Runs on the history's background thread, so it is not counted as a round trip of the current turn.
+
+        Args:
+            summary (str): The summary so far, empty at first.
+            messages (list): The evicted messages, oldest first.
+
+        Returns:
+            str: The updated summary.
+        """
+        transcript = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+        completion = self.openai_client.chat.completions.create(
+            model=ChatManagerConfig.GPT_MODEL_MINI,
+            max_tokens=ChatManagerConfig.HISTORY_SUMMARY_MAX_TOKENS,
+            messages=[{"role": "system", "content": ChatManagerConfig.HISTORY_SUMMARY_PROMPT},
+                      {"role": "user", "content": f"Summary so far: {summary or '(none)'}\n\n"
+                                                  f"New messages:\n{transcript}"}]
+        )
+        return completion.choices[0].message.content
+
+    def get_general_response(self, user_message: str) -> str:
         """
         Get a general response from the assistant.
 
@@ -31,14 +473,35 @@ class ChatManager:
         Returns:
             str: The assistant's response.
         """
-        ai_response = self.openai_client.chat.completions.create(
-            model=ChatManagerConfig.GPT_MODEL_MINI,
+        ai_response = self._create_completion(
             messages=self.chat_history.get_history() + [{"role": "user", "content": user_message}]
         )
-        self.chat_history.add_entry(user_message, ai_response)
-        return self.chat_history.get_history()
+        reply = ai_response.choices[0].message.content
+        self.chat_history.add_entry(user_message, reply)
+        self._cache_reply(user_message, IntentAction("general", reply=reply), reply)
+        return reply
 
     def detect_intent(self, user_input: str) -> str:
+        """
+        Detect the user's intention, locally when possible and with the LLM otherwise.
+
+        Args:
+            user_input (str): The user's message.
+
+        Returns:
+            str: One of the configured intents.
+        """
+        if self.intent_classifier:
+            intent = self.intent_classifier.classify(user_input)
+            if intent is not None:
+                return intent
+
+        intent = self.detect_intent_with_llm(user_input)
+        if self.intent_classifier and intent in self.intents:
+            self.intent_classifier.remember(user_input, intent)
+        return intent
+
+    def detect_intent_with_llm(self, user_input: str) -> str:
         system_prompt = f"""
         You are a personal assistant. Here are the possible user intentions: {', '.join(self.intents)}.
         Your response should only contain the user intention without any other words.
@@ -49,19 +512,23 @@ class ChatManager:
         User input: "{user_input}"
         """
 
-        completion = self.openai_client.chat.completions.create(
-            model=ChatManagerConfig.GPT_MODEL_MINI,
+        completion = self._create_completion(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
         )
 
-        # Extract the model's response
+        # Extract the model's response, tolerating casing and punctuation around the intent name
         assistant_response = completion.choices[0].message.content
+        normalized_response = normalize_utterance(assistant_response)
+        for intent in self.intents:
+            if normalize_utterance(intent) == normalized_response:
+                return intent
+        logger.warning(f"LLM answered with an unknown intent: {assistant_response}")
         return assistant_response
 
-    def play_music(self, user_message: str) -> list:
+    def play_music(self, user_message: str) -> str:
         """
         Play music based on the user's message.
 
@@ -77,25 +544,31 @@ class ChatManager:
         Instructions:
         
         If the user explicitly states the name of a song and artist, respond with:
-        { "song": "[Song Name]", "artist": "[Artist Name]" }
+        {{ "song": "[Song Name]", "artist": "[Artist Name]" }}
         If the user only provides the artist name, select one of their popular songs and respond with the same JSON format:
-        { "song": "[Song Name]", "artist": "[Artist Name]" }
+        {{ "song": "[Song Name]", "artist": "[Artist Name]" }}
         Do not play the song; simply respond with the JSON output of the song title and artist name.
         Examples:
         
         User Message: "Play 'Shape of You' by Ed Sheeran."
-        Response: { "song": "Shape of You", "artist": "Ed Sheeran" }
+        Response: {{ "song": "Shape of You", "artist": "Ed Sheeran" }}
         User Message: "Play something by Taylor Swift."
-        Response: { "song": "Love Story", "artist": "Taylor Swift" }
+        Response: {{ "song": "Love Story", "artist": "Taylor Swift" }}
         User message: {user_message}
         """
-        ai_response = self.openai_client.chat.completions.create(
-            model=ChatManagerConfig.GPT_MODEL_MINI,
+        ai_response = self._create_completion(
             messages=self.chat_history.get_history() + [{"role": "user", "content": prompt}]
         )
-        self.chat_history.add_entry(user_message, ai_response)
-        return self.chat_history.get_history()
+        reply = ai_response.choices[0].message.content
+        self.chat_history.add_entry(user_message, reply)
+        return reply
 
     def end_chat(self) -> None:
         self.chat_history.clear_history()
 
+    def close(self) -> None:
+        """
+        Release the session, e.g. when it is evicted. Its persisted history is reloaded by the next ChatManager.
+        """
+        self.chat_history.close()
+
@@ -1,23 +1,70 @@
-from typing import Optional
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from chat_manager.history_store import HistoryStore
 from utils.logger import JarvisLogger
 
 logger = JarvisLogger('history')
 
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and separators the chat format adds around every message
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a message.
+
+    Uses the rule of thumb of about four characters per token for English text, which is close enough to keep
+    the prompt under a budget without a tokenizer on the hot path.
+
+    Args:
+        text (str): The message content.
+
+    Returns:
+        int: The estimated token count, including the per-message overhead.
+    """
+    return (len(text) + 3) // 4 + MESSAGE_OVERHEAD_TOKENS
+
 
 class History:
     """
     A class to manage the conversation history.
+
+    The history keeps a running token count that is updated on every entry. When it grows past the token budget,
+    the oldest turns are evicted and, if a summarizer is given, folded into a summary message on a background
+    thread, so the prompt stays bounded however long the session runs.
+
+    With a store, every turn and summary is also persisted under the session id, and the last window of the
+    session is loaded from the store the first time the history is used.
     """
 
-    def __init__(self, chat_history: Optional[list[list]] = None):
+    def __init__(self, chat_history: Optional[list[list]] = None, token_budget: Optional[int] = None,
+                 summarizer: Optional[Callable[[str, list], str]] = None, store: Optional[HistoryStore] = None,
+                 session_id: str = "default"):
         """
         Initialize the History class.
 
         Args:
             chat_history (list[list], optional): A list of two-element lists representing user and bot messages from Gradio.
+            token_budget (int, optional): Maximum estimated tokens of the turns kept verbatim. Unbounded when not given.
+            summarizer (Callable[[str, list], str], optional): Called with the current summary and the evicted
+                messages, returns the updated summary. Evicted turns are dropped when not given.
+            store (HistoryStore, optional): Persistent store of the session. Memory-only when not given.
+            session_id (str): The session this history belongs to in the store.
         """
-        self.history = []
-        for single_message in chat_history:
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        self.history = deque()  # (user message, assistant message, tokens) per turn
+        self.token_count = 0
+        self.summary = ""
+        self._summary_tokens = 0
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped on clear, so summaries of a cleared conversation are discarded
+        self._summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summarizer")
+        self.store = store
+        self.session_id = session_id
+        self._loaded = store is None
+        for single_message in chat_history or []:
             self.add_entry(single_message[0], single_message[1])
 
     def add_entry(self, user_message: str, bot_message: str) -> None:
@@ -28,21 +75,116 @@ class History:
             user_message (str): The user's message.
             bot_message (str): The bot's response.
         """
-        self.history.append({"role": "user", "content": user_message})
-        self.history.append({"role": "assistant", "content": bot_message})
+        tokens = count_tokens(user_message) + count_tokens(bot_message)
+        self._ensure_loaded()
+        if self.store:
+            self.store.append_turn(self.session_id, user_message, bot_message, tokens)
+        with self._lock:
+            self.history.append(({"role": "user", "content": user_message},
+                                 {"role": "assistant", "content": bot_message}, tokens))
+            self.token_count += tokens
+            evicted = self._trim()
+            generation = self._generation
+        if evicted and self.summarizer:
+            self._summary_executor.submit(self._summarize, evicted, generation)
+
+    def _ensure_loaded(self) -> None:
+        """
+        Load the session's summary and last window of turns from the store on first use.
+        """
+        if self._loaded:
+            return
+        summary = self.store.load_summary(self.session_id)
+        window = self.store.load_window(self.session_id, self.token_budget)
+        with self._lock:
+            if self._loaded:
+                return
+            self.history.extend(({"role": "user", "content": user_message},
+                                 {"role": "assistant", "content": bot_message}, tokens)
+                                for user_message, bot_message, tokens in window)
+            self.token_count += sum(tokens for _, _, tokens in window)
+            self.summary = summary
+            self._summary_tokens = count_tokens(summary) if summary else 0
+            self._loaded = True
+        if window:
+            logger.info(f"Loaded {len(window)} turns of session '{self.session_id}' from the store.")
+
+    def _trim(self) -> list:
+        """
+        Evict the oldest turns until the kept turns fit the budget. The newest turn is always kept.
+
+        Returns:
+            list: The evicted messages, oldest first.
+        """
+        evicted = []
+        if self.token_budget is None:
+            return evicted
+        while self.token_count > self.token_budget and len(self.history) > 1:
+            user_message, bot_message, tokens = self.history.popleft()
+            self.token_count -= tokens
+            evicted.extend([user_message, bot_message])
+        if evicted:
+            logger.info(f"Evicted {len(evicted) // 2} turns from the chat history "
+                        f"({self.token_count} tokens kept).")
+        return evicted
+
+    def _summarize(self, evicted: list, generation: int) -> None:
+        try:
+            summary = self.summarizer(self.summary, evicted)
+        except Exception as e:
+            logger.error(f"Failed to summarize the chat history: {e}")
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self.summary = summary
+            self._summary_tokens = count_tokens(summary)
+            if self.store:
+                self.store.save_summary(self.session_id, summary)
 
     def get_history(self) -> list:
         """
         Get the conversation history.
 
         Returns:
-            list: The conversation history.
+            list: The summary of the evicted turns, if any, followed by the kept messages.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            messages = [{"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"}] \
+                if self.summary else []
+            for user_message, bot_message, _ in self.history:
+                messages.extend([user_message, bot_message])
+            return messages
+
+    def get_token_count(self) -> int:
         """
-        return self.history
+        Get the estimated size of the prompt `get_history` returns.
+
+        Returns:
+            int: Estimated tokens of the kept turns plus the summary.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return self.token_count + self._summary_tokens
 
     def clear_history(self) -> None:
         """
         Clear the conversation history.
         """
-        self.history = []
+        with self._lock:
+            self.history = deque()
+            self.token_count = 0
+            self.summary = ""
+            self._summary_tokens = 0
+            self._generation += 1
+            self._loaded = True
+        if self.store:
+            self.store.clear_session(self.session_id)
         logger.info("chat history cleared...")
+
+    def close(self) -> None:
+        """
+        Stop the summarizer thread once the pending summaries are done, without waiting for them.
+        """
+        self._summary_executor.shutdown(wait=False)
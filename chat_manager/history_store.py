@@ -0,0 +1,176 @@
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from utils.logger import JarvisLogger
+
+logger = JarvisLogger('HistoryStore')
+
+
+class HistoryStore:
+    """
+    A SQLite store of conversation turns, keyed by session.
+
+    Turns are only ever appended, one indexed INSERT each. Clearing a session appends a marker (the id of its last
+    turn) instead of deleting rows, and `compact` removes cleared, old and idle data in bulk. Sessions are read
+    newest-first up to a token budget, so loading one never scans its whole past.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Initialize the HistoryStore class.
+
+        Args:
+            db_path (str): Path to the SQLite database, created if missing (":memory:" for a throwaway store).
+        """
+        self.db_path = db_path
+        self._connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS turns (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    user_message TEXT NOT NULL,
+                    bot_message TEXT NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    created_at REAL NOT NULL)""")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS turns_by_session ON turns (session_id, id)")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL DEFAULT '',
+                    cleared_through INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL)""")
+
+    def _touch(self, session_id: str) -> None:
+        self._connection.execute("""
+            INSERT INTO sessions (session_id, updated_at) VALUES (?, ?)
+            ON CONFLICT (session_id) DO UPDATE SET updated_at = excluded.updated_at""", (session_id, time.time()))
+
+    def append_turn(self, session_id: str, user_message: str, bot_message: str, tokens: int) -> None:
+        """
+        Append a turn to a session.
+
+        Args:
+            session_id (str): The session the turn belongs to.
+            user_message (str): The user's message.
+            bot_message (str): The bot's response.
+            tokens (int): Estimated tokens of the turn.
+        """
+        with self._lock:
+            self._connection.execute("BEGIN")
+            self._connection.execute(
+                "INSERT INTO turns (session_id, user_message, bot_message, tokens, created_at) VALUES (?, ?, ?, ?, ?)",
+                (session_id, user_message, bot_message, tokens, time.time()))
+            self._touch(session_id)
+            self._connection.execute("COMMIT")
+
+    def load_window(self, session_id: str, token_budget: Optional[int] = None) -> list[tuple[str, str, int]]:
+        """
+        Load the latest turns of a session that fit a token budget.
+
+        Args:
+            session_id (str): The session to load.
+            token_budget (int, optional): Maximum total tokens of the loaded turns. The latest turn is always
+                loaded. Every turn since the session was last cleared is loaded when not given.
+
+        Returns:
+            list[tuple[str, str, int]]: (user message, bot message, tokens) per turn, oldest first.
+        """
+        with self._lock:
+            cursor = self._connection.execute("""
+                SELECT user_message, bot_message, tokens FROM turns
+                WHERE session_id = ? AND id > COALESCE(
+                    (SELECT cleared_through FROM sessions WHERE session_id = ?), 0)
+                ORDER BY id DESC""", (session_id, session_id))
+            window, total = [], 0
+            for user_message, bot_message, tokens in cursor:
+                if token_budget is not None and window and total + tokens > token_budget:
+                    break
+                window.append((user_message, bot_message, tokens))
+                total += tokens
+            cursor.close()
+        window.reverse()
+        return window
+
+    def load_summary(self, session_id: str) -> str:
+        """
+        Returns:
+            str: The summary of the session's evicted turns, empty if there is none.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT summary FROM sessions WHERE session_id = ?",
+                                           (session_id,)).fetchone()
+        return row[0] if row else ""
+
+    def save_summary(self, session_id: str, summary: str) -> None:
+        """
+        Replace the summary of a session's evicted turns.
+        """
+        with self._lock:
+            self._connection.execute("""
+                INSERT INTO sessions (session_id, summary, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT (session_id) DO UPDATE SET summary = excluded.summary, updated_at = excluded.updated_at""",
+                                     (session_id, summary, time.time()))
+
+    def clear_session(self, session_id: str) -> None:
+        """
+        Start a session over. Its turns stay on disk until the next `compact`, but are no longer loaded.
+        """
+        with self._lock:
+            self._connection.execute("""
+                INSERT INTO sessions (session_id, cleared_through, updated_at)
+                VALUES (?, COALESCE((SELECT MAX(id) FROM turns), 0), ?)
+                ON CONFLICT (session_id) DO UPDATE SET summary = '', cleared_through = excluded.cleared_through,
+                    updated_at = excluded.updated_at""", (session_id, time.time()))
+
+    def list_sessions(self) -> dict[str, float]:
+        """
+        Returns:
+            dict[str, float]: The last activity time (epoch seconds) of every session.
+        """
+        with self._lock:
+            return dict(self._connection.execute("SELECT session_id, updated_at FROM sessions"))
+
+    def compact(self, keep_turns: int, max_idle_seconds: Optional[float] = None) -> int:
+        """
+        Delete the turns no session will load again.
+
+        Removes cleared turns and everything but the latest `keep_turns` turns of every session (older turns live
+        on in the session summary), and drops sessions idle for longer than `max_idle_seconds` altogether.
+
+        Args:
+            keep_turns (int): Number of latest turns kept per session.
+            max_idle_seconds (float, optional): Idle time after which a whole session is deleted.
+
+        Returns:
+            int: Number of deleted turns.
+        """
+        with self._lock:
+            self._connection.execute("BEGIN")
+            deleted = 0
+            if max_idle_seconds is not None:
+                idle_since = time.time() - max_idle_seconds
+                deleted += self._connection.execute("""
+                    DELETE FROM turns WHERE session_id IN (
+                        SELECT session_id FROM sessions WHERE updated_at < ?)""", (idle_since,)).rowcount
+                self._connection.execute("DELETE FROM sessions WHERE updated_at < ?", (idle_since,))
+            deleted += self._connection.execute("""
+                DELETE FROM turns WHERE id <= COALESCE(
+                    (SELECT cleared_through FROM sessions WHERE sessions.session_id = turns.session_id), 0)""").rowcount
+            deleted += self._connection.execute("""
+                DELETE FROM turns WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY id DESC) AS age FROM turns)
+                    WHERE age > ?)""", (keep_turns,)).rowcount
+            self._connection.execute("COMMIT")
+        logger.info(f"Compacted the chat history store, deleted {deleted} turns.")
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,203 @@
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.logger import JarvisLogger
+
+logger = JarvisLogger('IntentClassifier')
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def normalize_utterance(text: str) -> str:
+    """
+    Normalize an utterance so trivially different phrasings of the same command compare equal.
+
+    Args:
+        text (str): The raw user input.
+
+    Returns:
+        str: Lower-cased words without punctuation, separated by single spaces.
+    """
+    return " ".join(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def _features(normalized_text: str) -> List[str]:
+    words = normalized_text.split()
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+class IntentModel:
+    """
+    A small TF-IDF nearest-centroid classifier over a fixed set of intents.
+
+    Every intent is represented by the normalized mean of its example vectors, so prediction is a single
+    matrix-vector product over a vocabulary of a few hundred words and bigrams.
+    """
+
+    def __init__(self) -> None:
+        self.intents: List[str] = []
+        self._vocabulary: Dict[str, int] = {}
+        self._idf: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+
+    def _vectorize(self, normalized_text: str) -> np.ndarray:
+        vector = np.zeros(len(self._vocabulary))
+        for feature, count in Counter(_features(normalized_text)).items():
+            index = self._vocabulary.get(feature)
+            if index is not None:
+                vector[index] = count
+        vector *= self._idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def fit(self, examples: Dict[str, List[str]]) -> None:
+        """
+        Train the model from example utterances.
+
+        Args:
+            examples (Dict[str, List[str]]): Intent to a list of utterances expressing it.
+        """
+        documents = [(intent, normalize_utterance(text)) for intent, texts in examples.items() for text in texts]
+        document_frequency = Counter(feature for _, text in documents for feature in set(_features(text)))
+        self._vocabulary = {feature: index for index, feature in enumerate(sorted(document_frequency))}
+        self._idf = np.array([math.log((1 + len(documents)) / (1 + document_frequency[feature])) + 1
+                              for feature in sorted(document_frequency)])
+
+        self.intents = list(examples)
+        centroids = np.zeros((len(self.intents), len(self._vocabulary)))
+        for intent, text in documents:
+            centroids[self.intents.index(intent)] += self._vectorize(text)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        self._centroids = centroids / np.where(norms == 0, 1, norms)
+
+    def scores(self, normalized_text: str) -> Dict[str, float]:
+        """
+        Score an utterance against every intent.
+
+        Args:
+            normalized_text (str): An utterance normalized with `normalize_utterance`.
+
+        Returns:
+            Dict[str, float]: Cosine similarity (0-1) to every intent centroid.
+        """
+        if self._centroids is None:
+            return {}
+        similarities = self._centroids @ self._vectorize(normalized_text)
+        return dict(zip(self.intents, similarities.tolist()))
+
+
+class IntentClassifier:
+    """
+    Local intent classification that answers the common commands without an LLM round trip.
+
+    Utterances go through three tiers, cheapest first: an LRU cache of normalized utterances, keyword rules,
+    and the TF-IDF model. `classify` returns None when no tier is confident, and the caller is expected to ask
+    the LLM and hand its answer back through `remember`, so the same command is answered locally next time.
+    """
+
+    def __init__(self, intents: List[str], rules: Dict[str, List[str]], examples: Dict[str, List[str]],
+                 cache_size: int = 512, min_score: float = 0.35, min_margin: float = 0.1,
+                 model_only_intents: Optional[List[str]] = None) -> None:
+        """
+        Initialize the IntentClassifier class.
+
+        Args:
+            intents (List[str]): The intents the classifier may answer with.
+            rules (Dict[str, List[str]]): Intent to regular expressions matched against the normalized utterance.
+            examples (Dict[str, List[str]]): Intent to example utterances the model is trained on.
+            cache_size (int): Number of normalized utterances whose intent is remembered.
+            min_score (float): Minimum model similarity to answer without the LLM.
+            min_margin (float): Minimum lead of the best intent over the runner-up to answer without the LLM.
+            model_only_intents (List[str], optional): Intents the rules never pick, e.g. destructive ones. An
+                utterance matching their rules is left to the model's confidence check.
+        """
+        self.intents = intents
+        self.rules = {intent: [re.compile(pattern) for pattern in patterns]
+                      for intent, patterns in rules.items() if intent in intents}
+        self.model = IntentModel()
+        self.model.fit({intent: texts for intent, texts in examples.items() if intent in intents})
+        self.cache_size = cache_size
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.model_only_intents = set(model_only_intents or [])
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def _from_cache(self, normalized_text: str) -> Optional[str]:
+        with self._lock:
+            intent = self._cache.get(normalized_text)
+            if intent is not None:
+                self._cache.move_to_end(normalized_text)
+            return intent
+
+    def _match_rules(self, normalized_text: str) -> Optional[str]:
+        matched = [intent for intent, patterns in self.rules.items()
+                   if any(pattern.search(normalized_text) for pattern in patterns)]
+        return matched[0] if len(matched) == 1 and matched[0] not in self.model_only_intents else None
+
+    def _predict(self, normalized_text: str) -> Optional[str]:
+        ranked = sorted(self.model.scores(normalized_text).items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return None
+        best_intent, best_score = ranked[0]
+        runner_up_score = ranked[1][1] if len(ranked) > 1 else 0.0
+        if best_score >= self.min_score and best_score - runner_up_score >= self.min_margin:
+            return best_intent
+        return None
+
+    def classify(self, user_input: str) -> Optional[str]:
+        """
+        Classify an utterance locally.
+
+        Args:
+            user_input (str): The raw user input.
+
+        Returns:
+            Optional[str]: The intent, or None if the LLM should decide.
+        """
+        normalized_text = normalize_utterance(user_input)
+        intent = self._from_cache(normalized_text)
+        if intent is not None:
+            self.stats["cache"] += 1
+            return intent
+
+        for tier, classify_tier in (("rules", self._match_rules), ("model", self._predict)):
+            intent = classify_tier(normalized_text)
+            if intent is not None:
+                self.stats[tier] += 1
+                self.remember(user_input, intent)
+                logger.info(f"Intent '{intent}' picked locally by the {tier}.")
+                return intent
+
+        self.stats["fallback"] += 1
+        return None
+
+    def remember(self, user_input: str, intent: str) -> None:
+        """
+        Cache the intent of an utterance, evicting the least recently used one when the cache is full.
+
+        Args:
+            user_input (str): The raw user input.
+            intent (str): Its intent.
+        """
+        normalized_text = normalize_utterance(user_input)
+        with self._lock:
+            self._cache[normalized_text] = intent
+            self._cache.move_to_end(normalized_text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get how many utterances each tier answered.
+
+        Returns:
+            dict: Counts for `cache`, `rules`, `model` and `fallback` (sent to the LLM).
+        """
+        return {tier: self.stats[tier] for tier in ("cache", "rules", "model", "fallback")}
@@ -0,0 +1,166 @@
+import json
+import re
+from typing import Dict, List
+
+# Intents the assistant answers with plain text instead of a tool call
+TEXT_INTENTS = ["general"]
+
+# Arguments every action intent needs, declared as OpenAI function-calling tools
+INTENT_TOOLS: Dict[str, dict] = {
+    "set an alarm": {
+        "description": "Set an alarm.",
+        "parameters": {"type": "object",
+                       "properties": {"time": {"type": "string", "description": "When to ring, e.g. '07:30' or 'in 20 minutes'"},
+                                      "label": {"type": "string", "description": "Optional alarm label"}},
+                       "required": ["time"]},
+    },
+    "play music": {
+        "description": "Play a song. If only the artist is given, pick one of their popular songs.",
+        "parameters": {"type": "object",
+                       "properties": {"song": {"type": "string", "description": "Song name"},
+                                      "artist": {"type": "string", "description": "Artist name"}},
+                       "required": ["song", "artist"]},
+    },
+    "check the weather": {
+        "description": "Check the weather forecast.",
+        "parameters": {"type": "object",
+                       "properties": {"location": {"type": "string", "description": "City or place, empty for here"},
+                                      "day": {"type": "string", "description": "Day of the forecast, e.g. 'today'"}},
+                       "required": []},
+    },
+    "create a reminder": {
+        "description": "Create a reminder.",
+        "parameters": {"type": "object",
+                       "properties": {"text": {"type": "string", "description": "What to be reminded of"},
+                                      "time": {"type": "string", "description": "When to remind, if said"}},
+                       "required": ["text"]},
+    },
+    "send a message": {
+        "description": "Send a text message to a contact.",
+        "parameters": {"type": "object",
+                       "properties": {"recipient": {"type": "string", "description": "Contact name"},
+                                      "message": {"type": "string", "description": "Message body"}},
+                       "required": ["recipient", "message"]},
+    },
+    "call someone": {
+        "description": "Place a phone call to a contact.",
+        "parameters": {"type": "object",
+                       "properties": {"contact": {"type": "string", "description": "Contact name or number"}},
+                       "required": ["contact"]},
+    },
+    "search the web": {
+        "description": "Search the web.",
+        "parameters": {"type": "object",
+                       "properties": {"query": {"type": "string", "description": "Search query"}},
+                       "required": ["query"]},
+    },
+    "control smart home devices": {
+        "description": "Control a smart home device.",
+        "parameters": {"type": "object",
+                       "properties": {"device": {"type": "string", "description": "Device name, e.g. 'kitchen lights'"},
+                                      "action": {"type": "string", "enum": ["on", "off", "set"]},
+                                      "value": {"type": "string", "description": "Target value for 'set', e.g. '22'"}},
+                       "required": ["device", "action"]},
+    },
+    "get the news": {
+        "description": "Read the latest news.",
+        "parameters": {"type": "object",
+                       "properties": {"topic": {"type": "string", "description": "Optional news topic"}},
+                       "required": []},
+    },
+    "get current time": {
+        "description": "Tell the current time.",
+        "parameters": {"type": "object", "properties": {}, "required": []},
+    },
+    "end chat": {
+        "description": "End the conversation when the user says goodbye.",
+        "parameters": {"type": "object", "properties": {}, "required": []},
+    },
+}
+
+_JSON_TYPES = {"string": str, "integer": int, "number": (int, float), "boolean": bool}
+
+
+class ToolArgumentsError(ValueError):
+    """Raised when the arguments of a tool call do not match the tool's schema."""
+
+
+def tool_name(intent: str) -> str:
+    """
+    Get the function name an intent is declared under ("play music" -> "play_music").
+    """
+    return re.sub(r"[^a-z0-9]+", "_", intent.lower()).strip("_")
+
+
+def tool_definitions(intents: List[str]) -> List[dict]:
+    """
+    Build the `tools` parameter of a chat completion for the given intents.
+
+    Args:
+        intents (List[str]): The intents the assistant may pick from.
+
+    Returns:
+        List[dict]: One function tool per action intent.
+    """
+    return [{"type": "function",
+             "function": {"name": tool_name(intent), **INTENT_TOOLS[intent]}}
+            for intent in intents if intent in INTENT_TOOLS]
+
+
+def intent_for_tool(name: str, intents: List[str]) -> str:
+    """
+    Map a tool name back onto its intent.
+
+    Raises:
+        ToolArgumentsError: If no intent is declared under that name.
+    """
+    for intent in intents:
+        if intent in INTENT_TOOLS and tool_name(intent) == name:
+            return intent
+    raise ToolArgumentsError(f"Unknown tool: {name}")
+
+
+def validate_arguments(intent: str, raw_arguments: str) -> dict:
+    """
+    Parse and validate the JSON arguments of a tool call against the intent's schema.
+
+    Unknown keys are dropped and strings are stripped, so the caller only ever sees declared arguments.
+
+    Args:
+        intent (str): The intent whose tool was called.
+        raw_arguments (str): The JSON arguments string returned by the model.
+
+    Returns:
+        dict: The validated arguments.
+
+    Raises:
+        ToolArgumentsError: If the arguments are not a JSON object, a required argument is missing or empty,
+            or an argument has the wrong type or a value outside its enum.
+    """
+    try:
+        arguments = json.loads(raw_arguments or "{}")
+    except json.JSONDecodeError as e:
+        raise ToolArgumentsError(f"Arguments of '{intent}' are not valid JSON: {e}") from e
+    if not isinstance(arguments, dict):
+        raise ToolArgumentsError(f"Arguments of '{intent}' must be a JSON object.")
+
+    schema = INTENT_TOOLS[intent]["parameters"]
+    validated = {}
+    for name, spec in schema["properties"].items():
+        value = arguments.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            continue
+        expected_type = _JSON_TYPES.get(spec.get("type"))
+        if expected_type and (not isinstance(value, expected_type) or
+                              (spec["type"] != "boolean" and isinstance(value, bool))):
+            raise ToolArgumentsError(f"Argument '{name}' of '{intent}' must be of type {spec['type']}.")
+        if "enum" in spec and value not in spec["enum"]:
+            raise ToolArgumentsError(f"Argument '{name}' of '{intent}' must be one of {spec['enum']}.")
+        validated[name] = value
+
+    missing = [name for name in schema["required"] if name not in validated]
+    if missing:
+        raise ToolArgumentsError(f"'{intent}' is missing the required arguments: {', '.join(missing)}")
+    return validated
@@ -0,0 +1,135 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from chat_manager.intent_classifier import normalize_utterance
+
+ENTRY_OVERHEAD_BYTES = 200  # Rough size of the entry object and dictionary slot around the strings
+
+
+@dataclass
+class CachedResponse:
+    intent: str
+    reply: str
+    context: str
+    expires_at: float
+    latency: float  # Seconds it took to produce the reply, i.e. what a hit saves
+    size: int
+
+
+class ResponseCache:
+    """
+    An LRU cache of assistant replies keyed by normalized utterance, with a time-to-live per intent.
+
+    Only intents with a TTL are cached, so anything time-sensitive or with side effects is left out by simply not
+    listing it. Entries are stored with a context string (e.g. the date) and only served while the context still
+    matches. The cache evicts the least recently used entries to stay under its memory cap.
+    """
+
+    def __init__(self, ttls: Dict[str, float], max_bytes: int, skip_pattern: Optional[str] = None) -> None:
+        """
+        Initialize the ResponseCache class.
+
+        Args:
+            ttls (Dict[str, float]): Seconds a reply stays fresh, per intent. Intents not listed are never cached.
+            max_bytes (int): Approximate memory cap of the cached entries.
+            skip_pattern (str, optional): Regular expression of utterances that depend on the earlier conversation
+                (e.g. pronouns), which are neither served from nor stored in the cache.
+        """
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self.skip_pattern = re.compile(skip_pattern) if skip_pattern else None
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "skipped": 0,
+                      "saved_seconds": 0.0}
+
+    def is_cacheable(self, normalized_text: str) -> bool:
+        return bool(normalized_text) and not (self.skip_pattern and self.skip_pattern.search(normalized_text))
+
+    def _remove(self, key: str) -> None:
+        self.size -= self._entries.pop(key).size
+
+    def get(self, user_message: str, context_for: Callable[[str], str]) -> Optional[CachedResponse]:
+        """
+        Look up the cached reply to an utterance.
+
+        Args:
+            user_message (str): The raw user input.
+            context_for (Callable[[str], str]): Gives the current context of an intent, compared against the
+                context the entry was stored with.
+
+        Returns:
+            Optional[CachedResponse]: The fresh cached response, or None on a miss.
+        """
+        normalized_text = normalize_utterance(user_message)
+        if not self.is_cacheable(normalized_text):
+            self.stats["skipped"] += 1
+            return None
+
+        with self._lock:
+            key = normalized_text
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if entry.expires_at <= time.time() or entry.context != context_for(entry.intent):
+                self._remove(key)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            self.stats["saved_seconds"] += entry.latency
+            return entry
+
+    def put(self, user_message: str, intent: str, reply: str, context: str = "", latency: float = 0.0) -> bool:
+        """
+        Cache a reply, if its intent has a TTL.
+
+        Args:
+            user_message (str): The raw user input.
+            intent (str): The intent the reply answered.
+            reply (str): The assistant's reply.
+            context (str): The context the reply is valid in.
+            latency (float): Seconds it took to produce the reply.
+
+        Returns:
+            bool: Whether the reply was cached.
+        """
+        normalized_text = normalize_utterance(user_message)
+        ttl = self.ttls.get(intent)
+        if not ttl or not reply or not self.is_cacheable(normalized_text):
+            return False
+        size = ENTRY_OVERHEAD_BYTES + len(normalized_text) + len(reply) + len(context)
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            if normalized_text in self._entries:
+                self._remove(normalized_text)
+            self._entries[normalized_text] = CachedResponse(intent, reply, context, time.time() + ttl, latency, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+        return True
+
+    def get_stats(self) -> dict:
+        """
+        Get the cache effectiveness.
+
+        Returns:
+            dict: Hit, miss, expiry and eviction counts, the hit rate, the LLM latency saved by hits (`saved_seconds`)
+                and the current number of entries and bytes.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update(entries=len(self._entries), bytes=self.size)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else None
+        return stats
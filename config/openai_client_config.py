@@ -0,0 +1,11 @@
+from config.base_config import BaseConfig
+
+
+class OpenAIClientConfig(BaseConfig):
+    HTTP2 = True  # Multiplex concurrent requests over one connection (needs the h2 package)
+    MAX_CONNECTIONS = 20
+    MAX_KEEPALIVE_CONNECTIONS = 10
+    KEEPALIVE_EXPIRY = 60.0  # Seconds an idle connection is kept open
+    CONNECT_TIMEOUT = 5.0
+    READ_TIMEOUT = 60.0
+    MAX_RETRIES = 2
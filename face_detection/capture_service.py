@@ -0,0 +1,320 @@
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from face_detection.face_detection_config import FaceDetectionConfig
+from user_identifier.user_identifier_object import UserIdentifierObject
+from utils.logger import JarvisLogger
+from utils.metrics import LatencyStats
+
+config = FaceDetectionConfig()
+
+logger = JarvisLogger("CameraCaptureService")
+
+# Shared memory blocks a detection worker process has attached to, by name
+_attached_frames: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def detect_faces_in_shared_frame(memory_name: str, shape: Tuple[int, int, int, int], slot: int, scale: float,
+                                 model: str) -> Tuple[List[tuple], List[np.ndarray], float]:
+    """
+    Detect and encode the faces of a BGR frame in a shared memory slot. Runs in a detection worker process.
+
+    The frame is read in place from the (slots, height, width, 3) buffer, only the boxes and encodings are sent
+    back to the service.
+
+    Returns:
+        Tuple[List[tuple], List[np.ndarray], float]: The face boxes in full-resolution (top, right, bottom, left)
+            coordinates, their encodings and the CPU seconds the worker spent.
+    """
+    import face_recognition
+
+    cpu_start = time.process_time()
+    if memory_name not in _attached_frames:
+        _detach_removed_frames()
+        _attached_frames[memory_name] = shared_memory.SharedMemory(name=memory_name)
+    frame = np.ndarray(shape, dtype=np.uint8, buffer=_attached_frames[memory_name].buf)[slot]
+    rgb_small_frame = cv2.cvtColor(cv2.resize(frame, (0, 0), fx=scale, fy=scale), cv2.COLOR_BGR2RGB)
+    small_boxes = face_recognition.face_locations(rgb_small_frame, model=model)
+    boxes = [tuple(int(side / scale) for side in box) for box in small_boxes]
+    encodings = face_recognition.face_encodings(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), boxes) if boxes else []
+    return boxes, encodings, time.process_time() - cpu_start
+
+
+def _detach_removed_frames() -> None:
+    """
+    Close the shared memory blocks of cameras that were removed from the service, which unlinked them.
+    """
+    for name in list(_attached_frames):
+        try:
+            shared_memory.SharedMemory(name=name).close()
+        except FileNotFoundError:
+            _attached_frames.pop(name).close()
+
+
+class CameraReader:
+    """
+    Reads one camera on its own thread into a few shared memory slots, keeping only the latest frame.
+
+    A slot is either free, holding the latest frame, or being read by a detection worker. The reader always
+    writes into a free slot, so a slow detection never blocks the camera; a latest frame that was replaced
+    before a worker picked it up counts as dropped. A camera that stops delivering frames is reopened.
+    """
+
+    def __init__(self, name: str, source: Union[int, str]) -> None:
+        """
+        Initialize the CameraReader class.
+
+        Args:
+            name (str): Name of the camera, e.g. the room it watches.
+            source (Union[int, str]): OpenCV device index or stream URL.
+        """
+        self.name = name
+        self.source = source
+        self.memory: Optional[shared_memory.SharedMemory] = None
+        self.frames: Optional[np.ndarray] = None  # (slots, height, width, 3) view of the shared memory
+        self.latest_slot: Optional[int] = None
+        self.latest_time = 0.0
+        self.busy_slot: Optional[int] = None  # Slot a detection worker is reading
+        self.queue_age = LatencyStats()  # Seconds between capturing a frame and starting its detection
+        self.stats = {"frames": 0, "dropped_frames": 0, "read_failures": 0, "reconnects": 0, "detections": 0}
+        self._frame_times = deque(maxlen=60)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"camera-{name}", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop_event.set()
+        self._thread.join(timeout)
+        if self.memory is not None:
+            self.frames = None
+            self.memory.close()
+            self.memory.unlink()
+
+    def _allocate(self, frame: np.ndarray) -> None:
+        size = config.CAPTURE_FRAME_SLOTS * frame.nbytes
+        self.memory = shared_memory.SharedMemory(create=True, size=size)
+        self.frames = np.ndarray((config.CAPTURE_FRAME_SLOTS,) + frame.shape, dtype=np.uint8, buffer=self.memory.buf)
+        logger.info(f"[{self.name}] Capturing {frame.shape[1]}x{frame.shape[0]} frames.")
+
+    def _store(self, frame: np.ndarray) -> None:
+        if self.frames is None:
+            self._allocate(frame)
+        elif frame.shape != self.frames.shape[1:]:
+            frame = cv2.resize(frame, (self.frames.shape[2], self.frames.shape[1]))
+        with self._lock:
+            slot = next(slot for slot in range(config.CAPTURE_FRAME_SLOTS)
+                        if slot != self.latest_slot and slot != self.busy_slot)
+        self.frames[slot] = frame
+        now = time.perf_counter()
+        with self._lock:
+            if self.latest_slot is not None:
+                self.stats["dropped_frames"] += 1
+            self.latest_slot, self.latest_time = slot, now
+            self.stats["frames"] += 1
+            self._frame_times.append(now)
+
+    def take_latest(self) -> Optional[int]:
+        """
+        Hand the latest frame to a detection worker, unless one is already reading this camera.
+
+        Returns:
+            Optional[int]: The slot of the frame, or None if there is no new frame or a detection is in flight.
+        """
+        with self._lock:
+            if self.latest_slot is None or self.busy_slot is not None:
+                return None
+            self.busy_slot, self.latest_slot = self.latest_slot, None
+            self.queue_age.add(time.perf_counter() - self.latest_time)
+            return self.busy_slot
+
+    def release(self, detected: bool = True) -> None:
+        with self._lock:
+            self.busy_slot = None
+            if detected:
+                self.stats["detections"] += 1
+
+    def _run(self) -> None:
+        video_capture = cv2.VideoCapture(self.source)
+        failures = 0
+        while not self._stop_event.is_set():
+            ret, frame = video_capture.read()
+            if not ret:
+                self.stats["read_failures"] += 1
+                failures += 1
+                if failures >= config.CAPTURE_MAX_READ_FAILURES:
+                    logger.error(f"[{self.name}] No frames from camera {self.source}, reopening it.")
+                    video_capture.release()
+                    self._stop_event.wait(config.CAPTURE_REOPEN_DELAY)
+                    video_capture = cv2.VideoCapture(self.source)
+                    self.stats["reconnects"] += 1
+                    failures = 0
+                continue
+            failures = 0
+            self._store(frame)
+        video_capture.release()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            frame_times = list(self._frame_times)
+            stats = dict(self.stats)
+        stats["fps"] = (len(frame_times) - 1) / (frame_times[-1] - frame_times[0]) \
+            if len(frame_times) > 1 and frame_times[-1] > frame_times[0] else None
+        stats["queue_age"] = self.queue_age.summary()
+        return stats
+
+
+class CameraCaptureService:
+    """
+    Watches several cameras at once and identifies the people they see.
+
+    Every camera is read on its own `CameraReader` thread. A dispatcher hands the latest frame of each camera to
+    a pool of detection worker processes, passing only the name and slot of its shared memory buffer instead of
+    a pickled array, so detection scales across cores. Each camera has at most one detection in flight, so a
+    slow or busy camera never holds up the others. The faces are identified against the gallery in this process.
+    Cameras can be added and removed while the service runs.
+    """
+
+    def __init__(self, sources: Dict[str, Union[int, str]],
+                 on_identified: Optional[Callable[[str, List[str]], None]] = None,
+                 user_identifier: Optional[UserIdentifierObject] = None) -> None:
+        """
+        Initialize the CameraCaptureService class.
+
+        Args:
+            sources (Dict[str, Union[int, str]]): Camera name to its OpenCV device index or stream URL.
+            on_identified (Callable[[str, List[str]], None], optional): Called with the camera name and the
+                known people in a frame, whenever anyone known is seen.
+            user_identifier (UserIdentifierObject, optional): Holds the known faces. Loaded when not given.
+        """
+        self.readers = {name: CameraReader(name, source) for name, source in sources.items()}
+        self.on_identified = on_identified
+        self.user_identifier = user_identifier or UserIdentifierObject(config.KNOWN_FACE_PATH)
+        self.last_seen: Dict[str, Tuple[float, List[str]]] = {}  # Camera name to when and who was last seen
+        self.detection_cpu = LatencyStats()  # Worker CPU seconds per detection
+        self.pool = self._create_pool()
+        self._last_dispatch: Dict[str, float] = {}
+        self._readers_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="camera-dispatcher", daemon=True)
+
+    @staticmethod
+    def _create_pool() -> ProcessPoolExecutor:
+        # Spawned workers do not inherit the camera threads and locks of this process
+        return ProcessPoolExecutor(max_workers=config.CAPTURE_DETECTION_WORKERS,
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    def start(self) -> None:
+        for reader in self.readers.values():
+            reader.start()
+        self._dispatcher.start()
+        logger.info(f"Capturing {len(self.readers)} cameras with {config.CAPTURE_DETECTION_WORKERS} "
+                    f"detection workers.")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop_event.set()
+        self._dispatcher.join(timeout)
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        with self._readers_lock:
+            readers, self.readers = list(self.readers.values()), {}
+        for reader in readers:
+            reader.stop(timeout)
+
+    def add_camera(self, name: str, source: Union[int, str]) -> None:
+        """
+        Start capturing a camera, unless it is captured already.
+
+        Args:
+            name (str): Name of the camera.
+            source (Union[int, str]): OpenCV device index or stream URL.
+        """
+        with self._readers_lock:
+            if name in self.readers:
+                return
+            reader = self.readers[name] = CameraReader(name, source)
+        reader.start()
+        logger.info(f"[{name}] Camera added.")
+
+    def remove_camera(self, name: str, timeout: Optional[float] = None) -> None:
+        """
+        Stop capturing a camera. Waits for its reader thread to finish.
+
+        Args:
+            name (str): Name of the camera.
+            timeout (float, optional): Seconds to wait for the reader thread.
+        """
+        with self._readers_lock:
+            reader = self.readers.pop(name, None)
+            self._last_dispatch.pop(name, None)
+            self.last_seen.pop(name, None)
+        if reader is not None:
+            reader.stop(timeout)
+            logger.info(f"[{name}] Camera removed.")
+
+    def _dispatch(self) -> None:
+        while not self._stop_event.is_set():
+            now = time.perf_counter()
+            with self._readers_lock:
+                readers = list(self.readers.items())
+            for name, reader in readers:
+                if now - self._last_dispatch.get(name, 0.0) < config.CAPTURE_DETECTION_INTERVAL:
+                    continue
+                slot = reader.take_latest()
+                if slot is None:
+                    continue
+                self._last_dispatch[name] = now
+                try:
+                    future = self.pool.submit(detect_faces_in_shared_frame, reader.memory.name, reader.frames.shape,
+                                              slot, config.DETECTION_SCALE, config.DETECTION_MODEL)
+                except Exception as e:
+                    # The frame was taken, hand the slot back or the camera is never detected again
+                    reader.release(detected=False)
+                    logger.error(f"[{name}] Could not start a face detection: {e}")
+                    if isinstance(e, BrokenProcessPool):
+                        self.pool.shutdown(wait=False, cancel_futures=True)
+                        self.pool = self._create_pool()
+                    continue
+                future.add_done_callback(lambda done, reader=reader: self._on_detection(reader, done))
+            self._stop_event.wait(config.CAPTURE_DISPATCH_INTERVAL)
+
+    def _on_detection(self, reader: CameraReader, future) -> None:
+        reader.release()
+        if future.cancelled():
+            return
+        try:
+            boxes, encodings, cpu_time = future.result()
+        except Exception as e:
+            logger.error(f"[{reader.name}] Face detection failed: {e}")
+            return
+        self.detection_cpu.add(cpu_time)
+        identities = [match.identity for match in self.user_identifier.identify(encodings) if match]
+        if not identities:
+            return
+        self.last_seen[reader.name] = (time.time(), identities)
+        if self.on_identified:
+            try:
+                self.on_identified(reader.name, identities)
+            except Exception as e:
+                logger.error(f"[{reader.name}] Identification handler failed: {e}")
+
+    def get_stats(self) -> dict:
+        """
+        Returns:
+            dict: Per camera the capture FPS, the age of frames when their detection started, the dropped frames
+                and the read failures, plus the worker CPU time per detection.
+        """
+        with self._readers_lock:
+            readers = dict(self.readers)
+        return {"cameras": {name: reader.get_stats() for name, reader in readers.items()},
+                "detection_cpu": self.detection_cpu.summary()}
@@ -5,3 +5,23 @@ from config.base_config import BaseConfig
 class FaceDetectionConfig(BaseConfig):
     FACE_DETECTION_DIR: str = os.path.dirname(os.path.abspath(__file__))
     KNOWN_FACE_PATH: str = os.path.join(FACE_DETECTION_DIR, "known_faces")
+
+    # Adaptive capture pipeline: detect on a downscaled frame every DETECTION_INTERVAL frames and track in between
+    TARGET_FPS: float = 10.0  # Frames processed per second, the rest of the camera frames are skipped
+    DETECTION_SCALE: float = 0.25  # Detection runs on the frame resized by this factor
+    DETECTION_INTERVAL: int = 5  # Run the detector every Nth processed frame while faces are tracked
+    IDLE_DETECTION_INTERVAL: int = 10  # Run it every Nth processed frame while nobody is tracked, e.g. an empty room
+    DETECTION_MODEL: str = "hog"  # face_recognition model, "hog" (CPU) or "cnn"
+    TRACK_MATCH_IOU: float = 0.3  # Minimum overlap of a detection with a track to be the same face
+    TRACK_MAX_MISSES: int = 2  # Detections in a row that may miss a track before it is dropped
+    MAX_ENCODE_ATTEMPTS: int = 3  # Encodings of an unmatched track before it is taken as a stranger
+    MAX_READ_FAILURES: int = 30  # Failed reads in a row before passive_capture gives up on the camera
+
+    # Multi-camera capture service, see CameraCaptureService
+    CAPTURE_SERVICE_ENABLED: bool = False  # Start it with the server, for the active cameras of the registry
+    CAPTURE_DETECTION_WORKERS: int = max(1, (os.cpu_count() or 2) - 1)  # Detection processes
+    CAPTURE_DETECTION_INTERVAL: float = 0.5  # Minimum seconds between two detections of the same camera
+    CAPTURE_DISPATCH_INTERVAL: float = 0.01  # Seconds between checks for new frames
+    CAPTURE_FRAME_SLOTS: int = 3  # Shared memory frames per camera: being written, latest and being detected
+    CAPTURE_MAX_READ_FAILURES: int = 30  # Failed reads in a row before a camera is reopened
+    CAPTURE_REOPEN_DELAY: float = 2.0
@@ -1,18 +1,67 @@
+import itertools
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
 import cv2
 import face_recognition
 from face_detection.face_detection_config import FaceDetectionConfig
+from user_identifier.user_identifier_object import UserIdentifierObject
 from utils.logger import JarvisLogger
+from utils.metrics import LatencyStats
 
 config = FaceDetectionConfig()
 
 logger = JarvisLogger("FaceDetectionObject")
 
+Box = Tuple[int, int, int, int]  # (top, right, bottom, left), the face_recognition convention
+
+
+def box_iou(first: Box, second: Box) -> float:
+    """
+    Intersection over union of two (top, right, bottom, left) boxes.
+    """
+    top, bottom = max(first[0], second[0]), min(first[2], second[2])
+    left, right = max(first[3], second[3]), min(first[1], second[1])
+    intersection = max(0, bottom - top) * max(0, right - left)
+    area = (first[2] - first[0]) * (first[1] - first[3]) + (second[2] - second[0]) * (second[1] - second[3])
+    return intersection / (area - intersection) if area > intersection else 0.0
+
+
+def create_tracker():
+    """
+    Create the cheapest single-object tracker this OpenCV build offers: KCF (contrib builds), otherwise MIL.
+    """
+    for module in (cv2, getattr(cv2, "legacy", None)):
+        factory = getattr(module, "TrackerKCF_create", None) if module is not None else None
+        if factory:
+            return factory()
+    return cv2.TrackerMIL_create()
+
+
+@dataclass
+class FaceTrack:
+    track_id: int
+    box: Box
+    tracker: object
+    identity: Optional[str] = None  # The known person, once an encoding matched the gallery
+    encode_attempts: int = 0
+    misses: int = 0
+
+    @property
+    def needs_encoding(self) -> bool:
+        return self.identity is None and self.encode_attempts < config.MAX_ENCODE_ATTEMPTS
+
 
 class FaceDetectionObject:
     def __init__(self):
         self.known_face_path = config.KNOWN_FACE_PATH
-        self.known_face = face_recognition.load_image_file(self.known_face_path)
-        self.known_face_encoding = face_recognition.face_encodings(self.known_face)[0]
+        self.user_identifier = UserIdentifierObject(self.known_face_path)
+        self.tracks: List[FaceTrack] = []
+        self._track_ids = itertools.count()
+        self.detector_cpu = LatencyStats()  # CPU seconds of each detector run
+        self.stats = {"frames": 0, "detections": 0, "tracked_frames": 0, "idle_frames": 0, "encodings": 0,
+                      "detector_cpu": 0.0}
 
     def detected_face_flow(self):
         return self
@@ -23,25 +72,152 @@ class FaceDetectionObject:
         if face_locations:
             face_encodings = face_recognition.face_encodings(rgb_frame, face_locations)
 
-            for face_encoding in face_encodings:
-                matches = face_recognition.compare_faces([self.known_face_encoding], face_encoding)
-                if True in matches:
-                    return self.detected_face_flow()
+            if any(self.user_identifier.identify(face_encodings)):
+                return self.detected_face_flow()
+
+    def _detect(self, frame) -> List[Box]:
+        """
+        Run the detector on a downscaled copy of a BGR frame.
+
+        Returns:
+            List[Box]: The face boxes, in full-resolution coordinates.
+        """
+        small_frame = cv2.resize(frame, (0, 0), fx=config.DETECTION_SCALE, fy=config.DETECTION_SCALE)
+        rgb_small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+        cpu_start = time.thread_time()
+        small_boxes = face_recognition.face_locations(rgb_small_frame, model=config.DETECTION_MODEL)
+        cpu_time = time.thread_time() - cpu_start
+        self.detector_cpu.add(cpu_time)
+        self.stats["detections"] += 1
+        self.stats["detector_cpu"] += cpu_time
+        return [tuple(int(side / config.DETECTION_SCALE) for side in box) for box in small_boxes]
+
+    def _start_tracker(self, frame, box: Box):
+        top, right, bottom, left = box
+        tracker = create_tracker()
+        tracker.init(frame, (left, top, right - left, bottom - top))
+        return tracker
+
+    def _update_tracks(self, frame, detections: List[Box]) -> None:
+        """
+        Match fresh detections to the tracks, start tracks for new faces and drop the ones that are gone.
+        """
+        unmatched = list(detections)
+        for track in self.tracks:
+            best = max(unmatched, key=lambda box: box_iou(box, track.box), default=None)
+            if best is not None and box_iou(best, track.box) >= config.TRACK_MATCH_IOU:
+                unmatched.remove(best)
+                track.box, track.misses = best, 0
+                track.tracker = self._start_tracker(frame, best)
+            else:
+                track.misses += 1
+        self.tracks = [track for track in self.tracks if track.misses <= config.TRACK_MAX_MISSES]
+        for box in unmatched:
+            self.tracks.append(FaceTrack(next(self._track_ids), box, self._start_tracker(frame, box)))
+
+    def _follow_tracks(self, frame) -> None:
+        """
+        Move every track with its tracker, dropping the ones the tracker lost.
+        """
+        height, width = frame.shape[:2]
+        followed = []
+        for track in self.tracks:
+            found, (x, y, box_width, box_height) = track.tracker.update(frame)
+            if found:
+                track.box = (max(0, int(y)), min(width, int(x + box_width)), min(height, int(y + box_height)),
+                             max(0, int(x)))
+                followed.append(track)
+        self.tracks = followed
+        self.stats["tracked_frames"] += 1
+
+    def _identify_tracks(self, frame) -> bool:
+        """
+        Encode the tracks whose identity is not confirmed yet and match them against the gallery in one batch.
+
+        Returns:
+            bool: Whether a track is a known person.
+        """
+        # Only tracks the detector just found have a box accurate enough to encode
+        pending = [track for track in self.tracks if track.needs_encoding and track.misses == 0]
+        if pending:
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            encodings = face_recognition.face_encodings(rgb_frame, [track.box for track in pending])
+            self.stats["encodings"] += len(encodings)
+            for track, match in zip(pending, self.user_identifier.identify(encodings)):
+                track.encode_attempts += 1
+                if match:
+                    track.identity = match.identity
+                    logger.info(f"Identified {match.identity} (distance {match.distance:.2f}).")
+        return any(track.identity for track in self.tracks)
+
+    def process_frame(self, frame, detect: bool) -> bool:
+        """
+        Run one BGR frame through the pipeline: detect or track, then identify the unconfirmed faces.
+
+        Args:
+            frame: The BGR frame from OpenCV.
+            detect (bool): Run the detector on this frame instead of only moving the tracks. Without a
+                detection, a frame with nothing tracked is skipped.
+
+        Returns:
+            bool: Whether a known person is in the frame.
+        """
+        self.stats["frames"] += 1
+        if detect:
+            self._update_tracks(frame, self._detect(frame))
+            # Encode right after a detection, when the boxes are the most accurate
+            return self._identify_tracks(frame)
+        if not self.tracks:
+            self.stats["idle_frames"] += 1
+            return False
+        self._follow_tracks(frame)
+        return any(track.identity for track in self.tracks)
 
     def passive_capture(self):
         # Start the video capture
         video_capture = cv2.VideoCapture(0)
+        frame_period = 1.0 / config.TARGET_FPS
+        self.tracks = []
+        failures = 0
+        frames_until_detection = 0
 
         while True:
+            frame_start = time.perf_counter()
             # Grab a single frame from the video
             ret, frame = video_capture.read()
+            if not ret:
+                failures += 1
+                if failures >= config.MAX_READ_FAILURES:
+                    logger.error("No frames from the camera, stopping the capture.")
+                    break
+                continue
+            failures = 0
 
-            # Convert the frame from BGR (OpenCV default) to RGB (face_recognition uses RGB)
-            rgb_frame = frame[:, :, ::-1]
-
-            if self.detect_face(rgb_frame):
+            detect = frames_until_detection <= 0
+            if self.process_frame(frame, detect=detect):
+                self.detected_face_flow()
                 break
+            if detect:
+                # Look for faces less often while nobody is in view
+                frames_until_detection = config.DETECTION_INTERVAL if self.tracks else config.IDLE_DETECTION_INTERVAL
+            frames_until_detection -= 1
+
+            # Skip the camera frames in excess of the target rate, without decoding them
+            while time.perf_counter() - frame_start < frame_period:
+                video_capture.grab()
 
         # Release the camera and close windows
         video_capture.release()
         cv2.destroyAllWindows()
+        logger.info(f"Face pipeline stats: {self.get_pipeline_stats()}")
+
+    def get_pipeline_stats(self) -> dict:
+        """
+        Returns:
+            dict: Processed, detected, tracked and idle frame counts, encodings, and the detector CPU time per processed
+                frame and per detector run.
+        """
+        frames = self.stats["frames"]
+        return {**self.stats,
+                "detector_cpu_per_frame": self.stats["detector_cpu"] / frames if frames else None,
+                "detector_cpu_per_detection": self.detector_cpu.summary()}
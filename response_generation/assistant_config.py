@@ -0,0 +1,10 @@
+from config.base_config import BaseConfig
+
+
+class AssistantConfig(BaseConfig):
+    STREAM_RESPONSES = True  # Speak the reply sentence by sentence while it is still being generated
+    MIN_SENTENCE_LENGTH = 20  # Shorter sentences are merged with the next one before synthesis
+    # Keep listening for the wake word while speaking and stop talking when it is heard. Off by default, since
+    # without echo cancellation the assistant's own voice on the speakers can trigger it
+    BARGE_IN = False
+    USE_SPOTIFY = False  # Play music through Spotify (needs config/secrets/spotify_api_cred.json)
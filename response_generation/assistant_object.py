@@ -1,28 +1,94 @@
-from openai import OpenAI
+import threading
+import time
+from typing import Callable
+
+from response_generation.assistant_config import AssistantConfig
 from utils.logger import JarvisLogger
+from utils.metrics import LatencyStats
+from utils.text_chunking import iter_sentences
 from speech_to_text.stt_object import SpeechRecognizerObject
 from chat_manager.chat_manager_object import ChatManager
 from text_to_speech.tts_object import TTSObject
 
+config = AssistantConfig()
 logger = JarvisLogger('assistant')
 
 
 class AssistantObject:
-    openai_client: OpenAI = OpenAI()
-
     def __init__(self):
         self.stt_object = SpeechRecognizerObject()
         self.tts_object = TTSObject()
+        self.time_to_first_token = LatencyStats()
+        self.time_to_first_audio = LatencyStats()
 
     def conversation(self):
         chat_manager = ChatManager()
+        if config.USE_SPOTIFY:
+            from action_handling.spotify_api.spotify_api_object import SpotifyApiObject  # Reads the credentials
+            spotify = SpotifyApiObject()
+            chat_manager.register_local_resolver("play music", spotify.play_request)
+            chat_manager.register_action_handler("play music", spotify.play_music)
         while True:
             try:
                 audio = self.stt_object.record_audio()
-                user_input = self.stt_object.recognize_with_whisper(audio)
-                ai_response = chat_manager.chat_with_ai(user_input)
-                self.tts_object.talk(ai_response)
+                user_input = self.stt_object.recognize(audio, "whisper")
+                if config.STREAM_RESPONSES:
+                    self.speak(lambda: self.stream_response(chat_manager, user_input))
+                else:
+                    ai_response = chat_manager.chat_with_ai(user_input)
+                    self.speak(lambda: self.tts_object.talk(ai_response))
 
             except Exception as e:
                 logger.error("Error:", str(e))
 
+    def speak(self, speech: Callable[[], object]) -> None:
+        """
+        Run a blocking speech call, with the wake-word listener running alongside it when `BARGE_IN` is on.
+
+        Args:
+            speech (Callable[[], object]): Speaks through the TTS object and returns when it is done or interrupted.
+        """
+        if not config.BARGE_IN:
+            speech()
+            return
+
+        def barge_in(wake_word: str):
+            if self.tts_object.stop():
+                logger.info(f"Barge-in on '{wake_word}', speech stopped.")
+
+        done = threading.Event()
+        listener = threading.Thread(target=self.stt_object.watch_for_wake_word, args=(barge_in, done),
+                                    name="barge-in-listener", daemon=True)
+        listener.start()
+        try:
+            speech()
+        finally:
+            done.set()
+            listener.join()
+
+    def stream_response(self, chat_manager: ChatManager, user_input: str) -> None:
+        """
+        Speak the reply to a user input sentence by sentence while it is being generated.
+
+        Args:
+            chat_manager (ChatManager): The conversation to reply in.
+            user_input (str): The recognized user input.
+        """
+        turn_start = time.perf_counter()
+        marks = {}
+
+        def reply_deltas():
+            for delta in chat_manager.stream_chat_with_ai(user_input):
+                if "first_token" not in marks:
+                    marks["first_token"] = time.perf_counter() - turn_start
+                    self.time_to_first_token.add(marks["first_token"])
+                yield delta
+
+        def on_first_audio():
+            marks["first_audio"] = time.perf_counter() - turn_start
+            self.time_to_first_audio.add(marks["first_audio"])
+
+        self.tts_object.talk_stream(iter_sentences(reply_deltas(), config.MIN_SENTENCE_LENGTH), on_first_audio)
+        if "first_audio" in marks:
+            logger.info(f"Time to first token: {marks['first_token']:.2f}s, "
+                        f"time to first audio: {marks['first_audio']:.2f}s.")
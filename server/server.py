@@ -1,13 +1,40 @@
-from typing import List
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
 
 import uvicorn
 from fastapi import FastAPI, HTTPException, Depends, status
 
-from tools_objects import Microphone, Camera, ControlMicrophoneRequest, ControlCameraRequest
+from chat_manager.chat_manager_config import ChatManagerConfig
+from chat_manager.chat_manager_object import ChatManager
+from chat_manager.history_store import HistoryStore
+from face_detection.capture_service import CameraCaptureService
+from face_detection.face_detection_config import FaceDetectionConfig
+from server.tools_objects import Microphone, Camera, ControlMicrophoneRequest, ControlCameraRequest
+from utils.openai_client import close_async_openai_client
 
 API_KEY = "your_secure_api_key"  # Replace with a secure key
 
-app = FastAPI(title="Smart Home AI Assistant Server")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global capture_service
+    if history_store:
+        history_store.compact(ChatManagerConfig.HISTORY_KEEP_TURNS, ChatManagerConfig.HISTORY_MAX_IDLE_DAYS * 24 * 3600)
+    if FaceDetectionConfig.CAPTURE_SERVICE_ENABLED:
+        capture_service = CameraCaptureService({cam.name: cam.source for cam in cameras if cam.status == "active"})
+        capture_service.start()
+    yield
+    if capture_service:
+        capture_service.stop()
+    for chat_manager, _ in chat_sessions.values():
+        chat_manager.close()
+    await close_async_openai_client()
+
+
+app = FastAPI(title="Smart Home AI Assistant Server", lifespan=lifespan)
 
 
 # Authentication dependency
@@ -27,10 +54,43 @@ microphones = [
 ]
 
 cameras = [
-    Camera(id=1, name="Front Door Camera", status="active", recording=False),
-    Camera(id=2, name="Lobby Camera", status="inactive", recording=False),
+    Camera(id=1, name="Front Door Camera", status="active", recording=False, source=0),
+    Camera(id=2, name="Lobby Camera", status="inactive", recording=False, source=1),
 ]
 
+# Reads the active cameras and identifies who they see, when enabled
+capture_service: Optional[CameraCaptureService] = None
+
+
+# One conversation per session, all sharing a history store and the pooled OpenAI connections
+history_store = HistoryStore(ChatManagerConfig.HISTORY_DB_PATH) if ChatManagerConfig.PERSIST_HISTORY else None
+# Session id to its ChatManager and when it was last used, least recently used first
+chat_sessions: "OrderedDict[str, Tuple[ChatManager, float]]" = OrderedDict()
+
+
+def get_chat_session(session_id: str) -> ChatManager:
+    now = time.monotonic()
+    session = chat_sessions.pop(session_id, None)
+    chat_manager = session[0] if session else ChatManager(session_id=session_id, history_store=history_store)
+    evict_chat_sessions(now)
+    chat_sessions[session_id] = (chat_manager, now)
+    return chat_manager
+
+
+def evict_chat_sessions(now: float) -> None:
+    """
+    Drop the idle sessions, and the least recently used ones to make room for one more session. Sessions in the
+    middle of a turn are kept; their history is persisted, so an evicted session picks up where it left off.
+    """
+    for session_id, (chat_manager, last_used) in list(chat_sessions.items()):
+        over_limit = len(chat_sessions) >= ChatManagerConfig.MAX_CHAT_SESSIONS
+        if not over_limit and now - last_used < ChatManagerConfig.CHAT_SESSION_IDLE_SECONDS:
+            break
+        if chat_manager.in_turn:
+            continue
+        del chat_sessions[session_id]
+        chat_manager.close()
+
 
 # Utility Functions (Replace with actual device control logic)
 async def start_camera_recording(camera: Camera):
@@ -45,6 +105,21 @@ async def stop_camera_recording(camera: Camera):
     print(f"Camera {camera.id} stopped recording.")
 
 
+async def activate_camera(camera: Camera):
+    camera.status = "active"
+    if capture_service:
+        capture_service.add_camera(camera.name, camera.source)
+    print(f"Camera {camera.id} activated.")
+
+
+async def deactivate_camera(camera: Camera):
+    camera.status = "inactive"
+    if capture_service:
+        # Joins the camera's reader thread
+        await asyncio.to_thread(capture_service.remove_camera, camera.name)
+    print(f"Camera {camera.id} deactivated.")
+
+
 async def activate_microphone(mic: Microphone):
     # Implement actual activation logic
     mic.status = "active"
@@ -97,7 +172,8 @@ async def get_cameras(api_key: str = Depends(get_api_key)):
 @app.post("/cameras/control")
 async def control_camera(request: ControlCameraRequest, api_key: str = Depends(get_api_key)):
     """
-    Control a specific camera (start/stop recording).
+    Control a specific camera (start/stop recording, activate/deactivate). Activating a camera starts its
+    capture when the capture service runs, deactivating it stops it.
     """
     cam = next((c for c in cameras if c.id == request.camera_id), None)
     if not cam:
@@ -107,12 +183,28 @@ async def control_camera(request: ControlCameraRequest, api_key: str = Depends(g
         await start_camera_recording(cam)
     elif request.action == "stop_recording":
         await stop_camera_recording(cam)
+    elif request.action == "activate":
+        await activate_camera(cam)
+    elif request.action == "deactivate":
+        await deactivate_camera(cam)
     else:
         raise HTTPException(status_code=400, detail="Invalid action for camera")
 
+    if request.action in ("activate", "deactivate"):
+        return {"message": f"Camera {cam.id} {request.action}d successfully."}
     return {"message": f"Camera {cam.id} {request.action.replace('_', ' ')} successfully."}
 
 
+@app.get("/cameras/stats")
+async def get_camera_stats(api_key: str = Depends(get_api_key)):
+    """
+    Per-camera capture FPS, frame queue age and dropped frames, and who each camera saw last.
+    """
+    if not capture_service:
+        raise HTTPException(status_code=400, detail="Camera capture is not running")
+    return {**capture_service.get_stats(), "last_seen": capture_service.last_seen}
+
+
 @app.get("/microphones/{mic_id}/stream")
 async def stream_microphone(mic_id: int, api_key: str = Depends(get_api_key)):
     """
@@ -148,11 +240,12 @@ async def stream_camera(cam_id: int, api_key: str = Depends(get_api_key)):
 
 
 @app.post("/ai/command")
-async def ai_command(command: str, api_key: str = Depends(get_api_key)):
+async def ai_command(command: str, session_id: str = "default", api_key: str = Depends(get_api_key)):
     """
-    Process a command using the AI assistant.
+    Process a command using the AI assistant. Commands of different sessions are processed concurrently.
     """
-    return {"message": "AI command processing is not yet implemented."}
+    reply = await get_chat_session(session_id).achat_with_ai(command)
+    return {"message": reply}
 
 
 @app.get("/health")
@@ -162,4 +255,4 @@ async def health_check():
 
 # Run the server
 if __name__ == "__main__":
-    uvicorn.run("smart_home_server:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run("server.server:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,3 +1,5 @@
+from typing import Union
+
 from pydantic import BaseModel
 
 class Microphone(BaseModel):
@@ -11,11 +13,12 @@ class Camera(BaseModel):
     name: str
     status: str  # e.g., "active", "inactive"
     recording: bool
+    source: Union[int, str] = 0  # OpenCV device index or stream URL
 
 
 class ControlCameraRequest(BaseModel):
     camera_id: int
-    action: str  # e.g., "start_recording", "stop_recording"
+    action: str  # e.g., "start_recording", "stop_recording", "activate", "deactivate"
 
 
 class ControlMicrophoneRequest(BaseModel):
@@ -0,0 +1,238 @@
+import io
+import queue
+import struct
+import threading
+import wave
+from typing import Optional, Union
+
+
+class AudioRingBuffer:
+    """
+    A preallocated ring buffer of raw PCM audio addressed by absolute byte positions.
+
+    The capture callback copies every block into the ring exactly once, without allocating, and readers get
+    memoryviews of any range that has not been overwritten yet. When the ring is full the oldest audio is dropped.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Initialize the AudioRingBuffer class.
+
+        Args:
+            capacity (int): Size of the ring in bytes.
+        """
+        self.capacity = capacity
+        self._data = bytearray(capacity)
+        self._view = memoryview(self._data)
+        self._lock = threading.Lock()
+        self.end = 0
+
+    @property
+    def start(self) -> int:
+        """
+        Returns:
+            int: Absolute position of the oldest byte still held by the ring.
+        """
+        return max(0, self.end - self.capacity)
+
+    def write(self, data) -> int:
+        """
+        Copy a block of audio into the ring.
+
+        Args:
+            data: Any bytes-like object, e.g. the `indata` buffer handed to a sounddevice callback.
+
+        Returns:
+            int: Absolute position right after the written block.
+        """
+        source = memoryview(data).cast('B')
+        size = len(source)
+        with self._lock:
+            if size > self.capacity:
+                source = source[size - self.capacity:]
+            position = (self.end + size - len(source)) % self.capacity
+            first_part = min(len(source), self.capacity - position)
+            self._view[position:position + first_part] = source[:first_part]
+            self._view[:len(source) - first_part] = source[first_part:]
+            self.end += size
+            return self.end
+
+    def read(self, start: int, end: int) -> Union[memoryview, bytes]:
+        """
+        Read a range of audio from the ring.
+
+        The range is returned as a zero-copy memoryview unless it wraps around the end of the ring, in which case
+        the two halves are joined. A memoryview is only valid until the writer laps it, so consume it promptly.
+
+        Args:
+            start (int): Absolute start position (inclusive).
+            end (int): Absolute end position (exclusive).
+
+        Returns:
+            Union[memoryview, bytes]: The requested audio.
+
+        Raises:
+            ValueError: If part of the range was already overwritten or not written yet.
+        """
+        with self._lock:
+            if start < self.start or end > self.end or start > end:
+                raise ValueError(f"Range [{start}, {end}) is outside the buffered audio [{self.start}, {self.end}).")
+            offset = start % self.capacity
+            if offset + end - start <= self.capacity:
+                return self._view[offset:offset + end - start]
+            return bytes(self._view[offset:]) + bytes(self._view[:offset + end - start - self.capacity])
+
+
+class AudioClip:
+    """
+    A single utterance of raw PCM audio held in memory.
+
+    Recognizers read the PCM samples directly; the WAV framing some APIs need is built lazily, in memory,
+    the first time it is requested.
+    """
+
+    def __init__(self, pcm: Union[bytes, bytearray], sample_rate: int, sample_width: int = 2, channels: int = 1) -> None:
+        """
+        Initialize the AudioClip class.
+
+        Args:
+            pcm (bytes): Raw little-endian PCM samples.
+            sample_rate (int): Sample rate in Hz.
+            sample_width (int): Bytes per sample.
+            channels (int): Number of interleaved channels.
+        """
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self._wav_bytes: Optional[bytes] = None
+
+    @classmethod
+    def from_ring(cls, ring: AudioRingBuffer, start: int, end: int, sample_rate: int) -> "AudioClip":
+        """
+        Copy a range out of a ring buffer, so the clip outlives the data that the ring overwrites.
+
+        Args:
+            ring (AudioRingBuffer): The capture ring.
+            start (int): Absolute start position (inclusive).
+            end (int): Absolute end position (exclusive).
+            sample_rate (int): Sample rate in Hz.
+
+        Returns:
+            AudioClip: The clip holding the copied audio.
+        """
+        return cls(bytearray(ring.read(start, end)), sample_rate)
+
+    @classmethod
+    def from_wav_file(cls, wav_file_path: str) -> "AudioClip":
+        """
+        Load a clip from a WAV file.
+
+        Args:
+            wav_file_path (str): Path to the WAV file.
+
+        Returns:
+            AudioClip: The loaded clip.
+        """
+        with wave.open(wav_file_path, "rb") as wav_file:
+            return cls(wav_file.readframes(wav_file.getnframes()), wav_file.getframerate(),
+                       wav_file.getsampwidth(), wav_file.getnchannels())
+
+    @property
+    def duration(self) -> float:
+        """
+        Returns:
+            float: Length of the clip in seconds.
+        """
+        return len(self.pcm) / (self.sample_rate * self.sample_width * self.channels)
+
+    def wav_bytes(self) -> bytes:
+        """
+        Frame the clip as a WAV file, building the framing only once.
+
+        Returns:
+            bytes: The complete WAV file contents.
+        """
+        if self._wav_bytes is None:
+            byte_rate = self.sample_rate * self.sample_width * self.channels
+            header = b"RIFF" + struct.pack("<I", 36 + len(self.pcm)) + b"WAVE" + \
+                b"fmt " + struct.pack("<IHHIIHH", 16, 1, self.channels, self.sample_rate, byte_rate,
+                                      self.sample_width * self.channels, self.sample_width * 8) + \
+                b"data" + struct.pack("<I", len(self.pcm))
+            self._wav_bytes = header + self.pcm
+        return self._wav_bytes
+
+    def wav_file(self, name: str = "utterance.wav") -> io.BytesIO:
+        """
+        Wrap the WAV framing in a named in-memory file, for APIs that only accept file objects.
+
+        Args:
+            name (str): File name reported to the API (its extension is used to detect the format).
+
+        Returns:
+            io.BytesIO: The in-memory WAV file.
+        """
+        wav_file = io.BytesIO(self.wav_bytes())
+        wav_file.name = name
+        return wav_file
+
+
+class BoundedAudioQueue:
+    """
+    A bounded queue of audio blocks that never grows past `maxsize`.
+
+    With the `DROP_OLDEST` policy a full queue discards its oldest block to make room, so a lagging consumer
+    always works on recent audio. With the `BLOCK` policy the producer waits up to `block_timeout` for room
+    (backpressure) and the new block is dropped if none frees up.
+    """
+    DROP_OLDEST = "drop_oldest"
+    BLOCK = "block"
+
+    def __init__(self, maxsize: int, policy: str = DROP_OLDEST, block_timeout: float = 0.01) -> None:
+        if policy not in (self.DROP_OLDEST, self.BLOCK):
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def put(self, block: bytes) -> bool:
+        """
+        Add a block according to the queue policy.
+
+        Args:
+            block (bytes): Raw audio block.
+
+        Returns:
+            bool: True if the new block was queued, False if it was dropped.
+        """
+        if self.policy == self.BLOCK:
+            try:
+                self._queue.put(block, timeout=self.block_timeout)
+                return True
+            except queue.Full:
+                self.dropped += 1
+                return False
+
+        while True:
+            try:
+                self._queue.put_nowait(block)
+                return True
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: Optional[float] = None) -> bytes:
+        """
+        Remove and return the oldest block.
+
+        Raises:
+            queue.Empty: If no block arrived within `timeout` seconds.
+        """
+        return self._queue.get(timeout=timeout)
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
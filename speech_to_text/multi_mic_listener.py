@@ -0,0 +1,163 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Union
+
+import sounddevice as sd
+
+from speech_to_text.audio_buffer import AudioClip, BoundedAudioQueue
+from speech_to_text.stt_object import SpeechRecognizerObject
+from utils.logger import JarvisLogger
+from utils.metrics import CpuUsageMeter
+
+logger = JarvisLogger("MultiMicrophoneListener")
+
+
+class MicrophoneWorker:
+    """
+    Listens to a single input device on its own thread, with its own KaldiRecognizer and bounded queue.
+
+    After a wake word the worker records the command from the same stream, using the pre-roll and noise floor
+    it kept up to date while listening. It hands the clip to the shared recognition pool and immediately goes
+    back to listening, so a slow cloud call never blocks wake-word detection, neither in this room nor in the
+    others.
+    """
+
+    def __init__(self, name: str, device: Optional[Union[int, str]], stt_object: SpeechRecognizerObject,
+                 recognition_pool: ThreadPoolExecutor, on_command: Callable[[str, Optional[str]], None]) -> None:
+        """
+        Initialize the MicrophoneWorker class.
+
+        Args:
+            name (str): Name of the microphone, e.g. the room it is in.
+            device (Union[int, str], optional): sounddevice input device index or name, None for the default.
+            stt_object (SpeechRecognizerObject): Provides the configuration and the recognition engines.
+            recognition_pool (ThreadPoolExecutor): Pool running the cloud recognition calls.
+            on_command (Callable[[str, Optional[str]], None]): Called with the microphone name and the
+                recognized command.
+        """
+        self.name = name
+        self.device = device
+        self.stt_object = stt_object
+        self.config = stt_object.config
+        self.recognition_pool = recognition_pool
+        self.on_command = on_command
+        self.audio_queue = BoundedAudioQueue(self.config.listener_queue_size, self.config.listener_queue_policy,
+                                             self.config.listener_block_timeout)
+        # Recent audio and the ambient noise floor of this stream, reused when recording a command
+        self.audio_ring = stt_object.create_utterance_ring()
+        self.noise_floor = stt_object.create_noise_floor_estimator()
+        self.commands_heard = 0
+        self.wake_word_cpu = CpuUsageMeter()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"microphone-{name}", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop_event.set()
+        self._thread.join(timeout)
+
+    def _queue_callback(self, indata: bytes, frames: int, time_info, status) -> None:
+        if status:
+            logger.error(f"[{self.name}] Stream status: {status}")
+        self.audio_queue.put(bytes(indata))
+
+    def _next_block(self) -> Optional[bytes]:
+        try:
+            block = self.audio_queue.get(timeout=0.5)
+        except queue.Empty:
+            return None
+        self.audio_ring.write(block)
+        return block
+
+    def _wait_for_audio(self) -> Optional[int]:
+        return self.audio_ring.end if self._next_block() is not None else None
+
+    def _run(self) -> None:
+        try:
+            recognizer = self.stt_object.create_wake_word_recognizer()
+            with sd.RawInputStream(
+                    device=self.device,
+                    samplerate=self.config.sound_sample_rate,
+                    blocksize=self.config.sound_sample_rate * self.config.vad_frame_ms // 1000,
+                    dtype='int16',
+                    channels=1,
+                    callback=self._queue_callback
+            ):
+                logger.info(f"[{self.name}] Passive listening started.")
+                while not self._stop_event.is_set():
+                    block = self._next_block()
+                    if block is not None:
+                        self.noise_floor.update(block)
+                    text = self.stt_object.detect_wake_word(recognizer, block, self.wake_word_cpu) if block else None
+                    engine = self.stt_object.engine_for_wake_word(text) if text else None
+                    if engine:
+                        logger.info(f"[{self.name}] Wake word heard: {text}")
+                        audio_clip = self.stt_object.endpoint_utterance(self.audio_ring, self._wait_for_audio,
+                                                                        self.noise_floor, self._stop_event)
+                        recognizer.Reset()
+                        if audio_clip is not None:
+                            self.recognition_pool.submit(self._recognize, engine, audio_clip)
+        except Exception as e:
+            logger.error(f"[{self.name}] An error occurred during passive listening: {e}")
+        logger.info(f"[{self.name}] Passive listening stopped.")
+
+    def _recognize(self, engine: str, audio_clip: AudioClip) -> None:
+        recognized_text = self.stt_object.recognize(audio_clip, engine)
+        self.commands_heard += 1
+        try:
+            self.on_command(self.name, recognized_text)
+        except Exception as e:
+            logger.error(f"[{self.name}] Command handler failed: {e}")
+
+    def get_stats(self) -> dict:
+        return {"queued_blocks": self.audio_queue.qsize(),
+                "dropped_blocks": self.audio_queue.dropped,
+                "commands_heard": self.commands_heard,
+                "noise_floor": self.noise_floor.floor,
+                "wake_word_cpu_per_audio_hour": self.wake_word_cpu.cpu_seconds_per_audio_hour}
+
+
+class MultiMicrophoneListener:
+    """
+    Runs passive listening on several input devices at once, one `MicrophoneWorker` per device.
+
+    All workers share one VOSK model (through the model registry), one SpeechRecognizerObject and one bounded
+    pool for the cloud recognition calls.
+    """
+
+    def __init__(self, devices: Dict[str, Optional[Union[int, str]]],
+                 on_command: Callable[[str, Optional[str]], None],
+                 stt_object: Optional[SpeechRecognizerObject] = None) -> None:
+        """
+        Initialize the MultiMicrophoneListener class.
+
+        Args:
+            devices (dict): Microphone name (e.g. "Living Room Mic") to sounddevice input device index or name.
+            on_command (Callable[[str, Optional[str]], None]): Called, from the recognition pool, with the
+                microphone name and the recognized command.
+            stt_object (SpeechRecognizerObject, optional): Shared recognizer, created if not given.
+        """
+        self.stt_object = stt_object or SpeechRecognizerObject()
+        self.recognition_pool = ThreadPoolExecutor(max_workers=self.stt_object.config.recognition_workers,
+                                                   thread_name_prefix="recognition")
+        self.workers = [MicrophoneWorker(name, device, self.stt_object, self.recognition_pool, on_command)
+                        for name, device in devices.items()]
+
+    def start(self) -> None:
+        for worker in self.workers:
+            worker.start()
+
+    def stop(self) -> None:
+        for worker in self.workers:
+            worker.stop()
+        self.recognition_pool.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, dict]:
+        """
+        Returns:
+            dict: Queue depth, dropped blocks, recognized commands and wake-word CPU usage per microphone.
+        """
+        return {worker.name: worker.get_stats() for worker in self.workers}
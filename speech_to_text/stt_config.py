@@ -7,7 +7,46 @@ class SpeechRecognizerConfig(BaseConfig):
     """Configuration settings for the SpeechRecognizer."""
     language: str = "en-US"
     vosk_model_path: str = os.path.join(BaseConfig.BASE_DIR, 'models', 'vosk-model-small-en-us-0.15')
+    preload_vosk_model: bool = True  # Load the shared model on a background thread when the first recognizer is created
+
+    # Wake-word spotting: restrict VOSK to these phrases (plus [unk]) instead of open-vocabulary decoding.
+    # Each phrase maps to the minimum word confidence needed to accept it.
+    wake_word_spotting: bool = True
+    wake_phrases: dict = {"hello": 0.7, "whisper": 0.7}
 
     sound_sample_rate: int = 16000
     block_size: int = 16000
-    record_duration: int = 5
\ No newline at end of file
+    record_duration: int = 5
+
+    # Voice-activity-detection endpointing, used by record_audio instead of the fixed record_duration
+    use_vad: bool = True
+    vad_frame_ms: int = 30
+    vad_pre_roll_ms: int = 300
+    vad_start_speech_ms: int = 90
+    vad_trailing_silence_ms: int = 800
+    vad_max_duration: float = 10.0
+    vad_no_speech_timeout: float = 5.0
+    vad_energy_threshold: float = 300.0  # Used until the noise floor estimate is warm
+
+    # Continuous noise floor estimation, replacing the per-recording adjust_for_ambient_noise calibration
+    noise_floor_time_constant: float = 2.0
+    noise_floor_ratio: float = 3.0
+    noise_floor_min_threshold: float = 100.0
+    noise_floor_warmup: float = 1.0
+
+    # Multi-microphone listening, see MultiMicrophoneListener
+    listener_queue_size: int = 100  # Blocks of vad_frame_ms buffered per microphone (3 seconds by default)
+    listener_queue_policy: str = "drop_oldest"  # "drop_oldest" or "block" (wait listener_block_timeout, then drop)
+    listener_block_timeout: float = 0.01
+    recognition_workers: int = 4
+
+    # Local-first recognition: transcribe commands with VOSK and only use the cloud engine when unsure
+    local_first_stt: bool = True
+    local_min_confidence: float = 0.85  # Every word must reach this confidence
+    local_max_words: int = 8
+    local_max_duration: float = 4.0
+
+    # Cloud racing: send the utterance to every engine at once and keep the first transcript
+    cloud_race: bool = False
+    cloud_race_timeouts: dict = {"google": 6.0, "whisper": 6.0}  # Engine to its timeout in seconds
+    cloud_race_workers: int = 4
@@ -1,16 +1,24 @@
 import json
-import os
 import queue
-import tempfile
-from typing import Optional
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
 
-from openai import OpenAI
 import sounddevice as sd
 import speech_recognition as sr
 from vosk import Model, KaldiRecognizer
 
+from speech_to_text.audio_buffer import AudioClip, AudioRingBuffer, BoundedAudioQueue
 from speech_to_text.stt_config import SpeechRecognizerConfig
+from speech_to_text.vad_endpointer import NoiseFloorEstimator, VadEndpointer
+from speech_to_text.vosk_model_registry import VoskModelRegistry
+from speech_to_text.wake_word_spotter import WakeWordSpotter
 from utils.logger import JarvisLogger
+from utils.metrics import CpuUsageMeter, LatencyStats
+from utils.openai_client import get_async_openai_client, get_openai_client
 
 
 class SpeechRecognitionError(Exception):
@@ -18,6 +26,17 @@ class SpeechRecognitionError(Exception):
     pass
 
 
+@dataclass
+class LocalTranscript:
+    """A VOSK transcript with the confidence of every word."""
+    text: str
+    confidences: List[float]
+
+    @property
+    def min_confidence(self) -> float:
+        return min(self.confidences, default=0.0)
+
+
 class SpeechRecognizerObject:
     """
     A class to handle speech recognition using VOSK, Google Cloud Speech-to-Text, and OpenAI Whisper.
@@ -30,13 +49,38 @@ class SpeechRecognizerObject:
         self.config = SpeechRecognizerConfig
         self.logger = JarvisLogger("SpeechRecognizer")
         self.recognizer = sr.Recognizer()
-        self.audio_queue = queue.Queue()
-        self.vosk_model = self._load_vosk_model(self.config.vosk_model_path)
-        self.openai_client = OpenAI()
+        self.audio_queue = BoundedAudioQueue(self.config.listener_queue_size, self.config.listener_queue_policy,
+                                             self.config.listener_block_timeout)
+        self.vosk_registry = VoskModelRegistry()
+        if self.config.preload_vosk_model:
+            self.vosk_registry.preload(self.config.vosk_model_path)
+        self.openai_client = get_openai_client()
+        self.async_openai_client = get_async_openai_client()
+        self.vad_latency_saved = LatencyStats()
+        self.noise_floor = self.create_noise_floor_estimator()
+        self.wake_word_spotter = WakeWordSpotter(self.config.wake_phrases)
+        self.wake_word_cpu = CpuUsageMeter()
+        self.cloud_engines: Dict[str, Callable[[AudioClip], Optional[str]]] = {
+            "google": self.recognize_with_google_api,
+            "whisper": self.recognize_with_whisper,
+        }
+        self.engine_usage = Counter()
+        self.engine_latency: Dict[str, LatencyStats] = {}
+        self.race_pool = ThreadPoolExecutor(max_workers=self.config.cloud_race_workers,
+                                            thread_name_prefix="recognition-race")
+        self.race_wins = Counter()
+        self.race_timeouts = Counter()
+
+    @property
+    def vosk_model(self) -> Model:
+        """
+        The shared VOSK model, waiting for a background load in progress if needed.
+        """
+        return self._load_vosk_model(self.config.vosk_model_path)
 
     def _load_vosk_model(self, model_path: str) -> Model:
         """
-        Loads the VOSK model from the specified path.
+        Gets the VOSK model for the specified path from the process-wide registry, loading it on first use.
 
         Args:
             model_path (str): Path to the VOSK model.
@@ -48,10 +92,7 @@ class SpeechRecognizerObject:
             SpeechRecognitionError: If the model fails to load.
         """
         try:
-            self.logger.info(f"Loading VOSK model from {model_path}...")
-            model = Model(model_path)
-            self.logger.info("VOSK model loaded successfully.")
-            return model
+            return self.vosk_registry.get_model(model_path)
         except Exception as e:
             self.logger.error(f"Failed to load VOSK model: {e}")
             raise SpeechRecognitionError(f"Failed to load VOSK model: {e}") from e
@@ -60,6 +101,8 @@ class SpeechRecognizerObject:
         """
         Callback function for the audio stream to enqueue audio data.
 
+        Vosk's binding only accepts `bytes`, so this is the one copy each block gets on its way to the recognizer.
+
         Args:
             indata (bytes): Input audio data.
             frames (int): Number of frames.
@@ -70,52 +113,205 @@ class SpeechRecognizerObject:
             self.logger.error(f"Stream status: {status}")
         self.audio_queue.put(bytes(indata))
 
-    def record_audio(self) -> str:
+    def record_audio(self) -> AudioClip:
         """
-        Records audio from the microphone for a specified duration and saves it to a temporary WAV file.
+        Records a single utterance from the microphone into memory.
+
+        With `use_vad` enabled the recording ends after a trailing silence (see `_record_until_silence`),
+        otherwise it lasts a fixed `record_duration` seconds.
 
         Returns:
-            str: Path to the recorded audio file.
+            AudioClip: The recorded utterance.
 
         Raises:
             SpeechRecognitionError: If recording fails.
         """
         try:
-            self.logger.info(f"Recording audio for {self.config.record_duration} seconds...")
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio_file:
-                with sr.Microphone(sample_rate=self.config.sound_sample_rate) as source:
-                    self.recognizer.adjust_for_ambient_noise(source)
-                    audio = self.recognizer.record(source, duration=self.config.record_duration)
-                    # Save the recorded audio to the temporary file
-                    with open(temp_audio_file.name, "wb") as f:
-                        f.write(audio.get_wav_data())
-                self.logger.info(f"Audio recorded and saved to {temp_audio_file.name}.")
-                return temp_audio_file.name
+            if self.config.use_vad:
+                audio_clip = self._record_until_silence()
+            else:
+                audio_clip = self._record_fixed_duration()
+            self.logger.info(f"Recorded {audio_clip.duration:.2f}s of audio.")
+            return audio_clip
         except Exception as e:
             self.logger.error(f"Failed to record audio: {e}")
             raise SpeechRecognitionError(f"Failed to record audio: {e}") from e
 
-    def recognize_with_google_api(self, audio_file_path: str) -> Optional[str]:
+    def _record_fixed_duration(self) -> AudioClip:
+        """
+        Records audio from the microphone for `record_duration` seconds.
+
+        Returns:
+            AudioClip: The recorded audio.
+        """
+        self.logger.info(f"Recording audio for {self.config.record_duration} seconds...")
+        with sr.Microphone(sample_rate=self.config.sound_sample_rate) as source:
+            if self.noise_floor.is_warm:
+                # The passive stream already knows the ambient noise, no need to calibrate again
+                self.recognizer.energy_threshold = self.noise_floor.threshold
+            else:
+                self.recognizer.adjust_for_ambient_noise(source)
+            audio = self.recognizer.record(source, duration=self.config.record_duration)
+        return AudioClip(audio.frame_data, audio.sample_rate, audio.sample_width)
+
+    def create_endpointer(self, noise_floor: Optional[NoiseFloorEstimator] = None) -> VadEndpointer:
+        """
+        Creates a VAD endpointer for `vad_frame_ms` frames from the configuration.
+
+        Args:
+            noise_floor (NoiseFloorEstimator, optional): Supplies the speech threshold once it is warm;
+                `vad_energy_threshold` is used otherwise.
+
+        Returns:
+            VadEndpointer: A new endpointer waiting for a speech onset.
+        """
+        energy_threshold = self.config.vad_energy_threshold
+        if noise_floor is not None and noise_floor.is_warm:
+            energy_threshold = noise_floor.threshold
+        return VadEndpointer(frame_ms=self.config.vad_frame_ms,
+                             pre_roll_ms=self.config.vad_pre_roll_ms,
+                             start_speech_ms=self.config.vad_start_speech_ms,
+                             trailing_silence_ms=self.config.vad_trailing_silence_ms,
+                             max_duration=self.config.vad_max_duration,
+                             no_speech_timeout=self.config.vad_no_speech_timeout,
+                             energy_threshold=energy_threshold)
+
+    def create_noise_floor_estimator(self) -> NoiseFloorEstimator:
+        """
+        Creates a noise floor estimator for one input stream from the configuration.
+
+        Returns:
+            NoiseFloorEstimator: A new, cold estimator.
+        """
+        return NoiseFloorEstimator(sample_rate=self.config.sound_sample_rate,
+                                   time_constant=self.config.noise_floor_time_constant,
+                                   ratio=self.config.noise_floor_ratio,
+                                   min_threshold=self.config.noise_floor_min_threshold,
+                                   warmup=self.config.noise_floor_warmup)
+
+    def create_utterance_ring(self) -> AudioRingBuffer:
+        """
+        Creates a ring buffer large enough to hold a whole endpointed utterance.
+
+        Returns:
+            AudioRingBuffer: Room for the pre-roll, the longest utterance and a second of consumer lag.
+        """
+        ring_seconds = (self.config.vad_pre_roll_ms + self.config.vad_start_speech_ms) / 1000 + \
+            self.config.vad_max_duration + 1
+        return AudioRingBuffer(int(ring_seconds * self.config.sound_sample_rate) * 2)
+
+    def endpoint_utterance(self, audio_ring: AudioRingBuffer, wait_for_audio: Callable[[], Optional[int]],
+                           noise_floor: NoiseFloorEstimator,
+                           stop_event: Optional[threading.Event] = None) -> Optional[AudioClip]:
+        """
+        Cuts the next utterance out of a stream that is being captured into a ring buffer.
+
+        The audio already in the ring is replayed first, up to `vad_pre_roll_ms`, so a listener that kept its
+        ring filled starts with a ready pre-roll. Frames are then fed to a `VadEndpointer` using the stream's
+        noise floor as speech threshold, which ends the utterance after `vad_trailing_silence_ms` of silence
+        or `vad_max_duration` seconds. The time saved against a fixed `record_duration` recording is logged and
+        collected in `vad_latency_saved`, clamped at zero for utterances longer than that recording.
+
+        Args:
+            audio_ring (AudioRingBuffer): Ring the stream's 16-bit mono audio is written to.
+            wait_for_audio (Callable[[], Optional[int]]): Blocks until more audio was written to the ring and
+                returns its new end, or None on a timeout.
+            noise_floor (NoiseFloorEstimator): The stream's noise floor, kept up to date with the quiet frames.
+            stop_event (threading.Event, optional): Aborts the capture when set.
+
+        Returns:
+            Optional[AudioClip]: The utterance, or None if no speech started in time or the capture was stopped.
+        """
+        endpointer = self.create_endpointer(noise_floor)
+        frame_bytes = self.config.sound_sample_rate * self.config.vad_frame_ms // 1000 * 2
+        pre_roll_frames = self.config.vad_pre_roll_ms // self.config.vad_frame_ms
+        # The replayed pre-roll was already folded into the noise floor by whoever wrote it to the ring
+        new_audio_start = audio_ring.end
+        frame_start = new_audio_start - min(pre_roll_frames, (audio_ring.end - audio_ring.start) // frame_bytes) * \
+            frame_bytes
+
+        start_time = time.perf_counter()
+        reason = None
+        while reason is None:
+            if frame_start + frame_bytes > audio_ring.end:
+                if stop_event is not None and stop_event.is_set():
+                    return None
+                wait_for_audio()
+                continue
+            frame_end = frame_start + frame_bytes
+            frame = audio_ring.read(frame_start, frame_end)
+            if not endpointer.in_speech and frame_start >= new_audio_start:
+                noise_floor.update(frame)
+            reason = endpointer.process(frame, frame_end)
+            frame_start = frame_end
+        capture_time = time.perf_counter() - start_time
+
+        if reason == VadEndpointer.NO_SPEECH:
+            self.logger.warning(f"No speech detected within {self.config.vad_no_speech_timeout} seconds.")
+            return None
+
+        # Commands may run up to `vad_max_duration`, past the fixed recording, which then saves nothing
+        saved_time = max(0.0, self.config.record_duration - capture_time)
+        self.vad_latency_saved.add(saved_time)
+        self.logger.info(f"Utterance of {endpointer.duration:.2f}s ended by {reason} after {capture_time:.2f}s, "
+                         f"saving {saved_time:.2f}s (clamped at zero) against a {self.config.record_duration}s "
+                         f"recording.")
+        return AudioClip.from_ring(audio_ring, endpointer.start_position, endpointer.end_position,
+                                   self.config.sound_sample_rate)
+
+    def _record_until_silence(self) -> AudioClip:
+        """
+        Records audio from the microphone until the speaker stops talking.
+
+        The stream callback copies every `vad_frame_ms` block once into a preallocated `AudioRingBuffer` and
+        only queues its position; `endpoint_utterance` finds the utterance in the ring.
+
+        Returns:
+            AudioClip: The recorded utterance, empty if no speech was detected.
+        """
+        audio_ring = self.create_utterance_ring()
+        position_queue = queue.Queue()
+
+        def ring_callback(indata: bytes, frames: int, time_info, status) -> None:
+            if status:
+                self.logger.error(f"Stream status: {status}")
+            position_queue.put(audio_ring.write(indata))
+
+        self.logger.info("Recording audio until the end of the utterance...")
+        with sd.RawInputStream(
+                samplerate=self.config.sound_sample_rate,
+                blocksize=self.config.sound_sample_rate * self.config.vad_frame_ms // 1000,
+                dtype='int16',
+                channels=1,
+                callback=ring_callback
+        ):
+            audio_clip = self.endpoint_utterance(audio_ring, position_queue.get, self.noise_floor)
+        return audio_clip or AudioClip(b"", self.config.sound_sample_rate)
+
+    @staticmethod
+    def _as_audio_clip(audio: Union[AudioClip, str]) -> AudioClip:
+        return AudioClip.from_wav_file(audio) if isinstance(audio, str) else audio
+
+    def recognize_with_google_api(self, audio: Union[AudioClip, str]) -> Optional[str]:
         """
         Recognizes speech using Google Cloud Speech-to-Text API.
 
         Args:
-            audio_file_path (str): Path to the audio file.
+            audio (Union[AudioClip, str]): The recorded audio, or a path to a WAV file.
 
         Returns:
             Optional[str]: Recognized text or None if recognition fails.
         """
         try:
-            with sr.AudioFile(audio_file_path) as source:
-                self.logger.info("Processing audio with Google Cloud Speech-to-Text...")
-                audio = self.recognizer.record(source)
-                recognized_text = self.recognizer.recognize_google_cloud(
-                    audio,
-                    language=self.config.language,
-                    credentials_json=self.config.GOOGLE_CREDENTIALS_JSON_PATH
-                )
-                self.logger.info(f"Google API recognized: {recognized_text}")
-                return recognized_text
+            audio_clip = self._as_audio_clip(audio)
+            self.logger.info("Processing audio with Google Cloud Speech-to-Text...")
+            recognized_text = self.recognizer.recognize_google_cloud(
+                sr.AudioData(bytes(audio_clip.pcm), audio_clip.sample_rate, audio_clip.sample_width),
+                language=self.config.language,
+                credentials_json=self.config.GOOGLE_CREDENTIALS_JSON_PATH
+            )
+            self.logger.info(f"Google API recognized: {recognized_text}")
+            return recognized_text
         except sr.UnknownValueError:
             self.logger.error("Google API could not understand the audio.")
         except sr.RequestError as e:
@@ -124,24 +320,47 @@ class SpeechRecognizerObject:
             self.logger.error(f"An unexpected error occurred with Google API: {e}")
         return None
 
-    def recognize_with_whisper(self, audio_file_path: str) -> Optional[str]:
+    def recognize_with_whisper(self, audio: Union[AudioClip, str]) -> Optional[str]:
         """
         Recognizes speech using OpenAI Whisper API.
 
         Args:
-            audio_file_path (str): Path to the audio file.
+            audio (Union[AudioClip, str]): The recorded audio, or a path to a WAV file.
+
+        Returns:
+            Optional[str]: Recognized text or None if recognition fails.
+        """
+        try:
+            self.logger.info("Processing audio with OpenAI Whisper...")
+            response = self.openai_client.audio.transcriptions.create(
+                model="whisper-1",
+                file=self._as_audio_clip(audio).wav_file(),
+                language=self.config.language.split('-')[0]  # e.g., 'en-US' -> 'en'
+            )
+            recognized_text = response.text
+            self.logger.info(f"Whisper recognized: {recognized_text}")
+            return recognized_text if recognized_text else None
+        except Exception as e:
+            self.logger.error(f"An unexpected error occurred with Whisper API: {e}")
+        return None
+
+    async def arecognize_with_whisper(self, audio: Union[AudioClip, str]) -> Optional[str]:
+        """
+        Recognizes speech using OpenAI Whisper API without blocking the event loop.
+
+        Args:
+            audio (Union[AudioClip, str]): The recorded audio, or a path to a WAV file.
 
         Returns:
             Optional[str]: Recognized text or None if recognition fails.
         """
         try:
             self.logger.info("Processing audio with OpenAI Whisper...")
-            with open(audio_file_path, "rb") as audio_file:
-                response = self.openai_client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language=self.config.language.split('-')[0]  # e.g., 'en-US' -> 'en'
-                )
+            response = await self.async_openai_client.audio.transcriptions.create(
+                model="whisper-1",
+                file=self._as_audio_clip(audio).wav_file(),
+                language=self.config.language.split('-')[0]  # e.g., 'en-US' -> 'en'
+            )
             recognized_text = response.text
             self.logger.info(f"Whisper recognized: {recognized_text}")
             return recognized_text if recognized_text else None
@@ -149,6 +368,316 @@ class SpeechRecognizerObject:
             self.logger.error(f"An unexpected error occurred with Whisper API: {e}")
         return None
 
+    def create_wake_word_recognizer(self) -> KaldiRecognizer:
+        """
+        Creates the recognizer used for passive listening.
+
+        Returns:
+            KaldiRecognizer: A grammar-constrained keyword spotter when `wake_word_spotting` is enabled,
+            otherwise an open-vocabulary recognizer.
+        """
+        if self.config.wake_word_spotting:
+            return self.wake_word_spotter.create_recognizer(self.vosk_registry, self.config.vosk_model_path,
+                                                            self.config.sound_sample_rate)
+        return self.vosk_registry.create_recognizer(self.config.vosk_model_path, self.config.sound_sample_rate)
+
+    def detect_wake_word(self, recognizer: KaldiRecognizer, data: bytes,
+                         cpu_meter: Optional[CpuUsageMeter] = None) -> Optional[str]:
+        """
+        Feeds a block of audio to a wake-word recognizer.
+
+        Args:
+            recognizer (KaldiRecognizer): Recognizer created by `create_wake_word_recognizer`.
+            data (bytes): Raw 16-bit mono audio block.
+            cpu_meter (CpuUsageMeter, optional): Collects the decoding CPU time per second of audio.
+
+        Returns:
+            Optional[str]: The text heard when VOSK closes an utterance (only a confidently spotted wake phrase
+            in spotting mode), otherwise None.
+        """
+        cpu_start = time.thread_time()
+        accepted = recognizer.AcceptWaveform(data)
+        if cpu_meter is not None:
+            cpu_meter.add(time.thread_time() - cpu_start, len(data) / (self.config.sound_sample_rate * 2))
+        if not accepted:
+            return None
+        result = json.loads(recognizer.Result())
+        if self.config.wake_word_spotting:
+            return self.wake_word_spotter.match(result)
+        return result.get("text", "").strip() or None
+
+    def measure_wake_word_cpu(self, audio: Union[AudioClip, str]) -> Dict[str, Optional[float]]:
+        """
+        Decodes the same audio with open-vocabulary recognition and with wake-word spotting.
+
+        Args:
+            audio (Union[AudioClip, str]): 16-bit mono audio at `sound_sample_rate`, or a path to a WAV file.
+
+        Returns:
+            dict: CPU seconds per hour of audio for the "open_vocabulary" and "wake_word_spotting" modes, None
+                when the audio was too short to measure.
+        """
+        pcm = bytes(self._as_audio_clip(audio).pcm)
+        block_bytes = self.config.block_size * 2
+        recognizers = {
+            "open_vocabulary": self.vosk_registry.create_recognizer(self.config.vosk_model_path,
+                                                                    self.config.sound_sample_rate),
+            "wake_word_spotting": self.wake_word_spotter.create_recognizer(self.vosk_registry,
+                                                                           self.config.vosk_model_path,
+                                                                           self.config.sound_sample_rate),
+        }
+        cpu_usage = {}
+        for mode, recognizer in recognizers.items():
+            cpu_meter = CpuUsageMeter()
+            for offset in range(0, len(pcm), block_bytes):
+                block = pcm[offset:offset + block_bytes]
+                cpu_start = time.thread_time()
+                recognizer.AcceptWaveform(block)
+                cpu_meter.add(time.thread_time() - cpu_start, len(block) / (self.config.sound_sample_rate * 2))
+            cpu_usage[mode] = cpu_meter.cpu_seconds_per_audio_hour
+            if cpu_usage[mode] is None:
+                self.logger.warning(f"Wake-word CPU usage ({mode}): not enough audio to measure.")
+            else:
+                self.logger.info(f"Wake-word CPU usage ({mode}): {cpu_usage[mode]:.1f} CPU seconds per audio hour.")
+        return cpu_usage
+
+    def recognize_with_vosk(self, audio: Union[AudioClip, str]) -> LocalTranscript:
+        """
+        Transcribes speech locally with the shared VOSK model.
+
+        Args:
+            audio (Union[AudioClip, str]): 16-bit mono audio at `sound_sample_rate`, or a path to a WAV file.
+
+        Returns:
+            LocalTranscript: The text with its word-level confidences.
+        """
+        recognizer = self.vosk_registry.create_recognizer(self.config.vosk_model_path, self.config.sound_sample_rate)
+        recognizer.SetWords(True)
+        pcm = bytes(self._as_audio_clip(audio).pcm)
+        block_bytes = self.config.block_size * 2
+        words = []
+        for offset in range(0, len(pcm), block_bytes):
+            if recognizer.AcceptWaveform(pcm[offset:offset + block_bytes]):
+                words += json.loads(recognizer.Result()).get("result", [])
+        words += json.loads(recognizer.FinalResult()).get("result", [])
+        transcript = LocalTranscript(text=" ".join(word["word"] for word in words),
+                                     confidences=[word.get("conf", 0.0) for word in words])
+        self.logger.info(f"VOSK transcribed: {transcript.text} (min confidence {transcript.min_confidence:.2f})")
+        return transcript
+
+    def _accept_local_transcript(self, transcript: LocalTranscript, audio_clip: AudioClip) -> bool:
+        """
+        Decides whether a local transcript is good enough to skip the cloud engines.
+        """
+        return (bool(transcript.text)
+                and transcript.min_confidence >= self.config.local_min_confidence
+                and len(transcript.confidences) <= self.config.local_max_words
+                and audio_clip.duration <= self.config.local_max_duration)
+
+    def _run_engine(self, engine: str, recognize: Callable[[AudioClip], Any], audio_clip: AudioClip) -> Any:
+        """
+        Runs a recognition engine and records its usage and latency.
+        """
+        start_time = time.perf_counter()
+        try:
+            return recognize(audio_clip)
+        finally:
+            self.engine_usage[engine] += 1
+            self.engine_latency.setdefault(engine, LatencyStats()).add(time.perf_counter() - start_time)
+
+    def recognize(self, audio: Union[AudioClip, str], engine: str) -> Optional[str]:
+        """
+        Recognizes a command, locally first when `local_first_stt` is enabled.
+
+        In local-first mode the utterance is transcribed with VOSK, and only sent to the cloud engine when the
+        transcript is empty, any word is below `local_min_confidence`, or the command is longer than
+        `local_max_words` words or `local_max_duration` seconds.
+
+        Args:
+            audio (Union[AudioClip, str]): The recorded audio, or a path to a WAV file.
+            engine (str): Cloud engine to use, a key of `cloud_engines` ("google" or "whisper").
+
+        Returns:
+            Optional[str]: Recognized text or None if recognition fails.
+        """
+        audio_clip = self._as_audio_clip(audio)
+        if self.config.local_first_stt:
+            try:
+                transcript = self._run_engine("vosk", self.recognize_with_vosk, audio_clip)
+                if self._accept_local_transcript(transcript, audio_clip):
+                    return transcript.text
+                self.logger.info(f"Local transcript not accepted, falling back to {engine}.")
+            except Exception as e:
+                self.logger.error(f"VOSK transcription failed, falling back to {engine}: {e}")
+        if self.config.cloud_race:
+            return self.recognize_race(audio_clip)
+        return self._run_engine(engine, self.cloud_engines[engine], audio_clip)
+
+    def recognize_race(self, audio: Union[AudioClip, str]) -> Optional[str]:
+        """
+        Sends the same utterance to every engine in `cloud_race_timeouts` at once and returns the first transcript.
+
+        Each engine gets its own timeout. Engines that have not started yet when a transcript comes back are
+        cancelled; requests already in flight cannot be aborted, so their results are ignored, but their latency
+        is still recorded, which is what shows the engine to prefer.
+
+        Args:
+            audio (Union[AudioClip, str]): The recorded audio, or a path to a WAV file.
+
+        Returns:
+            Optional[str]: The first non-empty transcript, or None if every engine failed or timed out.
+        """
+        audio_clip = self._as_audio_clip(audio)
+        start_time = time.monotonic()
+        deadlines = {}
+        for engine, timeout in self.config.cloud_race_timeouts.items():
+            race_future = self.race_pool.submit(self._run_engine, engine, self.cloud_engines[engine], audio_clip)
+            deadlines[race_future] = (engine, start_time + timeout)
+
+        pending = set(deadlines)
+        try:
+            while pending:
+                next_deadline = min(deadlines[f][1] for f in pending)
+                done, pending = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()),
+                                     return_when=FIRST_COMPLETED)
+                for race_future in done:
+                    engine = deadlines[race_future][0]
+                    recognized_text = race_future.exception() is None and race_future.result()
+                    if recognized_text:
+                        self.race_wins[engine] += 1
+                        self.logger.info(f"{engine} won the recognition race in "
+                                         f"{time.monotonic() - start_time:.2f}s.")
+                        return recognized_text
+                for race_future in [f for f in pending if deadlines[f][1] <= time.monotonic()]:
+                    engine = deadlines[race_future][0]
+                    self.race_timeouts[engine] += 1
+                    self.logger.warning(f"{engine} timed out in the recognition race.")
+                    pending.discard(race_future)
+                    race_future.cancel()
+        finally:
+            for race_future in pending:
+                race_future.cancel()
+        return None
+
+    def get_engine_stats(self) -> Dict[str, dict]:
+        """
+        Returns:
+            dict: Number of uses, recognition races won and timed out, and latency summary per engine.
+        """
+        return {engine: {"uses": self.engine_usage[engine],
+                         "race_wins": self.race_wins[engine],
+                         "race_timeouts": self.race_timeouts[engine],
+                         "latency": self.engine_latency[engine].summary()}
+                for engine in self.engine_latency}
+
+    def engine_for_wake_word(self, text: str) -> Optional[str]:
+        """
+        Maps the text VOSK heard to the cloud engine its wake word selects.
+
+        Args:
+            text (str): Text recognized by VOSK.
+
+        Returns:
+            Optional[str]: "google" for "hello", "whisper" for "whisper", or None if no wake word was heard.
+        """
+        lowered_text = text.lower()
+        if "hello" in lowered_text:
+            return "google"
+        elif "whisper" in lowered_text:
+            return "whisper"
+        return None
+
+    def _record_from_passive_stream(self, audio_ring: AudioRingBuffer, next_block: Callable[[], Optional[bytes]],
+                                    stop_event: Optional[threading.Event] = None) -> Optional[AudioClip]:
+        """
+        Records the command that follows a wake word.
+
+        With `use_vad` enabled the command is endpointed from the passive stream itself, reusing its pre-roll
+        and noise floor; otherwise a fixed-duration recording is made with `record_audio`.
+
+        Args:
+            audio_ring (AudioRingBuffer): Ring the passive stream is written to.
+            next_block (Callable[[], Optional[bytes]]): Returns the next block of the passive stream.
+            stop_event (threading.Event, optional): Aborts the recording when set.
+
+        Returns:
+            Optional[AudioClip]: The command, or None if no speech followed the wake word.
+        """
+        if not self.config.use_vad:
+            return self.record_audio()
+
+        def wait_for_audio() -> Optional[int]:
+            block = next_block()
+            return audio_ring.write(block) if block is not None else None
+
+        return self.endpoint_utterance(audio_ring, wait_for_audio, self.noise_floor, stop_event)
+
+    def listen_for_command(self, next_block: Callable[[], Optional[bytes]], audio_ring: AudioRingBuffer,
+                           stop_event: Optional[threading.Event] = None) -> Optional[str]:
+        """
+        Runs the passive-listening loop over a source of audio blocks until a command is recognized.
+
+        Every block is written to the ring and the noise floor before wake-word detection, so the command can
+        be recorded from the same source right after the wake word.
+
+        Args:
+            next_block (Callable[[], Optional[bytes]]): Returns the next `vad_frame_ms` block of 16-bit mono
+                audio, or None when the source is exhausted.
+            audio_ring (AudioRingBuffer): Ring holding the recent audio of the source.
+            stop_event (threading.Event, optional): Aborts a command recording when set.
+
+        Returns:
+            Optional[str]: The recognized command, or None if the source ended or no command was understood.
+        """
+        recognizer = self.create_wake_word_recognizer()
+        while True:
+            data = next_block()
+            if data is None:
+                return None
+            # Keep the pre-roll and the noise floor current, so recording can start right away
+            audio_ring.write(data)
+            self.noise_floor.update(data)
+            text = self.detect_wake_word(recognizer, data, self.wake_word_cpu)
+            if text:
+                self.logger.info(f"VOSK recognized: {text}")
+                engine = self.engine_for_wake_word(text)
+                if engine:
+                    # Record audio and use the engine selected by the wake word
+                    audio_clip = self._record_from_passive_stream(audio_ring, next_block, stop_event)
+                    return self.recognize(audio_clip, engine) if audio_clip is not None else None
+
+    def watch_for_wake_word(self, on_wake_word: Callable[[str], None], stop_event: threading.Event) -> None:
+        """
+        Listens for a wake word on the microphone until the stop event is set, e.g. while the assistant speaks.
+
+        Args:
+            on_wake_word (Callable[[str], None]): Called with the wake word heard, from this thread.
+            stop_event (threading.Event): Ends the listening when set.
+        """
+        blocks = BoundedAudioQueue(self.config.listener_queue_size, self.config.listener_queue_policy,
+                                   self.config.listener_block_timeout)
+
+        def block_callback(indata: bytes, frames: int, time_info, status) -> None:
+            blocks.put(bytes(indata))
+
+        recognizer = self.create_wake_word_recognizer()
+        with sd.RawInputStream(
+            samplerate=self.config.sound_sample_rate,
+            blocksize=self.config.sound_sample_rate * self.config.vad_frame_ms // 1000,
+            dtype='int16',
+            channels=1,
+            callback=block_callback
+        ):
+            while not stop_event.is_set():
+                try:
+                    data = blocks.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                text = self.detect_wake_word(recognizer, data, self.wake_word_cpu)
+                if text and self.engine_for_wake_word(text):
+                    on_wake_word(text)
+                    recognizer.Reset()
+
     def passive_listen(self) -> Optional[str]:
         """
         Listens passively for specific keywords and triggers corresponding recognition methods.
@@ -157,41 +686,16 @@ class SpeechRecognizerObject:
             Optional[str]: Recognized text based on keyword detection or None.
         """
         try:
+            audio_ring = self.create_utterance_ring()
             with sd.RawInputStream(
                 samplerate=self.config.sound_sample_rate,
-                blocksize=self.config.block_size,
+                blocksize=self.config.sound_sample_rate * self.config.vad_frame_ms // 1000,
                 dtype='int16',
                 channels=1,
                 callback=self._queue_callback
             ):
                 self.logger.info("Passive listening started. Press Ctrl+C to stop.")
-                recognizer = KaldiRecognizer(self.vosk_model, self.config.sound_sample_rate)
-
-                while True:
-                    data = self.audio_queue.get()
-                    if recognizer.AcceptWaveform(data):
-                        result = recognizer.Result()
-                        text = json.loads(result).get("text", "").strip()
-                        if text:
-                            self.logger.info(f"VOSK recognized: {text}")
-                            lowered_text = text.lower()
-                            if "hello" in lowered_text:
-                                # Record audio and use Google API
-                                audio_file = self.record_audio()
-                                recognized_text = self.recognize_with_google_api(audio_file)
-                                # Clean up the temporary file
-                                os.remove(audio_file)
-                                return recognized_text
-                            elif "whisper" in lowered_text:
-                                # Record audio and use Whisper
-                                audio_file = self.record_audio()
-                                recognized_text = self.recognize_with_whisper(audio_file)
-                                # Clean up the temporary file
-                                os.remove(audio_file)
-                                return recognized_text
-                    else:
-                        partial_result = recognizer.PartialResult()
-                        self.logger.info(f"Partial Result: {partial_result}")
+                return self.listen_for_command(self.audio_queue.get, audio_ring)
         except KeyboardInterrupt:
             self.logger.info("Passive listening stopped by user.")
         except Exception as e:
@@ -0,0 +1,185 @@
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+
+class VadEndpointer:
+    """
+    An energy based voice activity detector that finds a single utterance in a stream of 16-bit mono PCM frames.
+
+    The endpointer never stores audio itself: it tracks the absolute stream positions of the frames it is fed, so
+    the caller can slice the utterance out of its capture buffer. The start of the utterance reaches back over a
+    rolling pre-roll window, so the first syllable is not clipped, and its end is set by a trailing silence, the
+    maximum utterance length or the no-speech timeout.
+    """
+    SILENCE = "silence"
+    MAX_DURATION = "max_duration"
+    NO_SPEECH = "no_speech"
+
+    def __init__(self, frame_ms: int, pre_roll_ms: int, start_speech_ms: int, trailing_silence_ms: int,
+                 max_duration: float, no_speech_timeout: float, energy_threshold: float) -> None:
+        """
+        Initialize the VadEndpointer class.
+
+        Args:
+            frame_ms (int): Duration of every frame passed to `process`, in milliseconds.
+            pre_roll_ms (int): Audio kept from before the speech onset, in milliseconds.
+            start_speech_ms (int): Consecutive voiced audio needed to declare a speech onset, in milliseconds.
+            trailing_silence_ms (int): Silence after speech that ends the utterance, in milliseconds.
+            max_duration (float): Maximum utterance length, in seconds.
+            no_speech_timeout (float): Time to wait for a speech onset before giving up, in seconds.
+            energy_threshold (float): RMS energy above which a frame is considered voiced.
+        """
+        self.frame_ms = frame_ms
+        self.energy_threshold = energy_threshold
+        self._start_frames = self._to_frames(start_speech_ms)
+        self._pre_roll_frames = self._to_frames(pre_roll_ms) + self._start_frames
+        self._trailing_frames = self._to_frames(trailing_silence_ms)
+        self._max_frames = self._to_frames(max_duration * 1000)
+        self._no_speech_frames = self._to_frames(no_speech_timeout * 1000)
+        self.reset()
+
+    def _to_frames(self, duration_ms: float) -> int:
+        return max(1, int(duration_ms / self.frame_ms))
+
+    def reset(self) -> None:
+        """
+        Forget the current utterance and wait for a new speech onset.
+        """
+        self.in_speech = False
+        self.start_position: Optional[int] = None
+        self.end_position: Optional[int] = None
+        self._pre_roll = deque(maxlen=self._pre_roll_frames)
+        self._utterance_frames = 0
+        self._frames_seen = 0
+        self._voiced_run = 0
+        self._silence_run = 0
+
+    @staticmethod
+    def frame_energy(frame: bytes) -> float:
+        """
+        Compute the RMS energy of a 16-bit PCM frame.
+
+        Args:
+            frame (bytes): Raw audio frame.
+
+        Returns:
+            float: The RMS energy of the frame.
+        """
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        return float(np.sqrt(np.mean(samples ** 2))) if samples.size else 0.0
+
+    def is_speech(self, frame: bytes) -> bool:
+        return self.frame_energy(frame) > self.energy_threshold
+
+    def process(self, frame: bytes, end_position: int) -> Optional[str]:
+        """
+        Feed the next frame to the endpointer.
+
+        Args:
+            frame (bytes): Raw audio frame of `frame_ms` milliseconds.
+            end_position (int): Absolute stream position right after the frame.
+
+        Returns:
+            Optional[str]: The reason the utterance ended (`SILENCE`, `MAX_DURATION` or `NO_SPEECH`),
+            or None while it is still in progress.
+        """
+        self._frames_seen += 1
+        voiced = self.is_speech(frame)
+
+        if not self.in_speech:
+            self._pre_roll.append(end_position - len(frame))
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self._start_frames:
+                self.in_speech = True
+                self.start_position = self._pre_roll[0]
+                self.end_position = end_position
+                self._utterance_frames = len(self._pre_roll)
+                self._pre_roll.clear()
+            elif self._frames_seen >= self._no_speech_frames:
+                return self.NO_SPEECH
+            return None
+
+        self.end_position = end_position
+        self._utterance_frames += 1
+        self._silence_run = 0 if voiced else self._silence_run + 1
+        if self._silence_run >= self._trailing_frames:
+            return self.SILENCE
+        if self._utterance_frames >= self._max_frames:
+            return self.MAX_DURATION
+        return None
+
+    @property
+    def duration(self) -> float:
+        """
+        Returns:
+            float: Length of the captured utterance in seconds.
+        """
+        return self._utterance_frames * self.frame_ms / 1000
+
+
+class NoiseFloorEstimator:
+    """
+    Tracks the ambient noise floor of a stream, so recordings can start without a calibration pause.
+
+    The floor is an exponential moving average of the frame energies that follows quiet frames within
+    `time_constant` seconds and adapts ten times slower to frames loud enough to be speech, so talking does
+    not drag it up while a lasting change in background noise still does. The speech threshold is the floor
+    times `ratio`, never below `min_threshold`.
+    """
+    SPEECH_ADAPTATION = 0.1
+
+    def __init__(self, sample_rate: int, time_constant: float, ratio: float, min_threshold: float,
+                 warmup: float) -> None:
+        """
+        Initialize the NoiseFloorEstimator class.
+
+        Args:
+            sample_rate (int): Sample rate of the 16-bit mono stream.
+            time_constant (float): Seconds of quiet audio the estimate needs to settle on a new floor.
+            ratio (float): How far above the floor a frame must be to count as speech.
+            min_threshold (float): Lowest speech threshold ever reported.
+            warmup (float): Seconds of audio needed before the estimate is trusted.
+        """
+        self.sample_rate = sample_rate
+        self.time_constant = time_constant
+        self.ratio = ratio
+        self.min_threshold = min_threshold
+        self.warmup = warmup
+        self.floor: Optional[float] = None
+        self.audio_seconds = 0.0
+
+    @property
+    def threshold(self) -> float:
+        """
+        Returns:
+            float: The current RMS energy above which a frame is considered speech.
+        """
+        return max(self.min_threshold, (self.floor or 0.0) * self.ratio)
+
+    @property
+    def is_warm(self) -> bool:
+        return self.audio_seconds >= self.warmup
+
+    def update(self, frame: bytes) -> float:
+        """
+        Fold a frame of the stream into the estimate.
+
+        Args:
+            frame (bytes): Raw 16-bit mono audio of any length.
+
+        Returns:
+            float: The updated noise floor.
+        """
+        frame_seconds = len(frame) / (self.sample_rate * 2)
+        energy = VadEndpointer.frame_energy(frame)
+        self.audio_seconds += frame_seconds
+        if self.floor is None:
+            self.floor = energy
+            return self.floor
+        weight = min(1.0, frame_seconds / self.time_constant)
+        if energy > self.threshold:
+            weight *= self.SPEECH_ADAPTATION
+        self.floor += weight * (energy - self.floor)
+        return self.floor
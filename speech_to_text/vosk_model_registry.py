@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+from vosk import Model, KaldiRecognizer
+
+from utils.logger import JarvisLogger, SingletonMeta
+from utils.metrics import get_resident_memory_bytes
+
+logger = JarvisLogger("VoskModelRegistry")
+
+
+class VoskModelRegistry(metaclass=SingletonMeta):
+    """
+    A process-wide registry that loads every VOSK model path once and shares the model across recognizers.
+
+    Models are loaded on first use, or ahead of time on a background thread with `preload`. Callers that ask
+    for a model while it is still loading wait for that single load instead of starting another one.
+    """
+
+    def __init__(self) -> None:
+        self._models: Dict[str, Future] = {}
+        self._load_stats: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _claim(self, model_path: str) -> tuple[Future, bool]:
+        """
+        Get the future of a model, creating it if this is the first request for the path.
+
+        Returns:
+            tuple[Future, bool]: The model future and whether the caller is responsible for loading it.
+        """
+        with self._lock:
+            if model_path in self._models:
+                return self._models[model_path], False
+            model_future = Future()
+            self._models[model_path] = model_future
+            return model_future, True
+
+    def _load(self, model_path: str, model_future: Future) -> None:
+        logger.info(f"Loading VOSK model from {model_path}...")
+        memory_before = get_resident_memory_bytes()
+        start_time = time.perf_counter()
+        try:
+            model = Model(model_path)
+        except Exception as e:
+            logger.error(f"Failed to load VOSK model: {e}")
+            with self._lock:
+                # Forget the failure so a later call can retry the load
+                del self._models[model_path]
+            model_future.set_exception(e)
+            return
+        load_stats = {"load_time": time.perf_counter() - start_time,
+                      "resident_size": max(0, get_resident_memory_bytes() - memory_before)}
+        self._load_stats[model_path] = load_stats
+        logger.info(f"VOSK model loaded in {load_stats['load_time']:.2f}s "
+                    f"(~{load_stats['resident_size'] / 2 ** 20:.0f} MB resident).")
+        model_future.set_result(model)
+
+    def preload(self, model_path: str) -> Future:
+        """
+        Start loading a model on a background thread, unless it is already loaded or loading.
+
+        Args:
+            model_path (str): Path to the VOSK model.
+
+        Returns:
+            Future: Resolves to the loaded model.
+        """
+        model_future, should_load = self._claim(model_path)
+        if should_load:
+            threading.Thread(target=self._load, args=(model_path, model_future),
+                             name="vosk-model-loader", daemon=True).start()
+        return model_future
+
+    def get_model(self, model_path: str, timeout: Optional[float] = None) -> Model:
+        """
+        Get a shared model, loading it in the calling thread on first use.
+
+        Args:
+            model_path (str): Path to the VOSK model.
+            timeout (float, optional): Seconds to wait for a background load in progress.
+
+        Returns:
+            Model: The loaded VOSK model.
+        """
+        model_future, should_load = self._claim(model_path)
+        if should_load:
+            self._load(model_path, model_future)
+        return model_future.result(timeout=timeout)
+
+    def create_recognizer(self, model_path: str, sample_rate: int,
+                          grammar: Optional[List[str]] = None) -> KaldiRecognizer:
+        """
+        Create a recognizer backed by the shared model.
+
+        Args:
+            model_path (str): Path to the VOSK model.
+            sample_rate (int): Sample rate of the audio the recognizer will be fed.
+            grammar (List[str], optional): Phrases the recognizer is restricted to (add "[unk]" to let it
+                reject everything else). Open-vocabulary decoding is used when not given.
+
+        Returns:
+            KaldiRecognizer: A new recognizer; recognizers are stateful, so use one per stream.
+        """
+        if grammar is not None:
+            return KaldiRecognizer(self.get_model(model_path), sample_rate, json.dumps(grammar))
+        return KaldiRecognizer(self.get_model(model_path), sample_rate)
+
+    def get_load_stats(self) -> Dict[str, dict]:
+        """
+        Get the startup cost of every loaded model.
+
+        The resident size is the growth of the process RSS over the load, so it is only an estimate when other
+        threads allocate memory at the same time.
+
+        Returns:
+            dict: `load_time` (seconds) and `resident_size` (bytes) per model path.
+        """
+        return dict(self._load_stats)
@@ -0,0 +1,66 @@
+from typing import Dict, List, Optional
+
+from vosk import KaldiRecognizer
+
+from speech_to_text.vosk_model_registry import VoskModelRegistry
+
+
+class WakeWordSpotter:
+    """
+    Keyword spotting with a VOSK recognizer restricted to the configured wake phrases.
+
+    The recognizer's grammar only holds the wake phrases plus "[unk]", which soaks up any other speech. That
+    makes decoding far cheaper than open-vocabulary recognition, and the word-level confidences VOSK returns
+    are checked against a threshold per phrase to keep false wake-ups down.
+    """
+    UNKNOWN = "[unk]"
+
+    def __init__(self, thresholds: Dict[str, float]) -> None:
+        """
+        Initialize the WakeWordSpotter class.
+
+        Args:
+            thresholds (Dict[str, float]): Wake phrase to the minimum word confidence (0-1) needed to accept it.
+        """
+        self.thresholds = {phrase.lower(): threshold for phrase, threshold in thresholds.items()}
+
+    @property
+    def grammar(self) -> List[str]:
+        return list(self.thresholds) + [self.UNKNOWN]
+
+    def create_recognizer(self, registry: VoskModelRegistry, model_path: str, sample_rate: int) -> KaldiRecognizer:
+        """
+        Create a grammar-constrained recognizer that reports word confidences.
+
+        Args:
+            registry (VoskModelRegistry): Registry holding the shared model.
+            model_path (str): Path to the VOSK model.
+            sample_rate (int): Sample rate of the audio the recognizer will be fed.
+
+        Returns:
+            KaldiRecognizer: The keyword-spotting recognizer.
+        """
+        recognizer = registry.create_recognizer(model_path, sample_rate, grammar=self.grammar)
+        recognizer.SetWords(True)
+        return recognizer
+
+    def match(self, result: dict) -> Optional[str]:
+        """
+        Find a confidently spoken wake phrase in a VOSK result.
+
+        Args:
+            result (dict): A parsed `Result()` of a recognizer created by `create_recognizer`.
+
+        Returns:
+            Optional[str]: The wake phrase whose every word reached the phrase threshold, or None.
+        """
+        words = result.get("result", [])
+        spoken = [word["word"] for word in words]
+        for phrase, threshold in self.thresholds.items():
+            phrase_words = phrase.split()
+            for start in range(len(spoken) - len(phrase_words) + 1):
+                if spoken[start:start + len(phrase_words)] != phrase_words:
+                    continue
+                if min(word.get("conf", 0.0) for word in words[start:start + len(phrase_words)]) >= threshold:
+                    return phrase
+        return None
@@ -0,0 +1,206 @@
+"""
+Faster-than-real-time replay benchmark for the speech-to-text pipeline.
+
+WAV fixtures (16-bit mono at `sound_sample_rate`) are fed block by block through the same code that
+`SpeechRecognizerObject.passive_listen` runs on a live microphone: wake-word detection, the noise floor, the
+VAD endpointing of the command and the recognition routing. Cloud engines are replaced with local stubs, so
+the numbers only reflect the local hot path.
+
+The fixtures are listed in a JSON manifest:
+
+    {"fixtures": [{"path": "kitchen_hello.wav", "wake_word_ends": [2.4, 31.0]},
+                  {"path": "quiet_night.wav"}]}
+
+`wake_word_ends` are the times (in seconds) where each wake word ends in the fixture, used to measure the
+detection latency. Long silent stretches can also be generated with `--silence`.
+
+Usage:
+    python -m testing.stt_benchmark manifest.json --silence 3600
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from speech_to_text.audio_buffer import AudioClip
+from speech_to_text.stt_object import SpeechRecognizerObject
+from utils.logger import JarvisLogger
+from utils.metrics import LatencyStats, get_peak_resident_memory_bytes
+
+logger = JarvisLogger("SttBenchmark")
+
+
+class BenchmarkSpeechRecognizer(SpeechRecognizerObject):
+    """
+    A SpeechRecognizerObject that records where wake words are detected and never calls a cloud engine.
+    """
+
+    def __init__(self, cloud_latency: float = 0.0) -> None:
+        # The cloud clients are constructed but never used, so any placeholder key will do
+        os.environ.setdefault("OPENAI_API_KEY", "benchmark-stub")
+        super().__init__()
+        self.stream_position = 0.0
+        self.detections: List[float] = []
+        self.cloud_calls = 0
+        self.cloud_engines = {engine: self._stub_engine for engine in self.cloud_engines}
+        self.cloud_latency = cloud_latency
+
+    def _stub_engine(self, audio_clip: AudioClip) -> Optional[str]:
+        self.cloud_calls += 1
+        time.sleep(self.cloud_latency)
+        return "stub transcript"
+
+    def detect_wake_word(self, recognizer, data, cpu_meter=None) -> Optional[str]:
+        text = super().detect_wake_word(recognizer, data, cpu_meter)
+        if text and self.engine_for_wake_word(text):
+            self.detections.append(self.stream_position)
+        return text
+
+
+def silence_clip(duration: float, sample_rate: int, noise_rms: float = 30.0) -> AudioClip:
+    """
+    Generate a quiet stretch of low-level white noise, like a room nobody talks in.
+
+    Args:
+        duration (float): Length in seconds.
+        sample_rate (int): Sample rate in Hz.
+        noise_rms (float): RMS energy of the background noise.
+
+    Returns:
+        AudioClip: The generated 16-bit mono clip.
+    """
+    samples = np.random.default_rng(0).normal(0.0, noise_rms, int(duration * sample_rate))
+    return AudioClip(samples.astype(np.int16).tobytes(), sample_rate)
+
+
+def replay(stt_object: BenchmarkSpeechRecognizer, audio_clip: AudioClip) -> None:
+    """
+    Feed a clip through the passive-listening loop as fast as the CPU allows.
+
+    Args:
+        stt_object (BenchmarkSpeechRecognizer): The recognizer under test.
+        audio_clip (AudioClip): 16-bit mono audio at `sound_sample_rate`.
+    """
+    config = stt_object.config
+    if audio_clip.sample_rate != config.sound_sample_rate or audio_clip.channels != 1 or \
+            audio_clip.sample_width != 2:
+        raise ValueError(f"Fixtures must be 16-bit mono at {config.sound_sample_rate} Hz.")
+
+    pcm = bytes(audio_clip.pcm)
+    block_bytes = config.sound_sample_rate * config.vad_frame_ms // 1000 * 2
+    audio_ring = stt_object.create_utterance_ring()
+    stop_event = threading.Event()
+    offset = 0
+
+    def next_block() -> Optional[bytes]:
+        nonlocal offset
+        if offset + block_bytes > len(pcm):
+            stop_event.set()
+            return None
+        block = pcm[offset:offset + block_bytes]
+        offset += block_bytes
+        stt_object.stream_position = offset / (config.sound_sample_rate * 2)
+        return block
+
+    while not stop_event.is_set():
+        stt_object.listen_for_command(next_block, audio_ring, stop_event)
+
+
+def match_detections(detections: List[float], wake_word_ends: List[float],
+                     max_latency: float = 3.0) -> tuple[List[float], int, int]:
+    """
+    Pair every annotated wake word with the first detection that follows it.
+
+    Returns:
+        tuple[List[float], int, int]: Detection latencies in seconds, missed wake words and false detections.
+    """
+    latencies = []
+    unmatched = sorted(detections)
+    missed = 0
+    for wake_word_end in sorted(wake_word_ends):
+        detection = next((d for d in unmatched if wake_word_end <= d <= wake_word_end + max_latency), None)
+        if detection is None:
+            missed += 1
+            continue
+        unmatched.remove(detection)
+        latencies.append(detection - wake_word_end)
+    return latencies, missed, len(unmatched)
+
+
+def run_benchmark(manifest_path: Optional[str], silence: float = 0.0, cloud_latency: float = 0.0) -> dict:
+    """
+    Replay every fixture and collect the pipeline metrics.
+
+    Args:
+        manifest_path (str, optional): JSON manifest of the WAV fixtures.
+        silence (float): Seconds of generated silence to replay as an extra fixture.
+        cloud_latency (float): Simulated latency of the stubbed cloud engines, in seconds.
+
+    Returns:
+        dict: Real-time factor, wake-word latency, CPU per audio hour and peak memory, overall and per fixture.
+    """
+    stt_object = BenchmarkSpeechRecognizer(cloud_latency)
+    # Load the model up front, it is not part of the listening loop
+    stt_object.vosk_registry.get_model(stt_object.config.vosk_model_path)
+
+    fixtures = []
+    if manifest_path:
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+        base_dir = os.path.dirname(os.path.abspath(manifest_path))
+        for fixture in manifest["fixtures"]:
+            fixture_path = os.path.join(base_dir, fixture["path"])
+            fixtures.append((fixture["path"], AudioClip.from_wav_file(fixture_path), fixture.get("wake_word_ends", [])))
+    if silence:
+        fixtures.append((f"generated silence ({silence:.0f}s)",
+                         silence_clip(silence, stt_object.config.sound_sample_rate), []))
+
+    results = {"fixtures": {}}
+    total_audio = total_wall = total_cpu = 0.0
+    all_latencies = LatencyStats()
+    for name, audio_clip, wake_word_ends in fixtures:
+        stt_object.detections = []
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        replay(stt_object, audio_clip)
+        wall_time, cpu_time = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+        latencies, missed, false_detections = match_detections(stt_object.detections, wake_word_ends)
+        fixture_latencies = LatencyStats()
+        for latency in latencies:
+            fixture_latencies.add(latency)
+            all_latencies.add(latency)
+        results["fixtures"][name] = {
+            "audio_seconds": audio_clip.duration,
+            "real_time_factor": wall_time / audio_clip.duration,
+            "cpu_seconds_per_audio_hour": cpu_time / audio_clip.duration * 3600,
+            "wake_word_latency": fixture_latencies.summary(),
+            "missed_wake_words": missed,
+            "false_detections": false_detections,
+        }
+        total_audio += audio_clip.duration
+        total_wall += wall_time
+        total_cpu += cpu_time
+
+    if total_audio:
+        results["real_time_factor"] = total_wall / total_audio
+        results["cpu_seconds_per_audio_hour"] = total_cpu / total_audio * 3600
+    results["wake_word_latency"] = all_latencies.summary()
+    results["cloud_calls"] = stt_object.cloud_calls
+    results["peak_resident_memory_bytes"] = get_peak_resident_memory_bytes()
+    results["model_load"] = stt_object.vosk_registry.get_load_stats()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay WAV fixtures through the STT pipeline.")
+    parser.add_argument("manifest", nargs="?", help="JSON manifest of the WAV fixtures")
+    parser.add_argument("--silence", type=float, default=0.0, help="seconds of generated silence to replay")
+    parser.add_argument("--cloud-latency", type=float, default=0.0, help="simulated cloud latency in seconds")
+    args = parser.parse_args()
+    if not args.manifest and not args.silence:
+        parser.error("give a manifest, --silence, or both")
+    print(json.dumps(run_benchmark(args.manifest, args.silence, args.cloud_latency), indent=2))
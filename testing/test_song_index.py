@@ -0,0 +1,29 @@
+import unittest
+
+from action_handling.spotify_api.song_index import SongIndex
+
+
+class SongIndexPrefixTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = SongIndex()
+        self.index.add("Bohemian Rhapsody", "Queen", "spotify:track:bohemian")
+        self.index.add("Let It Be", "The Beatles", "spotify:track:let-it-be")
+
+    def test_whole_word_prefix_resolves(self) -> None:
+        self.assertEqual(self.index.resolve("play bohemian").uri, "spotify:track:bohemian")
+        self.assertEqual(self.index.resolve("play let it").uri, "spotify:track:let-it-be")
+
+    def test_single_letter_does_not_resolve(self) -> None:
+        self.assertIsNone(self.index.resolve("play b"))
+        self.assertIsNone(self.index.resolve("play l"))
+
+    def test_partial_word_does_not_resolve(self) -> None:
+        self.assertIsNone(self.index.resolve("play bohem"))
+        self.assertIsNone(self.index.resolve("play let i"))
+
+    def test_short_whole_word_does_not_resolve(self) -> None:
+        self.assertIsNone(self.index.resolve("play let"))
+
+
+if __name__ == '__main__':
+    unittest.main()
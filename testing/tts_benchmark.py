@@ -0,0 +1,244 @@
+"""
+Benchmark of per-sentence parallel TTS synthesis against a single synthesis call for the whole text.
+
+A local stand-in for the speech endpoint is started on a free port and `TTSObject` talks to it through the real
+OpenAI client. The stand-in answers with silent PCM after a delay that grows with the length of the text, and
+then streams the audio faster than real time, which is roughly how the hosted endpoint behaves. Playback is
+simulated in real time without a sound device, so the wall time includes the audio duration as it would live.
+
+For every text the benchmark measures the time to first audio and the total wall time of:
+    - single_call: one request for the whole text, streamed as it downloads
+    - sequential: one request per sentence, one at a time
+    - parallel: one request per sentence on `--workers` workers, played strictly in order
+
+Usage:
+    python -m testing.tts_benchmark --workers 3 --base-latency 0.4 --per-char-latency 0.004
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, List, Optional
+
+from openai import OpenAI
+
+from text_to_speech.playback_engine import SAMPLE_BYTES, PlaybackEngine
+from text_to_speech.tts_config import TTSConfig
+from text_to_speech.tts_object import TTSObject
+from utils.logger import JarvisLogger
+from utils.metrics import LatencyStats
+from utils.text_chunking import iter_sentences
+
+logger = JarvisLogger("TtsBenchmark")
+
+config = TTSConfig()
+
+SPEECH_CHARS_PER_SECOND = 15.0  # Roughly how fast the voices speak
+
+TEXTS = [
+    "Sure. The capital of France is Paris. It is known for the Eiffel Tower, the Louvre and its cafes. "
+    "Would you like to know more about its history?",
+    "Here is the weather for today. It will be sunny in the morning with a light breeze from the west. "
+    "Clouds will move in during the afternoon, and there is a small chance of rain in the evening. "
+    "Temperatures will range from twelve to nineteen degrees.",
+    "I set a timer for ten minutes. I will let you know when it is done.",
+]
+
+
+class StandInSpeechServer:
+    """
+    A local HTTP server that answers `POST /v1/audio/speech` like the hosted endpoint, with silent PCM.
+    """
+
+    def __init__(self, base_latency: float, per_char_latency: float, speed: float) -> None:
+        """
+        Initialize the StandInSpeechServer class.
+
+        Args:
+            base_latency (float): Seconds before the first byte of any request.
+            per_char_latency (float): Extra seconds before the first byte per character of input.
+            speed (float): How many times faster than real time the audio is streamed after the first byte.
+        """
+        self.requests = 0
+        server = self
+
+        class SpeechHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                server.requests += 1
+                text = body["input"]
+                time.sleep(base_latency + per_char_latency * len(text))
+
+                audio_seconds = len(text) / SPEECH_CHARS_PER_SECOND
+                total_bytes = int(audio_seconds * config.PCM_SAMPLE_RATE) * SAMPLE_BYTES
+                chunk_bytes = config.STREAM_CHUNK_SIZE
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/pcm")
+                self.send_header("Content-Length", str(total_bytes))
+                self.end_headers()
+                for start in range(0, total_bytes, chunk_bytes):
+                    chunk = bytes(min(chunk_bytes, total_bytes - start))
+                    self.wfile.write(chunk)
+                    time.sleep(len(chunk) / (config.PCM_SAMPLE_RATE * SAMPLE_BYTES) / speed)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), SpeechHandler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stand-in-tts", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def __enter__(self) -> "StandInSpeechServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class RealTimeOutput:
+    """
+    Stands in for the sound device: takes as long to write audio as it takes to play it.
+    """
+
+    def __init__(self, sample_rate: int) -> None:
+        self.bytes_per_second = sample_rate * SAMPLE_BYTES
+        self.active = False
+
+    def start(self) -> None:
+        self.active = True
+
+    def abort(self) -> None:
+        self.active = False
+
+    def close(self) -> None:
+        self.active = False
+
+    def write(self, data: bytes) -> None:
+        time.sleep(len(data) / self.bytes_per_second)
+
+
+class SimulatedPlaybackEngine(PlaybackEngine):
+    """
+    A PlaybackEngine that plays PCM on a `RealTimeOutput` instead of the sound device.
+    """
+
+    def _open_pcm_stream(self):
+        if self._pcm_stream is None:
+            self._pcm_stream = RealTimeOutput(self.sample_rate)
+        return super()._open_pcm_stream()
+
+
+def create_benchmark_tts(base_url: str) -> TTSObject:
+    """
+    Create a TTSObject that synthesizes on the stand-in server, without the cache and the sound device.
+    """
+    # The placeholder key is only ever sent to the stand-in server
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark-stub")
+    tts_object = TTSObject(use_cache=False)
+    tts_object.client = OpenAI(base_url=base_url, api_key="benchmark-stub", max_retries=0)
+    tts_object.playback.close()
+    tts_object.playback = SimulatedPlaybackEngine(config.PCM_SAMPLE_RATE, config.PLAYBACK_SLICE_MS)
+    return tts_object
+
+
+def time_speech(speak: Callable[[Callable[[], None]], None]) -> tuple[Optional[float], float]:
+    """
+    Run one speech call.
+
+    Args:
+        speak (Callable): Speaks, calling the given callback right before the first audio plays.
+
+    Returns:
+        tuple[Optional[float], float]: Time to first audio and total wall time, in seconds.
+    """
+    start = time.perf_counter()
+    marks = {}
+
+    def on_first_audio():
+        marks.setdefault("first_audio", time.perf_counter() - start)
+
+    speak(on_first_audio)
+    return marks.get("first_audio"), time.perf_counter() - start
+
+
+def single_call(tts_object: TTSObject, text: str, on_first_audio: Callable[[], None]) -> None:
+    def chunks() -> Iterator[bytes]:
+        for chunk in tts_object.stream_speech(text):
+            on_first_audio()
+            yield chunk
+
+    tts_object.playback.play_pcm(chunks()).result()
+
+
+def talk_sentences(tts_object: TTSObject, text: str, on_first_audio: Callable[[], None]) -> None:
+    tts_object.talk_stream(iter_sentences([text], config.MIN_SENTENCE_LENGTH), on_first_audio)
+
+
+def run_benchmark(workers: int, base_latency: float, per_char_latency: float, speed: float,
+                  rounds: int = 1, texts: Optional[List[str]] = None) -> dict:
+    """
+    Speak every text in each mode and collect the time to first audio and the wall time.
+
+    Args:
+        workers (int): Synthesis workers of the parallel mode.
+        base_latency (float): Stand-in latency of every request, in seconds.
+        per_char_latency (float): Stand-in latency per input character, in seconds.
+        speed (float): Stand-in streaming speed, as a multiple of real time.
+        rounds (int): Times every text is spoken in every mode.
+        texts (List[str], optional): The texts to speak, a few assistant-like answers by default.
+
+    Returns:
+        dict: Time to first audio and wall time summaries per mode, and per mode and text.
+    """
+    texts = texts or TEXTS
+    # Mode to how it speaks a text and its number of synthesis workers
+    modes = {"single_call": (single_call, 1), "sequential": (talk_sentences, 1), "parallel": (talk_sentences, workers)}
+    results = {}
+    with StandInSpeechServer(base_latency, per_char_latency, speed) as server:
+        tts_object = create_benchmark_tts(server.base_url)
+        for mode, (speak, mode_workers) in modes.items():
+            tts_object.synthesis_pool.shutdown()
+            tts_object.synthesis_pool = ThreadPoolExecutor(max_workers=mode_workers, thread_name_prefix="tts-synthesis")
+            first_audio, wall_time = LatencyStats(), LatencyStats()
+            per_text = {}
+            for index, text in enumerate(texts):
+                text_first_audio, text_wall_time = LatencyStats(), LatencyStats()
+                for _ in range(rounds):
+                    first, wall = time_speech(lambda on_first_audio: speak(tts_object, text, on_first_audio))
+                    for stats, value in ((first_audio, first), (text_first_audio, first),
+                                         (wall_time, wall), (text_wall_time, wall)):
+                        stats.add(value)
+                per_text[f"text_{index}"] = {"characters": len(text),
+                                             "audio_seconds": len(text) / SPEECH_CHARS_PER_SECOND,
+                                             "time_to_first_audio": text_first_audio.summary()["mean"],
+                                             "wall_time": text_wall_time.summary()["mean"]}
+            results[mode] = {"time_to_first_audio": first_audio.summary(), "wall_time": wall_time.summary(),
+                             "texts": per_text}
+            logger.info(f"{mode}: mean time to first audio {first_audio.summary()['mean']:.2f}s, "
+                        f"mean wall time {wall_time.summary()['mean']:.2f}s.")
+        results["requests"] = server.requests
+        tts_object.playback.close()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare per-sentence parallel TTS with a single synthesis call.")
+    parser.add_argument("--workers", type=int, default=config.SYNTHESIS_WORKERS, help="parallel synthesis workers")
+    parser.add_argument("--base-latency", type=float, default=0.4, help="stand-in latency per request in seconds")
+    parser.add_argument("--per-char-latency", type=float, default=0.004,
+                        help="stand-in latency per input character in seconds")
+    parser.add_argument("--speed", type=float, default=4.0, help="stand-in streaming speed, times real time")
+    parser.add_argument("--rounds", type=int, default=1, help="times every text is spoken in every mode")
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.workers, args.base_latency, args.per_char_latency, args.speed,
+                                   args.rounds), indent=2))
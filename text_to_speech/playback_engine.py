@@ -0,0 +1,222 @@
+import io
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Iterable, Optional, Union
+
+import pygame
+import sounddevice as sd
+
+from utils.logger import JarvisLogger
+from utils.metrics import LatencyStats
+
+logger = JarvisLogger('PlaybackEngine')
+
+SAMPLE_BYTES = 2  # 16-bit mono PCM
+
+
+@dataclass
+class PlaybackJob:
+    audio: Union[bytes, Iterable[bytes]]  # MP3 bytes, or an iterable of PCM chunks
+    is_pcm: bool
+    generation: int
+    future: Future
+
+
+class PlaybackEngine:
+    """
+    A long-lived audio output that plays queued clips on its own thread.
+
+    The output stream and the pygame mixer are opened once and reused by every clip. Clips are played in the
+    order they were queued, and each one returns a Future that resolves to True when it played to the end and
+    False when it was interrupted. `stop` interrupts the current clip and drops the queued ones from any thread,
+    e.g. the wake-word listener barging in, and the time until the audio actually stopped is recorded.
+    """
+
+    def __init__(self, sample_rate: int, slice_ms: int = 20, poll_interval: float = 0.01) -> None:
+        """
+        Initialize the PlaybackEngine class.
+
+        Args:
+            sample_rate (int): Sample rate of the PCM clips.
+            slice_ms (int): PCM is written in slices of this length, which bounds how long an interrupt waits.
+            poll_interval (float): Seconds between checks of whether an MP3 clip is still playing.
+        """
+        self.sample_rate = sample_rate
+        self.slice_bytes = sample_rate * SAMPLE_BYTES * slice_ms // 1000
+        self.poll_interval = poll_interval
+        self.interrupt_latency = LatencyStats()
+        self.stats = {"played": 0, "interrupted": 0, "dropped": 0, "failed": 0}
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped on stop, so clips queued before the stop are dropped
+        self._current: Optional[PlaybackJob] = None
+        self._interrupt = threading.Event()
+        self._interrupt_requested_at = 0.0
+        self._pcm_stream = None
+        self._thread = threading.Thread(target=self._run, name="tts-playback", daemon=True)
+        self._thread.start()
+
+    @property
+    def generation(self) -> int:
+        """
+        Incremented by every `stop`, so callers can tell whether they were interrupted between clips.
+        """
+        return self._generation
+
+    @property
+    def is_playing(self) -> bool:
+        return self._current is not None or not self._jobs.empty()
+
+    def _submit(self, audio: Union[bytes, Iterable[bytes]], is_pcm: bool) -> Future:
+        future = Future()
+        with self._lock:
+            self._jobs.put(PlaybackJob(audio, is_pcm, self._generation, future))
+        return future
+
+    def play_pcm(self, chunks: Iterable[bytes]) -> Future:
+        """
+        Queue a clip of 16-bit mono PCM, played chunk by chunk as the iterable yields them.
+
+        Args:
+            chunks (Iterable[bytes]): The audio, e.g. a download that is still in progress.
+
+        Returns:
+            Future: Resolves to True when the clip played to the end, False when it was interrupted.
+        """
+        return self._submit(chunks, is_pcm=True)
+
+    def play_mp3(self, audio: bytes) -> Future:
+        """
+        Queue an MP3 clip.
+
+        Args:
+            audio (bytes): The MP3 audio.
+
+        Returns:
+            Future: Resolves to True when the clip played to the end, False when it was interrupted.
+        """
+        return self._submit(audio, is_pcm=False)
+
+    def stop(self) -> int:
+        """
+        Interrupt the current clip and drop the queued ones.
+
+        Returns:
+            int: Number of clips stopped or dropped.
+        """
+        dropped = []
+        with self._lock:
+            self._generation += 1
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    # Keep the shutdown request of close
+                    self._jobs.put(None)
+                    break
+                dropped.append(job)
+            self.stats["dropped"] += len(dropped)
+            stopped = len(dropped)
+            if self._current is not None and not self._interrupt.is_set():
+                self._interrupt_requested_at = time.perf_counter()
+                self._interrupt.set()
+                stopped += 1
+        # Dropped clips resolve like interrupted ones, so waiting callers return False instead of raising
+        for job in dropped:
+            job.future.set_result(False)
+        return stopped
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop playback and shut the playback thread down.
+        """
+        self.stop()
+        self._jobs.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while (job := self._jobs.get()) is not None:
+            with self._lock:
+                # A stop that landed after the job was dequeued finds it neither queued nor playing
+                stale = job.generation != self._generation
+                if stale:
+                    self.stats["dropped"] += 1
+                elif job.future.set_running_or_notify_cancel():
+                    self._current = job
+                    self._interrupt.clear()
+                else:
+                    continue
+            if stale:
+                job.future.set_result(False)
+                continue
+            try:
+                completed = self._play_pcm(job.audio) if job.is_pcm else self._play_mp3(job.audio)
+            except Exception as e:
+                logger.error(f"Audio playback failed: {e}")
+                with self._lock:
+                    self._current = None
+                    self.stats["failed"] += 1
+                job.future.set_exception(e)
+                continue
+            with self._lock:
+                self._current = None
+                if completed:
+                    self.stats["played"] += 1
+                else:
+                    self.stats["interrupted"] += 1
+                    self.interrupt_latency.add(time.perf_counter() - self._interrupt_requested_at)
+            job.future.set_result(completed)
+        if self._pcm_stream is not None:
+            self._pcm_stream.close()
+
+    def _open_pcm_stream(self):
+        if self._pcm_stream is None:
+            self._pcm_stream = sd.RawOutputStream(samplerate=self.sample_rate, channels=1, dtype='int16')
+        if not self._pcm_stream.active:
+            self._pcm_stream.start()
+        return self._pcm_stream
+
+    def _play_pcm(self, chunks: Iterable[bytes]) -> bool:
+        stream = self._open_pcm_stream()
+        remainder = b""
+        for chunk in chunks:
+            # Chunks may split a sample in two, only whole samples can be written
+            data = remainder + chunk
+            whole = len(data) - len(data) % SAMPLE_BYTES
+            remainder = data[whole:]
+            for start in range(0, whole, self.slice_bytes):
+                if self._interrupt.is_set():
+                    # Drop what is still buffered in the device instead of letting it play out
+                    stream.abort()
+                    return False
+                stream.write(data[start:min(start + self.slice_bytes, whole)])
+        if self._interrupt.is_set():
+            stream.abort()
+            return False
+        return True
+
+    def _play_mp3(self, audio: bytes) -> bool:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        pygame.mixer.music.load(io.BytesIO(audio), "mp3")
+        pygame.mixer.music.play()
+        while pygame.mixer.music.get_busy():
+            if self._interrupt.wait(self.poll_interval):
+                pygame.mixer.music.stop()
+                return False
+        return True
+
+    def get_stats(self) -> dict:
+        """
+        Returns:
+            dict: Played, interrupted, dropped and failed clip counts, and the interrupt latency summary.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        stats["interrupt_latency"] = self.interrupt_latency.summary()
+        return stats
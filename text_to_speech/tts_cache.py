@@ -0,0 +1,154 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from utils.logger import JarvisLogger
+
+logger = JarvisLogger('TTSCache')
+
+
+class TTSCache:
+    """
+    A content-addressed, size-bounded cache of synthesized speech on disk.
+
+    Every clip is stored under the hash of (model, voice, text), so identical phrases are synthesized once and
+    served from disk afterwards. The directory is kept under `max_bytes` by evicting the least recently played
+    clips; recency survives restarts through the file modification times.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, extension: str = "mp3") -> None:
+        """
+        Initialize the TTSCache class.
+
+        Args:
+            cache_dir (str): Directory of the cached clips, created if missing.
+            max_bytes (int): Maximum total size of the cached clips.
+            extension (str): File extension of the cached audio format.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._entries: OrderedDict[str, int] = OrderedDict()  # Key -> size, least recently used first
+        self._lock = threading.Lock()
+        self.size = 0
+        self.stats = {"hits": 0, "misses": 0, "bytes_saved": 0, "evictions": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+        clips = [entry for entry in os.scandir(cache_dir) if entry.name.endswith(f".{extension}")]
+        for entry in sorted(clips, key=lambda clip: clip.stat().st_mtime):
+            self._entries[entry.name.rsplit(".", 1)[0]] = entry.stat().st_size
+            self.size += entry.stat().st_size
+
+    @staticmethod
+    def key(text: str, voice: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\0{voice}\0{text}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{self.extension}")
+
+    def get(self, text: str, voice: str, model: str) -> Optional[bytes]:
+        """
+        Get a cached clip.
+
+        Args:
+            text (str): The spoken text.
+            voice (str): The TTS voice.
+            model (str): The TTS model.
+
+        Returns:
+            Optional[bytes]: The audio, or None on a miss.
+        """
+        key = self.key(text, voice, model)
+        with self._lock:
+            if key not in self._entries:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(self._path(key), "rb") as clip_file:
+                audio = clip_file.read()
+            os.utime(self._path(key))
+        except OSError:
+            # Removed behind our back, treat it as a miss
+            with self._lock:
+                if key in self._entries:
+                    self.size -= self._entries.pop(key)
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            self.stats["hits"] += 1
+            self.stats["bytes_saved"] += len(audio)
+        return audio
+
+    def put(self, text: str, voice: str, model: str, audio: bytes) -> None:
+        """
+        Store a clip, evicting the least recently used ones to stay under the size limit.
+
+        Args:
+            text (str): The spoken text.
+            voice (str): The TTS voice.
+            model (str): The TTS model.
+            audio (bytes): The synthesized audio.
+        """
+        if len(audio) > self.max_bytes:
+            return
+        key = self.key(text, voice, model)
+        temporary_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as clip_file:
+            clip_file.write(audio)
+        os.replace(temporary_path, self._path(key))
+
+        evicted = []
+        with self._lock:
+            self.size += len(audio) - self._entries.pop(key, 0)
+            self._entries[key] = len(audio)
+            while self.size > self.max_bytes:
+                evicted_key, evicted_size = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.stats["evictions"] += 1
+                evicted.append(evicted_key)
+        for evicted_key in evicted:
+            try:
+                os.remove(self._path(evicted_key))
+            except OSError:
+                pass
+
+    def prewarm(self, phrases: Iterable[str], voice: str, model: str, synthesize: Callable[[str], bytes]) -> int:
+        """
+        Synthesize the phrases that are not cached yet, e.g. confirmations and error messages, ahead of time.
+
+        Args:
+            phrases (Iterable[str]): The phrases to cache.
+            voice (str): The TTS voice.
+            model (str): The TTS model.
+            synthesize (Callable[[str], bytes]): Synthesizes a phrase without going through the cache.
+
+        Returns:
+            int: Number of newly synthesized phrases.
+        """
+        synthesized = 0
+        for phrase in phrases:
+            with self._lock:
+                cached = self.key(phrase, voice, model) in self._entries
+            if cached:
+                continue
+            try:
+                self.put(phrase, voice, model, synthesize(phrase))
+                synthesized += 1
+            except Exception as e:
+                logger.error(f"Failed to prewarm the TTS cache with '{phrase}': {e}")
+        logger.info(f"TTS cache prewarmed, {synthesized} new phrases synthesized.")
+        return synthesized
+
+    def get_stats(self) -> dict:
+        """
+        Returns:
+            dict: Hits, misses, hit ratio, bytes served from disk instead of the network, evictions and the
+                current number of clips and bytes.
+        """
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {**self.stats, "hit_ratio": self.stats["hits"] / lookups if lookups else None,
+                    "clips": len(self._entries), "bytes": self.size}
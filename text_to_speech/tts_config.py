@@ -6,6 +6,26 @@ from config.base_config import BaseConfig
 class TTSConfig(BaseConfig):
     TTS_DIR_PATH = os.path.dirname(os.path.abspath(__file__))
     SOUND_FILE_PATH = os.path.join(TTS_DIR_PATH, 'speech.mp3')
+    STREAM_QUEUE_SIZE = 4  # Sentences synthesized ahead of the one playing
+
+    # Split multi-sentence texts and synthesize the sentences in parallel, playing them in order
+    SPLIT_SENTENCES = True
+    MIN_SENTENCE_LENGTH = 20  # Shorter sentences are merged with the next one
+    SYNTHESIS_WORKERS = 3
+
+    # Request raw PCM and play it while it downloads, instead of waiting for a whole MP3
+    STREAM_PLAYBACK = True
+    PCM_SAMPLE_RATE = 24000  # The speech API returns 24 kHz 16-bit mono PCM
+    STREAM_CHUNK_SIZE = 4800  # Bytes per chunk, 100 ms of audio
+    PLAYBACK_SLICE_MS = 20  # PCM is written to the device in slices this long, bounding the interrupt latency
+
+    # Synthesized phrases are cached on disk, keyed by text, voice and model
+    USE_CACHE = True
+    CACHE_DIR = os.path.join(TTS_DIR_PATH, 'tts_cache')
+    CACHE_MAX_BYTES = 50 * 2 ** 20
+    # Fixed phrases synthesized in the background at startup, so they play instantly the first time too
+    PREWARM_PHRASES = ["On it.", "Goodbye!", "Sorry, I didn't get all the details. Could you say that again?",
+                       "Sorry, I didn't catch that.", "Hello! How can I help?"]
 
     class Voice(Enum):
         ALLOY = 'alloy'
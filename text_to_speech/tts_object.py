@@ -1,9 +1,16 @@
 import os
-from openai import OpenAI
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
 from openai._legacy_response import HttpxBinaryResponseContent
-import pygame
+from text_to_speech.playback_engine import PlaybackEngine
+from text_to_speech.tts_cache import TTSCache
 from text_to_speech.tts_config import TTSConfig
 from utils.logger import JarvisLogger
+from utils.text_chunking import iter_sentences
+from utils.openai_client import get_async_openai_client, get_openai_client
 
 config = TTSConfig()
 
@@ -11,15 +18,246 @@ logger = JarvisLogger('TTSObject')
 
 
 class TTSObject:
-    def __init__(self, voice: str = config.Voice.DEFAULT.value):
-        self.client = OpenAI()
+    def __init__(self, voice: str = config.Voice.DEFAULT.value, use_cache: bool = config.USE_CACHE):
+        self.client = get_openai_client()
+        self.async_client = get_async_openai_client()
         self.model = config.Model.TTS_1.value
         self.voice = voice
+        self.cache = TTSCache(config.CACHE_DIR, config.CACHE_MAX_BYTES) if use_cache else None
+        self.pcm_cache = TTSCache(os.path.join(config.CACHE_DIR, "pcm"), config.CACHE_MAX_BYTES, extension="pcm") \
+            if use_cache and config.STREAM_PLAYBACK else None
+        self.playback = PlaybackEngine(config.PCM_SAMPLE_RATE, config.PLAYBACK_SLICE_MS)
+        self.synthesis_pool = ThreadPoolExecutor(max_workers=config.SYNTHESIS_WORKERS,
+                                                 thread_name_prefix="tts-synthesis")
+        # Prewarm the cache the playback mode reads from
+        prewarm_cache, prewarm_synthesize = (self.pcm_cache, self._synthesize_pcm_uncached) \
+            if config.STREAM_PLAYBACK else (self.cache, self._synthesize_uncached)
+        if prewarm_cache and config.PREWARM_PHRASES:
+            # `talk` synthesizes a phrase of several sentences one sentence at a time
+            phrases = [sentence for phrase in config.PREWARM_PHRASES for sentence in self._split_sentences(phrase)]
+            threading.Thread(target=prewarm_cache.prewarm, name="tts-cache-prewarm", daemon=True,
+                             args=(phrases, self.voice, self.model, prewarm_synthesize)).start()
+
+    @staticmethod
+    def _split_sentences(text: str) -> list[str]:
+        return list(iter_sentences([text], config.MIN_SENTENCE_LENGTH)) if config.SPLIT_SENTENCES else [text]
+
+    def talk(self, text_to_speak: str, block: bool = True) -> Future:
+        """
+        Speak a text on the playback engine.
+
+        With `SPLIT_SENTENCES`, a text of several sentences is spoken through `talk_stream`, so its sentences are
+        synthesized in parallel and the first one plays without waiting for the rest.
+
+        Args:
+            text_to_speak (str): The text to speak.
+            block (bool): Wait until the speech is over. Otherwise return as soon as it is queued.
+
+        Returns:
+            Future: Resolves to True when the speech played to the end, False when it was interrupted by `stop`.
+        """
+        sentences = self._split_sentences(text_to_speak)
+        if len(sentences) > 1:
+            future = Future()
+            future.set_running_or_notify_cancel()
+
+            def speak_sentences():
+                try:
+                    future.set_result(self.talk_stream(sentences))
+                except Exception as e:
+                    future.set_exception(e)
+
+            if block:
+                speak_sentences()
+            else:
+                threading.Thread(target=speak_sentences, name="tts-talk", daemon=True).start()
+        elif config.STREAM_PLAYBACK:
+            future = self.playback.play_pcm(self.stream_speech(text_to_speak))
+        else:
+            future = self.playback.play_mp3(self.synthesize(text_to_speak))
+        if block:
+            future.result()
+        return future
+
+    def stop(self) -> int:
+        """
+        Interrupt the current speech and drop the queued speech, e.g. when the user barges in.
+
+        Returns:
+            int: Number of clips stopped or dropped.
+        """
+        return self.playback.stop()
+
+    def _synthesize_into(self, sentence: str, audio_queue: queue.Queue) -> None:
+        """
+        Synthesize a sentence into its own queue, ended by None. Failures are queued for the player to raise.
+        """
+        try:
+            if config.STREAM_PLAYBACK:
+                for chunk in self.stream_speech(sentence):
+                    audio_queue.put(chunk)
+            else:
+                audio_queue.put(self.synthesize(sentence))
+        except Exception as e:
+            audio_queue.put(e)
+        finally:
+            audio_queue.put(None)
+
+    def talk_stream(self, sentences: Iterable[str], on_first_audio: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Speak a stream of sentences, synthesizing the upcoming ones in parallel while the current one is playing.
+
+        The sentences are pulled on a background thread, so a generator that is still waiting for the LLM does
+        not hold up playback of what is already synthesized. Each sentence is synthesized on the worker pool into
+        a queue of its own, and the queues are played strictly in order, so a short sentence that is ready early
+        waits for its turn. At most `STREAM_QUEUE_SIZE` sentences are synthesized ahead of playback. With
+        `STREAM_PLAYBACK`, the sentence being played is handed over chunk by chunk as it downloads.
+
+        A `stop` from another thread ends the stream, and no further sentences are synthesized.
+
+        Args:
+            sentences (Iterable[str]): The sentences to speak, in order.
+            on_first_audio (Callable[[], None], optional): Called right before the first sentence starts playing.
+
+        Returns:
+            bool: True when everything was spoken, False when it was interrupted.
+        """
+        sentence_queues = queue.Queue(maxsize=config.STREAM_QUEUE_SIZE)
+        errors = []
+        generation = self.playback.generation
+        interrupted = threading.Event()
+
+        def submit_sentences():
+            try:
+                for sentence in sentences:
+                    if interrupted.is_set():
+                        return
+                    audio_queue = queue.Queue()
+                    self.synthesis_pool.submit(self._synthesize_into, sentence, audio_queue)
+                    sentence_queues.put(audio_queue)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                sentence_queues.put(None)
+
+        def sentence_audio() -> Iterator[Iterator[bytes]]:
+            nonlocal on_first_audio
+            while (audio_queue := sentence_queues.get()) is not None:
+                def queued_audio() -> Iterator[bytes]:
+                    nonlocal on_first_audio
+                    while (audio := audio_queue.get()) is not None:
+                        if isinstance(audio, Exception):
+                            raise audio
+                        if on_first_audio:
+                            on_first_audio()
+                            on_first_audio = None
+                        yield audio
+                yield queued_audio()
+
+        threading.Thread(target=submit_sentences, name="tts-sentences", daemon=True).start()
+        completed = False
+        try:
+            if config.STREAM_PLAYBACK:
+                all_audio = (chunk for sentence in sentence_audio() for chunk in sentence)
+                completed = self.playback.play_pcm(all_audio).result()
+            else:
+                for sentence in sentence_audio():
+                    # A stop between two sentences finds nothing playing, the generation tells it happened
+                    if self.playback.generation != generation or not self.playback.play_mp3(next(sentence)).result():
+                        break
+                else:
+                    completed = True
+        finally:
+            if not completed:
+                interrupted.set()
+                # Make room for the submitter's pending put, so it sees the interrupt and exits
+                while not sentence_queues.empty():
+                    sentence_queues.get_nowait()
+        if completed and errors:
+            raise errors[0]
+        return completed
 
-    def talk(self, text_to_speak: str):
-        speech_object = self.text_to_speech_object(text_to_speak)
-        self.speech_object_to_file(speech_object)
-        self.play_mp3_file()
+    def stream_speech(self, text_input: str) -> Iterator[bytes]:
+        """
+        Synthesize speech as raw PCM, yielding the audio while it downloads.
+
+        Args:
+            text_input (str): The text to speak.
+
+        Yields:
+            bytes: Chunks of 16-bit mono PCM at `PCM_SAMPLE_RATE`, straight from the cache on a hit.
+        """
+        if self.pcm_cache:
+            audio = self.pcm_cache.get(text_input, self.voice, self.model)
+            if audio is not None:
+                for start in range(0, len(audio), config.STREAM_CHUNK_SIZE):
+                    yield audio[start:start + config.STREAM_CHUNK_SIZE]
+                return
+
+        downloaded = bytearray()
+        for chunk in self._stream_speech_uncached(text_input):
+            downloaded.extend(chunk)
+            yield chunk
+        if self.pcm_cache:
+            self.pcm_cache.put(text_input, self.voice, self.model, bytes(downloaded))
+
+    def _stream_speech_uncached(self, text_input: str) -> Iterator[bytes]:
+        with self.client.audio.speech.with_streaming_response.create(
+            model=self.model,
+            voice=self.voice,
+            input=text_input,
+            response_format="pcm"
+        ) as response:
+            yield from response.iter_bytes(config.STREAM_CHUNK_SIZE)
+
+    def _synthesize_pcm_uncached(self, text_input: str) -> bytes:
+        return b"".join(self._stream_speech_uncached(text_input))
+
+    def synthesize(self, text_input: str) -> bytes:
+        """
+        Synthesize speech in memory, from the cache when the same text was already synthesized.
+
+        Args:
+            text_input (str): The text to speak.
+
+        Returns:
+            bytes: The MP3 audio.
+        """
+        if self.cache:
+            audio = self.cache.get(text_input, self.voice, self.model)
+            if audio is not None:
+                return audio
+        audio = self._synthesize_uncached(text_input)
+        if self.cache:
+            self.cache.put(text_input, self.voice, self.model, audio)
+        return audio
+
+    def _synthesize_uncached(self, text_input: str) -> bytes:
+        return self.text_to_speech_object(text_input).content
+
+    async def asynthesize(self, text_input: str) -> bytes:
+        """
+        Synthesize speech in memory without blocking the event loop.
+
+        Args:
+            text_input (str): The text to speak.
+
+        Returns:
+            bytes: The MP3 audio.
+        """
+        if self.cache:
+            audio = self.cache.get(text_input, self.voice, self.model)
+            if audio is not None:
+                return audio
+        response = await self.async_client.audio.speech.create(
+            model=self.model,
+            voice=self.voice,
+            input=text_input
+        )
+        audio = response.content
+        if self.cache:
+            self.cache.put(text_input, self.voice, self.model, audio)
+        return audio
 
     def text_to_speech_object(self, text_input: str):
         response = self.client.audio.speech.create(
@@ -33,19 +271,13 @@ class TTSObject:
     def speech_object_to_file(speech_object: HttpxBinaryResponseContent):
         speech_object.stream_to_file(config.SOUND_FILE_PATH)
 
-    @staticmethod
-    def play_mp3_file():
-        """Plays an MP3 file using pygame."""
-        if os.path.exists(config.SOUND_FILE_PATH):
-            # Initialize pygame mixer
-            pygame.mixer.init()
-
-            # Load and play the mp3 file
-            pygame.mixer.music.load(config.SOUND_FILE_PATH)
-            pygame.mixer.music.play()
-
-            # Keep the script alive while audio is playing
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
-        else:
+    def play_mp3_file(self, block: bool = True) -> Optional[Future]:
+        """Plays the MP3 file at SOUND_FILE_PATH on the playback engine."""
+        if not os.path.exists(config.SOUND_FILE_PATH):
             logger.error(f"File {config.SOUND_FILE_PATH} not found.")
+            return None
+        with open(config.SOUND_FILE_PATH, "rb") as sound_file:
+            future = self.playback.play_mp3(sound_file.read())
+        if block:
+            future.result()
+        return future
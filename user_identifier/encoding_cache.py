@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+from utils.logger import JarvisLogger
+
+logger = JarvisLogger('EncodingCache')
+
+INDEX_FILE_NAME = "index.json"
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as image_file:
+        for block in iter(lambda: image_file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class EncodingCache:
+    """
+    Face encodings of the known-face images, persisted so startup only encodes new or changed images.
+
+    The encodings are stored as one `.npy` matrix, memory-mapped on load, next to a JSON index of the images
+    with their size, modification time, content hash and row. An image is re-encoded only when its content hash
+    changed; a size or mtime change alone just triggers the hash check. The matrix is written under a fresh name
+    before the index points to it, so an interrupted save leaves the previous cache intact.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        """
+        Initialize the EncodingCache class.
+
+        Args:
+            cache_dir (str): Directory of the cache files, created if missing.
+        """
+        self.cache_dir = cache_dir
+        self._entries: Dict[str, dict] = {}  # Absolute image path -> size, mtime_ns, sha256, row (-1 for no face)
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_name: Optional[str] = None
+        self._lock = threading.Lock()
+        self.stats = {"cached": 0, "encoded": 0, "removed": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        index_path = os.path.join(self.cache_dir, INDEX_FILE_NAME)
+        if not os.path.exists(index_path):
+            return
+        try:
+            with open(index_path) as index_file:
+                index = json.load(index_file)
+            self._matrix = np.load(os.path.join(self.cache_dir, index["matrix"]), mmap_mode="r")
+            self._matrix_name = index["matrix"]
+            self._entries = index["images"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Ignoring the unreadable face encoding cache: {e}")
+            self._entries, self._matrix, self._matrix_name = {}, None, None
+
+    def _cached_encoding(self, entry: dict) -> Optional[np.ndarray]:
+        return None if entry["row"] < 0 else np.array(self._matrix[entry["row"]])
+
+    def get_encodings(self, image_paths: Iterable[str],
+                      encode: Callable[[str], Optional[np.ndarray]]) -> Dict[str, Optional[np.ndarray]]:
+        """
+        Get the encodings of the images, encoding only the new and changed ones.
+
+        Images that are not requested anymore are dropped from the cache.
+
+        Args:
+            image_paths (Iterable[str]): The known-face images.
+            encode (Callable[[str], Optional[np.ndarray]]): Encodes an image, None when it has no face.
+
+        Returns:
+            Dict[str, Optional[np.ndarray]]: The encoding of every image, None for images without a face.
+        """
+        with self._lock:
+            encodings = {}
+            entries = {}
+            changed = False
+            for image_path in image_paths:
+                key = os.path.abspath(image_path)
+                status = os.stat(key)
+                entry = self._entries.get(key)
+                if entry and (entry["size"], entry["mtime_ns"]) != (status.st_size, status.st_mtime_ns):
+                    # Touched or copied over: only re-encode when the content really changed
+                    digest = file_digest(key)
+                    if digest != entry["sha256"]:
+                        entry = None
+                    else:
+                        entry = {**entry, "size": status.st_size, "mtime_ns": status.st_mtime_ns}
+                        changed = True
+                if entry:
+                    encodings[image_path] = self._cached_encoding(entry)
+                    self.stats["cached"] += 1
+                else:
+                    encodings[image_path] = encode(image_path)
+                    entry = {"size": status.st_size, "mtime_ns": status.st_mtime_ns, "sha256": file_digest(key)}
+                    self.stats["encoded"] += 1
+                    changed = True
+                entries[key] = dict(entry)
+            removed = len(set(self._entries) - set(entries))
+            self.stats["removed"] += removed
+            if changed or removed:
+                self._save(entries, {os.path.abspath(path): encoding for path, encoding in encodings.items()})
+            return encodings
+
+    def _save(self, entries: Dict[str, dict], encodings: Dict[str, Optional[np.ndarray]]) -> None:
+        rows = []
+        for key, entry in entries.items():
+            entry["row"] = len(rows) if encodings[key] is not None else -1
+            if encodings[key] is not None:
+                rows.append(encodings[key])
+        matrix = np.asarray(rows, dtype=np.float64).reshape(len(rows), -1) if rows else np.zeros((0, 128))
+
+        matrix_name = f"encodings-{uuid.uuid4().hex}.npy"
+        np.save(os.path.join(self.cache_dir, matrix_name), matrix)
+        index_path = os.path.join(self.cache_dir, INDEX_FILE_NAME)
+        with open(f"{index_path}.tmp", "w") as index_file:
+            json.dump({"matrix": matrix_name, "images": entries}, index_file)
+        os.replace(f"{index_path}.tmp", index_path)
+
+        previous_name = self._matrix_name
+        self._entries, self._matrix_name = entries, matrix_name
+        self._matrix = np.load(os.path.join(self.cache_dir, matrix_name), mmap_mode="r")
+        if previous_name:
+            try:
+                os.remove(os.path.join(self.cache_dir, previous_name))
+            except OSError:
+                pass
+
+    def get_stats(self) -> dict:
+        """
+        Returns:
+            dict: Images served from the cache, encoded and dropped, and the number of cached images.
+        """
+        with self._lock:
+            return {**self.stats, "images": len(self._entries)}
@@ -0,0 +1,140 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+ENCODING_SIZE = 128  # Length of a face_recognition encoding
+
+
+@dataclass
+class GalleryMatch:
+    identity: str
+    distance: float
+
+
+class FaceGallery:
+    """
+    The known faces, as many identities with several encodings each, in one contiguous NumPy matrix.
+
+    Matching computes the distances of every face in a frame to every encoding with a single matrix product,
+    using the cached squared norms of the rows: |a - b|^2 = |a|^2 + |b|^2 - 2 a.b. The matrix grows by doubling
+    and an identity is removed by moving the last rows into its slots, so adding and removing never rebuild it.
+    """
+
+    def __init__(self, tolerance: float = 0.6, initial_capacity: int = 64) -> None:
+        """
+        Initialize the FaceGallery class.
+
+        Args:
+            tolerance (float): Maximum distance of a match, 0.6 being the face_recognition default.
+            initial_capacity (int): Rows allocated up front.
+        """
+        self.tolerance = tolerance
+        self._encodings = np.zeros((initial_capacity, ENCODING_SIZE), dtype=np.float64)
+        self._norms = np.zeros(initial_capacity, dtype=np.float64)  # Squared norm of every row
+        self._labels = np.zeros(initial_capacity, dtype=np.int32)  # Identity index of every row
+        self._count = 0
+        self._identities: List[Optional[str]] = []  # Identity index -> name, None once removed
+        self._identity_index: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def identities(self) -> List[str]:
+        with self._lock:
+            return list(self._identity_index)
+
+    def _reserve(self, rows: int) -> None:
+        capacity = len(self._encodings)
+        if self._count + rows <= capacity:
+            return
+        while capacity < self._count + rows:
+            capacity *= 2
+        for name in ("_encodings", "_norms", "_labels"):
+            current = getattr(self, name)
+            grown = np.zeros((capacity,) + current.shape[1:], dtype=current.dtype)
+            grown[:self._count] = current[:self._count]
+            setattr(self, name, grown)
+
+    def add(self, identity: str, encodings: Sequence[np.ndarray]) -> None:
+        """
+        Add encodings of an identity, creating the identity if it is new.
+
+        Args:
+            identity (str): Name of the person.
+            encodings (Sequence[np.ndarray]): Their face encodings.
+        """
+        new_rows = np.asarray(encodings, dtype=np.float64).reshape(-1, ENCODING_SIZE)
+        with self._lock:
+            if identity not in self._identity_index:
+                self._identity_index[identity] = len(self._identities)
+                self._identities.append(identity)
+            self._reserve(len(new_rows))
+            end = self._count + len(new_rows)
+            self._encodings[self._count:end] = new_rows
+            self._norms[self._count:end] = np.einsum("ij,ij->i", new_rows, new_rows)
+            self._labels[self._count:end] = self._identity_index[identity]
+            self._count = end
+
+    def remove(self, identity: str) -> int:
+        """
+        Remove an identity and all of its encodings.
+
+        Args:
+            identity (str): Name of the person.
+
+        Returns:
+            int: Number of encodings removed.
+        """
+        with self._lock:
+            label = self._identity_index.pop(identity, None)
+            if label is None:
+                return 0
+            self._identities[label] = None
+            rows = np.flatnonzero(self._labels[:self._count] == label)
+            # Fill the freed rows with the last rows that stay, keeping the matrix contiguous
+            end = self._count - len(rows)
+            kept_tail = np.setdiff1d(np.arange(end, self._count), rows)
+            holes = rows[rows < end]
+            for name in ("_encodings", "_norms", "_labels"):
+                array = getattr(self, name)
+                array[holes] = array[kept_tail]
+            self._count = end
+            return len(rows)
+
+    def match(self, encodings: Sequence[np.ndarray]) -> List[Optional[GalleryMatch]]:
+        """
+        Find the best identity of every face in one vectorized pass.
+
+        Args:
+            encodings (Sequence[np.ndarray]): Encodings of the faces in a frame.
+
+        Returns:
+            List[Optional[GalleryMatch]]: The closest identity of every face, or None when no encoding of the
+                gallery is within the tolerance.
+        """
+        faces = np.asarray(encodings, dtype=np.float64).reshape(-1, ENCODING_SIZE)
+        with self._lock:
+            if not self._count or not len(faces):
+                return [None] * len(faces)
+            squared = self._norms[:self._count] + np.einsum("ij,ij->i", faces, faces)[:, None] - \
+                2.0 * faces @ self._encodings[:self._count].T
+            best_rows = np.argmin(squared, axis=1)
+            best_squared = np.maximum(squared[np.arange(len(faces)), best_rows], 0.0)
+            best_labels = self._labels[best_rows]
+            identities = self._identities
+        return [GalleryMatch(identities[label], float(np.sqrt(distance)))
+                if distance <= self.tolerance ** 2 else None
+                for label, distance in zip(best_labels, best_squared)]
+
+    def get_stats(self) -> dict:
+        """
+        Returns:
+            dict: Number of identities and encodings and the allocated rows.
+        """
+        with self._lock:
+            return {"identities": len(self._identity_index), "encodings": self._count,
+                    "capacity": len(self._encodings)}
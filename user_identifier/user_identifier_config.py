@@ -0,0 +1,15 @@
+import os
+from config.base_config import BaseConfig
+
+
+class UserIdentifierConfig(BaseConfig):
+    USER_IDENTIFIER_DIR: str = os.path.dirname(os.path.abspath(__file__))
+    # One sub-directory of face images per person, named after them. A single image is taken as the "owner".
+    KNOWN_FACES_PATH: str = os.path.join(BaseConfig.BASE_DIR, "face_detection", "known_faces")
+    IMAGE_EXTENSIONS: tuple = (".jpg", ".jpeg", ".png")
+    DEFAULT_IDENTITY: str = "owner"
+    MATCH_TOLERANCE: float = 0.6  # Maximum face distance of a match, the face_recognition default
+
+    # Encodings of the known faces are cached on disk, only new or changed images are encoded at startup
+    USE_ENCODING_CACHE: bool = True
+    ENCODING_CACHE_DIR: str = os.path.join(USER_IDENTIFIER_DIR, "encoding_cache")
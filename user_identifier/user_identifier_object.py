@@ -0,0 +1,114 @@
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import face_recognition
+import numpy as np
+
+from user_identifier.encoding_cache import EncodingCache
+from user_identifier.face_gallery import FaceGallery, GalleryMatch
+from user_identifier.user_identifier_config import UserIdentifierConfig
+from utils.logger import JarvisLogger
+
+config = UserIdentifierConfig()
+
+logger = JarvisLogger("UserIdentifierObject")
+
+
+class UserIdentifierObject:
+    """
+    Identifies the people in a frame against the known faces on disk.
+    """
+
+    def __init__(self, known_faces_path: str = config.KNOWN_FACES_PATH):
+        startup_start = time.perf_counter()
+        self.known_faces_path = known_faces_path
+        self.gallery = FaceGallery(config.MATCH_TOLERANCE)
+        self.encoding_cache = EncodingCache(config.ENCODING_CACHE_DIR) if config.USE_ENCODING_CACHE else None
+        known_faces = self.find_known_faces()
+        encodings = self.encode_images([path for image_paths in known_faces.values() for path in image_paths])
+        for identity, image_paths in known_faces.items():
+            self.gallery.add(identity, [encodings[path] for path in image_paths if encodings[path] is not None])
+
+        encoded = self.encoding_cache.stats["encoded"] if self.encoding_cache else len(encodings)
+        self.startup_stats = {"seconds": time.perf_counter() - startup_start, "images": len(encodings),
+                              "encoded": encoded, "warm": bool(encodings) and encoded == 0}
+        logger.info(f"{'Warm' if self.startup_stats['warm'] else 'Cold'} start in "
+                    f"{self.startup_stats['seconds']:.2f}s, {encoded} of {len(encodings)} known-face images "
+                    f"encoded. Face gallery: {self.gallery.get_stats()}")
+
+    def find_known_faces(self) -> Dict[str, List[str]]:
+        """
+        List the face images of every known person.
+
+        Returns:
+            Dict[str, List[str]]: Identity to its image paths.
+        """
+        if os.path.isfile(self.known_faces_path):
+            return {config.DEFAULT_IDENTITY: [self.known_faces_path]}
+        known_faces = {}
+        if not os.path.isdir(self.known_faces_path):
+            logger.error(f"Known faces path {self.known_faces_path} not found.")
+            return known_faces
+        for entry in sorted(os.scandir(self.known_faces_path), key=lambda entry: entry.name):
+            if entry.is_dir():
+                images = [os.path.join(entry.path, name) for name in sorted(os.listdir(entry.path))
+                          if name.lower().endswith(config.IMAGE_EXTENSIONS)]
+                if images:
+                    known_faces[entry.name] = images
+            elif entry.name.lower().endswith(config.IMAGE_EXTENSIONS):
+                known_faces.setdefault(os.path.splitext(entry.name)[0], []).append(entry.path)
+        return known_faces
+
+    @staticmethod
+    def encode_image(image_path: str) -> Optional[np.ndarray]:
+        """
+        Encode the face in an image.
+
+        Returns:
+            Optional[np.ndarray]: The encoding of the first face found, or None if there is none.
+        """
+        encodings = face_recognition.face_encodings(face_recognition.load_image_file(image_path))
+        if not encodings:
+            logger.warning(f"No face found in {image_path}.")
+            return None
+        return encodings[0]
+
+    def encode_images(self, image_paths: Sequence[str]) -> Dict[str, Optional[np.ndarray]]:
+        """
+        Encode face images, through the encoding cache when it is enabled.
+
+        Returns:
+            Dict[str, Optional[np.ndarray]]: The encoding of every image, None for images without a face.
+        """
+        if self.encoding_cache:
+            return self.encoding_cache.get_encodings(image_paths, self.encode_image)
+        return {image_path: self.encode_image(image_path) for image_path in image_paths}
+
+    def add_identity(self, identity: str, image_paths: Sequence[str]) -> int:
+        """
+        Add a person to the gallery from their face images.
+
+        Returns:
+            int: Number of encodings added.
+        """
+        # Encoded on their own, so the cache is not told to forget the other known faces
+        encodings = [encoding for encoding in map(self.encode_image, image_paths) if encoding is not None]
+        if encodings:
+            self.gallery.add(identity, encodings)
+        return len(encodings)
+
+    def remove_identity(self, identity: str) -> int:
+        return self.gallery.remove(identity)
+
+    def identify(self, face_encodings: Sequence[np.ndarray]) -> List[Optional[GalleryMatch]]:
+        """
+        Identify every face of a frame in one batch.
+
+        Args:
+            face_encodings (Sequence[np.ndarray]): The encodings of the faces.
+
+        Returns:
+            List[Optional[GalleryMatch]]: The identity of every face, None for strangers.
+        """
+        return self.gallery.match(face_encodings)
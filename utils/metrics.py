@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+
+class LatencyStats:
+    """
+    A thread-safe rolling window of latency samples (in seconds) with summary statistics.
+    """
+
+    def __init__(self, max_samples: int = 1000):
+        """
+        Initialize the LatencyStats class.
+
+        Args:
+            max_samples (int): Number of most recent samples kept for the summary.
+        """
+        self._samples = deque(maxlen=max_samples)
+        self._count = 0
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, value: float) -> None:
+        """
+        Record a single latency sample.
+
+        Args:
+            value (float): The latency in seconds.
+        """
+        with self._lock:
+            self._samples.append(value)
+            self._count += 1
+            self._total += value
+
+    @staticmethod
+    def _percentile(sorted_samples: list, percentile: float) -> float:
+        index = min(len(sorted_samples) - 1, int(round(percentile / 100 * (len(sorted_samples) - 1))))
+        return sorted_samples[index]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """
+        Summarize the recorded samples.
+
+        Returns:
+            dict: The total count and sum of all samples, and the mean/p50/p90/p99/max of the rolling window.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total = self._count, self._total
+        if not samples:
+            return {"count": 0, "total": 0.0, "mean": None, "p50": None, "p90": None, "p99": None, "max": None}
+        return {
+            "count": count,
+            "total": total,
+            "mean": sum(samples) / len(samples),
+            "p50": self._percentile(samples, 50),
+            "p90": self._percentile(samples, 90),
+            "p99": self._percentile(samples, 99),
+            "max": samples[-1],
+        }
+
+
+def get_resident_memory_bytes() -> int:
+    """
+    Get the resident set size of the current process.
+
+    Reads /proc/self/statm where available (Linux) and falls back to the peak RSS reported by getrusage.
+
+    Returns:
+        int: The resident memory in bytes, or 0 if the platform offers no way to read it.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return get_peak_resident_memory_bytes()
+
+
+def get_peak_resident_memory_bytes() -> int:
+    """
+    Get the highest resident set size the current process has reached.
+
+    Returns:
+        int: The peak resident memory in bytes, or 0 if the platform offers no way to read it.
+    """
+    try:
+        import resource  # Unix only
+    except ImportError:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class CpuUsageMeter:
+    """
+    Accumulates the CPU time spent processing audio, normalized per hour of audio.
+
+    Measure with `time.thread_time()` deltas on the processing thread, so other threads do not skew the numbers.
+    """
+
+    def __init__(self):
+        self.cpu_seconds = 0.0
+        self.audio_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, cpu_seconds: float, audio_seconds: float) -> None:
+        """
+        Record the CPU time spent on a stretch of audio.
+
+        Args:
+            cpu_seconds (float): CPU time spent.
+            audio_seconds (float): Duration of the audio processed.
+        """
+        with self._lock:
+            self.cpu_seconds += cpu_seconds
+            self.audio_seconds += audio_seconds
+
+    @property
+    def cpu_seconds_per_audio_hour(self) -> Optional[float]:
+        """
+        Returns:
+            Optional[float]: CPU seconds per hour of audio, or None before any audio was processed.
+        """
+        with self._lock:
+            if not self.audio_seconds:
+                return None
+            return self.cpu_seconds / self.audio_seconds * 3600
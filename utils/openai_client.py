@@ -0,0 +1,82 @@
+import threading
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from config.openai_client_config import OpenAIClientConfig
+from utils.logger import JarvisLogger
+
+config = OpenAIClientConfig()
+logger = JarvisLogger('OpenAIClient')
+
+_lock = threading.Lock()
+_client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
+
+
+def _http2_enabled() -> bool:
+    if not config.HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401  httpx only speaks HTTP/2 when h2 is installed
+    except ImportError:
+        logger.warning("HTTP/2 is enabled but the h2 package is missing, falling back to HTTP/1.1.")
+        return False
+    return True
+
+
+def _http_client_options() -> dict:
+    return {
+        "http2": _http2_enabled(),
+        "limits": httpx.Limits(max_connections=config.MAX_CONNECTIONS,
+                               max_keepalive_connections=config.MAX_KEEPALIVE_CONNECTIONS,
+                               keepalive_expiry=config.KEEPALIVE_EXPIRY),
+        "timeout": httpx.Timeout(config.READ_TIMEOUT, connect=config.CONNECT_TIMEOUT),
+    }
+
+
+def get_openai_client() -> OpenAI:
+    """
+    Get the process-wide blocking OpenAI client.
+
+    Every component shares its connection pool, so keep-alive connections (and their TLS sessions) are reused
+    across chat, speech and transcription requests.
+
+    Returns:
+        OpenAI: The shared client.
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            _client = OpenAI(http_client=httpx.Client(**_http_client_options()), max_retries=config.MAX_RETRIES)
+        return _client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Get the process-wide asyncio OpenAI client.
+
+    The underlying connection pool belongs to the event loop that first uses it, so use the client from a single
+    loop (e.g. the server's) and close it with `close_async_openai_client` on shutdown.
+
+    Returns:
+        AsyncOpenAI: The shared client.
+    """
+    global _async_client
+    with _lock:
+        if _async_client is None:
+            _async_client = AsyncOpenAI(http_client=httpx.AsyncClient(**_http_client_options()),
+                                        max_retries=config.MAX_RETRIES)
+        return _async_client
+
+
+async def close_async_openai_client() -> None:
+    """
+    Close the shared asyncio client and its connections.
+    """
+    global _async_client
+    with _lock:
+        client, _async_client = _async_client, None
+    if client is not None:
+        await client.close()
@@ -0,0 +1,80 @@
+import re
+from typing import Iterable, Iterator, List, Optional
+
+# A sentence ends at ., ! or ? (optionally followed by closing quotes or brackets) and then whitespace
+_SENTENCE_END = re.compile(r"""[.!?]+["')\]]*\s+""")
+# Words ending in a period that do not end a sentence
+_ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "prof.", "st.", "vs.", "etc.", "e.g.", "i.e.", "no."}
+
+
+class SentenceChunker:
+    """
+    Splits a stream of text deltas into sentences as soon as each sentence is complete.
+
+    Sentences shorter than `min_length` are merged with the next one, so the speech engine is not called for
+    every "Sure." or "Okay!" on its own.
+    """
+
+    def __init__(self, min_length: int = 20) -> None:
+        """
+        Initialize the SentenceChunker class.
+
+        Args:
+            min_length (int): Minimum length of an emitted chunk, in characters.
+        """
+        self.min_length = min_length
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add a delta of text.
+
+        Args:
+            text (str): The next piece of the streamed text.
+
+        Returns:
+            List[str]: The chunks completed by this delta, possibly none.
+        """
+        self._buffer += text
+        chunks = []
+        chunk_start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            last_word = self._buffer[:match.start() + 1].rsplit(None, 1)[-1].lower()
+            if last_word in _ABBREVIATIONS:
+                continue
+            if match.end() - chunk_start < self.min_length:
+                continue
+            chunks.append(self._buffer[chunk_start:match.end()].strip())
+            chunk_start = match.end()
+        # Only the unfinished sentence is kept, so rescanning it on the next delta stays cheap
+        self._buffer = self._buffer[chunk_start:]
+        return chunks
+
+    def flush(self) -> Optional[str]:
+        """
+        Get whatever text is left once the stream is over.
+
+        Returns:
+            Optional[str]: The last chunk, or None if nothing is left.
+        """
+        remainder, self._buffer = self._buffer.strip(), ""
+        return remainder or None
+
+
+def iter_sentences(deltas: Iterable[str], min_length: int = 20) -> Iterator[str]:
+    """
+    Turn a stream of text deltas into a stream of sentences.
+
+    Args:
+        deltas (Iterable[str]): The streamed text, e.g. the content deltas of a chat completion.
+        min_length (int): Minimum length of a sentence chunk, in characters.
+
+    Yields:
+        str: Each sentence (or group of short sentences) as soon as it is complete.
+    """
+    chunker = SentenceChunker(min_length)
+    for delta in deltas:
+        yield from chunker.feed(delta)
+    remainder = chunker.flush()
+    if remainder:
+        yield remainder